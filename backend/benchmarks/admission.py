@@ -0,0 +1,159 @@
+# benchmarks/admission.py
+"""
+Latency under overload with and without admission control (models/admission.py).
+
+A stand-in service: one sync endpoint that needs one of --capacity "cores"
+(a semaphore) for --service-ms, the way /schemes/predict needs the CPU. It is
+driven open loop (loadgen.py style: latency counted from the scheduled start) at
+--overload x its capacity for --duration seconds, once as is and once behind
+the real admit() dependency (concurrency = --capacity, max_wait = --max-wait-ms).
+
+Reported per run: successes, 429 / 503 counts, and latency percentiles of the
+successes and of the rejections. Without admission control every request is queued
+and p99 grows with the backlog; with it, admitted p99 stays near max_wait +
+service time and the excess is shed in a few milliseconds. The runs behind admit()
+check that: the script exits with status 1 when their admitted p99 exceeds
+max_wait + service time + --margin-ms.
+
+A second scenario sends --flood-share of the traffic from one user: with a per-user
+rate limit (--user-rate requests/s) the flooder gets 429s while the other users'
+requests keep being served.
+
+Run from the backend directory (no database or model artifacts needed):
+    python -m benchmarks.admission --capacity 4 --service-ms 20 --overload 2 --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+
+from models.admission import AdmissionController, MemoryBackend, Policy  # noqa: E402
+
+from .fixtures import mint_token  # noqa: E402
+from .loadgen import percentile  # noqa: E402
+
+
+def build_app(capacity: int, service_seconds: float, policy: Optional[Policy]) -> FastAPI:
+    app = FastAPI()
+    cores = threading.Semaphore(capacity)
+    dependencies = []
+    if policy is not None:
+        controller = AdmissionController({"work": policy}, MemoryBackend())
+        dependencies = [Depends(controller.dependency("work"))]
+
+    @app.post("/work", dependencies=dependencies)
+    def work():
+        with cores:
+            time.sleep(service_seconds)
+        return {"ok": True}
+
+    return app
+
+
+async def drive(app: FastAPI, rps: float, duration: float, users: List[str], headers: Dict[str, dict],
+                flood_share: float = 0.0) -> Dict[str, list]:
+    """Open-loop load; returns latencies (seconds) by outcome, plus the flooder's outcomes."""
+    results: Dict[str, list] = {"ok": [], "rejected": [], "flooder": [], "others": []}
+    statuses: Counter = Counter()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://admission", timeout=None) as client:
+        async def one(user: str, scheduled: float):
+            response = await client.post("/work", headers=headers[user])
+            elapsed = time.perf_counter() - scheduled
+            statuses[response.status_code] += 1
+            results["ok" if response.status_code == 200 else "rejected"].append(elapsed)
+            results["flooder" if user == users[0] and flood_share else "others"].append(response.status_code)
+
+        tasks, start, count = [], time.perf_counter(), int(rps * duration)
+        flood_every = round(1 / flood_share) if flood_share else 0
+        for i in range(count):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            user = users[0] if flood_every and i % flood_every == 0 else users[1 + i % (len(users) - 1)]
+            tasks.append(asyncio.create_task(one(user, scheduled)))
+        await asyncio.gather(*tasks)
+    results["statuses"] = sorted(statuses.items())
+    return results
+
+
+def admitted_p99_ok(label: str, results: Dict[str, list], bound: float) -> bool:
+    """Admitted p99 within `bound` seconds (max_wait + service time + margin)."""
+    p99 = percentile(sorted(results["ok"]), 0.99) if results["ok"] else 0.0
+    ok = p99 <= bound
+    print(f"    {'✅' if ok else '❌'} {label}: admitted p99 {p99 * 1e3:.1f} ms, bound {bound * 1e3:.1f} ms")
+    return ok
+
+
+def report(label: str, results: Dict[str, list]) -> None:
+    ok, rejected = sorted(results["ok"]), sorted(results["rejected"])
+    line = f"{label:<26}{len(ok):>6} ok  " + " ".join(f"{code}:{n}" for code, n in results["statuses"] if code != 200)
+    if ok:
+        line += f"   ok p50 {percentile(ok, 0.5) * 1e3:7.1f} ms  p99 {percentile(ok, 0.99) * 1e3:7.1f} ms"
+    if rejected:
+        line += f"   rejected p99 {percentile(rejected, 0.99) * 1e3:6.1f} ms"
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark admission control under overload.")
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--service-ms", type=float, default=20.0)
+    parser.add_argument("--overload", type=float, default=2.0, help="offered load / capacity")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-wait-ms", type=float, default=100.0)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--flood-share", type=float, default=0.5)
+    parser.add_argument("--user-rate", type=float, default=5.0)
+    parser.add_argument("--margin-ms", type=float, default=50.0,
+                        help="allowed above max_wait + service time (event loop and client overhead)")
+    args = parser.parse_args(argv)
+
+    service = args.service_ms / 1000
+    capacity_rps = args.capacity / service
+    users = [f"admission-{i}" for i in range(args.users)]
+    headers = {u: {"Authorization": f"Bearer {mint_token(u)}"} for u in users}
+    unlimited = Policy(rate=0, burst=1, concurrency=args.capacity, max_wait=args.max_wait_ms / 1000)
+    bound = (args.max_wait_ms + args.service_ms + args.margin_ms) / 1000
+    failed = False
+
+    print(f"capacity {capacity_rps:.0f} req/s; offered {args.overload:.1f}x for {args.duration:.0f} s")
+    for label, rps, policy in [
+        ("under capacity, none", capacity_rps * 0.5, None),
+        ("under capacity, admission", capacity_rps * 0.5, unlimited),
+        ("overload, none", capacity_rps * args.overload, None),
+        ("overload, admission", capacity_rps * args.overload, unlimited),
+    ]:
+        app = build_app(args.capacity, service, policy)
+        results = asyncio.run(drive(app, rps, args.duration, users, headers))
+        report(label, results)
+        if policy is not None:
+            failed |= not admitted_p99_ok(label, results, bound)
+
+    # One user sends flood_share of the traffic, at a rate the service could absorb
+    rps = capacity_rps * 0.8
+    limited = unlimited._replace(rate=args.user_rate, burst=args.user_rate)
+    for label, policy in [("flooder, no rate limit", unlimited), ("flooder, rate limited", limited)]:
+        results = asyncio.run(drive(build_app(args.capacity, service, policy), rps, args.duration, users, headers,
+                                    flood_share=args.flood_share))
+        report(label, results)
+        for who in ("flooder", "others"):
+            codes = Counter(results[who])
+            print(f"    {who:<8} {codes[200] / max(len(results[who]), 1):6.1%} served of {len(results[who])}")
+        failed |= not admitted_p99_ok(label, results, bound)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/auth_overhead.py
+"""
+Per-request auth overhead: full python-jose decode vs the verified-token cache.
+
+Measures, for one HS256 token reused across requests (what the frontend does):
+  - jwt.decode on every call (what each service did before models/auth.py)
+  - models.auth.verify_token (first call decodes, later calls hit the cache)
+  - the same two as FastAPI dependencies behind a trivial endpoint (TestClient)
+
+Run from the backend directory:
+    python -m benchmarks.auth_overhead --calls 20000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from models import auth  # noqa: E402
+
+
+def _per_call_us(fn, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def _report(label, stats):
+    mean, p50, p99 = stats
+    print(f"{label:<34} mean {mean:>8.1f} us   p50 {p50:>8.1f} us   p99 {p99:>8.1f} us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-request JWT verification.")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    token = jwt.encode({"userId": "bench-user", "exp": int(time.time()) + 3600},
+                       auth.JWT_SECRET, algorithm=auth.ALGORITHM)
+
+    def uncached_dependency(token: str = Depends(auth.oauth2_scheme)) -> str:
+        return jwt.decode(token, auth.JWT_SECRET, algorithms=[auth.ALGORITHM])["userId"]
+
+    app = FastAPI()
+
+    @app.get("/uncached")
+    def uncached(user_id: str = Depends(uncached_dependency)):
+        return {"user_id": user_id}
+
+    @app.get("/cached")
+    def cached(user_id: str = Depends(auth.get_current_user)):
+        return {"user_id": user_id}
+
+    print(f"\n🔐 Direct calls ({args.calls} per row)")
+    _report("jwt.decode per request", _per_call_us(
+        lambda: jwt.decode(token, auth.JWT_SECRET, algorithms=[auth.ALGORITHM]), args.calls))
+    auth.token_cache.clear()
+    _report("verify_token (cached)", _per_call_us(lambda: auth.verify_token(token), args.calls))
+    print(f"cache hits {auth.token_cache.hits}, misses {auth.token_cache.misses}")
+
+    calls = max(args.calls // 10, 100)
+    headers = {"Authorization": f"Bearer {token}"}
+    client = TestClient(app)
+    print(f"\n🌐 Through FastAPI + TestClient ({calls} requests per row)")
+    _report("endpoint, jwt.decode dependency", _per_call_us(lambda: client.get("/uncached", headers=headers), calls))
+    _report("endpoint, get_current_user", _per_call_us(lambda: client.get("/cached", headers=headers), calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bulk_write.py
+"""
+Rows/second for the ways the services write to Postgres.
+
+Compares, on a scratch table shaped like `schemes`:
+  - cursor.executemany (what /schemes/predict used to do)
+  - execute_values via models.db.bulk_insert
+  - COPY via models.db.copy_rows
+  - per-request single-row upserts vs models.db.upsert_rows on a `tax`-like table
+  - WriteBehindWriter.submit throughput (request-side cost) and time to drain
+
+Run from the backend directory against a local Postgres:
+    DATABASE_URL=postgresql://localhost/prajaseva python -m benchmarks.bulk_write --rows 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import psycopg2
+
+from models import db
+
+SCRATCH_SCHEMES = "bench_schemes"
+SCRATCH_TAX = "bench_tax"
+
+
+def _setup(cursor):
+    cursor.execute(f"DROP TABLE IF EXISTS {SCRATCH_SCHEMES}, {SCRATCH_TAX}")
+    cursor.execute(f"CREATE TABLE {SCRATCH_SCHEMES} (user_id TEXT, scheme_id TEXT, scheme_name TEXT)")
+    cursor.execute(
+        f"CREATE TABLE {SCRATCH_TAX} (user_id TEXT PRIMARY KEY, tax_old NUMERIC, tax_new NUMERIC, "
+        "notes TEXT, generated_at TIMESTAMPTZ)"
+    )
+
+
+def _timed(conn, label, rows, fn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"TRUNCATE {SCRATCH_SCHEMES}, {SCRATCH_TAX}")
+    conn.commit()
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        fn(cursor)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {rows:>8} rows  {elapsed * 1000:>9.1f} ms  {rows / elapsed:>12,.0f} rows/s")
+    return rows / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bulk write strategies against Postgres.")
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args(argv)
+    n = args.rows
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    with conn.cursor() as cursor:
+        _setup(cursor)
+    conn.commit()
+
+    scheme_rows = [(f"user{i // 50}", f"C{i % 700:03d}", f"Scheme {i % 700}") for i in range(n)]
+    tax_rows = [(f"user{i}", 1000.0 + i, 900.0 + i, "[]") for i in range(n)]
+    tax_cols = ["user_id", "tax_old", "tax_new", "notes"]
+    now = {"generated_at": "NOW()"}
+
+    print(f"\n📦 Inserts ({SCRATCH_SCHEMES})")
+    _timed(conn, "executemany", n, lambda c: c.executemany(
+        f"INSERT INTO {SCRATCH_SCHEMES} (user_id, scheme_id, scheme_name) VALUES (%s, %s, %s)", scheme_rows))
+    _timed(conn, "bulk_insert (execute_values)", n, lambda c: db.bulk_insert(
+        c, SCRATCH_SCHEMES, ["user_id", "scheme_id", "scheme_name"], scheme_rows))
+    _timed(conn, "copy_rows (COPY)", n, lambda c: db.copy_rows(
+        c, SCRATCH_SCHEMES, ["user_id", "scheme_id", "scheme_name"], scheme_rows))
+
+    print(f"\n🔁 Upserts ({SCRATCH_TAX})")
+    single = (f"INSERT INTO {SCRATCH_TAX} (user_id, tax_old, tax_new, notes, generated_at) VALUES (%s, %s, %s, %s, NOW()) "
+              "ON CONFLICT (user_id) DO UPDATE SET tax_old = EXCLUDED.tax_old, tax_new = EXCLUDED.tax_new, "
+              "notes = EXCLUDED.notes, generated_at = NOW()")
+
+    def one_per_request(cursor):
+        for row in tax_rows:
+            cursor.execute(single, row)
+    _timed(conn, "single-row upsert per request", n, one_per_request)
+    _timed(conn, "upsert_rows (execute_values)", n, lambda c: db.upsert_rows(
+        c, SCRATCH_TAX, tax_cols, tax_rows, key="user_id", sql_values=now))
+
+    print("\n⏳ Write-behind")
+    with tempfile.TemporaryDirectory() as journal_dir:
+        for fsync in (True, False):
+            writer = db.WriteBehindWriter(SCRATCH_TAX, tax_cols, key="user_id", sql_values=now,
+                                          max_queue=n + 1, journal_dir=Path(journal_dir), fsync=fsync)
+            start = time.perf_counter()
+            accepted = sum(writer.submit(row) for row in tax_rows)
+            submit_s = time.perf_counter() - start
+            writer.close()
+            total_s = time.perf_counter() - start
+            print(f"{'submit (fsync=' + str(fsync) + ')':<34} {accepted:>8} rows  {submit_s * 1000:>9.1f} ms  "
+                  f"{accepted / submit_s:>12,.0f} rows/s   (drained after {total_s * 1000:.1f} ms)")
+            db._writers.remove(writer)
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SCRATCH_SCHEMES}, {SCRATCH_TAX}")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/dataset_formats.py
+"""
+Load time and size of the training datasets as CSV vs Parquet vs Feather.
+
+The committed tax / wealth CSVs are scaled up by repetition (--scale) so the
+numbers reflect a realistically sized training set. For each format it reports
+file size, a full typed load, a column-subset load and chunked-read throughput.
+
+Run from the backend directory:
+    python -m benchmarks.dataset_formats --scale 50
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from models.datasets import iter_dataset, read_dataset, write_dataset
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+SUBSETS = {
+    "tax": ["age", "annual_income", "is_salaried", "best_regime"],
+    "wealth": ["user_age", "risk_level", "recommended_scheme"],
+}
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(kind, scale, repeat, tmp):
+    source = read_dataset(MODELS_DIR / f"{kind}_model" / "training_dataset.csv", kind)
+    df = pd.concat([source] * scale, ignore_index=True)
+    print(f"\n📊 {kind}: {len(df):,} rows x {df.shape[1]} columns")
+    print(f"{'format':<10} {'size MB':>9} {'full ms':>9} {'subset ms':>10} {'chunked rows/s':>16}")
+
+    for suffix in (".csv", ".parquet", ".feather"):
+        path = tmp / f"{kind}{suffix}"
+        write_dataset(df, path, kind)
+        full = _best_of(lambda: read_dataset(path, kind), repeat)
+        subset = _best_of(lambda: read_dataset(path, kind, columns=SUBSETS[kind]), repeat)
+        chunked = _best_of(lambda: sum(len(c) for c in iter_dataset(path, kind, batch_size=50_000)), repeat)
+        print(f"{suffix[1:]:<10} {path.stat().st_size / 1e6:>9.2f} {full * 1000:>9.1f} "
+              f"{subset * 1000:>10.1f} {len(df) / chunked:>16,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare dataset storage formats.")
+    parser.add_argument("--scale", type=int, default=50, help="repeat the committed datasets this many times")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in ("tax", "wealth"):
+            bench(kind, args.scale, args.repeat, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# benchmarks/db_queries.py
+"""
+Latency of the services' hot queries at --rows rows, before and after the indexes
+of migrations/ (models/migrate.py).
+
+A scratch schema (bench_queries, dropped afterwards unless --keep) is migrated to
+version 1 (tables only) and filled server side with generate_series:
+- tax_input: --rows rows, 4 inputs per user (the latest one is what /predict_tax reads),
+- wealth_input: --rows rows, 2 per user,
+- schemes: --rows rows, 10 schemes per user,
+- tax: one result row per tax user (the upsert target).
+
+Then, for random existing users, each query is timed as the services used to send
+it (SELECT *, plain statement) and as they send it now (only the needed columns, a
+prepared statement from models/queries.py), before and after migrating to the
+latest version, followed by the EXPLAIN check of `python -m models.migrate --check`.
+
+Run from the backend directory against a local Postgres:
+    DATABASE_URL=postgresql://localhost/prajaseva python -m benchmarks.db_queries --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+import psycopg2
+
+from models import db
+from models.migrate import check_plans, migrate
+from models.queries import LATEST_TAX_INPUT, LATEST_WEALTH_INPUT, STORED_SCHEME_IDS
+
+SCHEMA = "bench_queries"
+
+LEGACY = {
+    "latest_tax_input": "SELECT * FROM tax_input WHERE user_id = %s ORDER BY created_at DESC LIMIT 1",
+    "latest_wealth_input": "SELECT * FROM wealth_input WHERE user_id = %s",
+    "stored_scheme_ids": "SELECT scheme_id FROM schemes WHERE user_id = %s",
+}
+STATEMENTS = {s.name: s for s in (LATEST_TAX_INPUT, LATEST_WEALTH_INPUT, STORED_SCHEME_IDS)}
+
+
+def fill(cursor, rows: int) -> dict:
+    users = {"tax_input": rows // 4, "wealth_input": rows // 2, "schemes": rows // 10}
+    cursor.execute(f"""
+        INSERT INTO tax_input (user_id, age, annual_income, is_salaried, investment_80c, investment_80d,
+                               home_loan_interest, education_loan_interest, donations_80g, other_deductions, created_at)
+        SELECT 'u-' || (g % {users['tax_input']}), 20 + g % 50, 300000 + (g * 7919) % 4000000, g % 3 > 0,
+               (g * 31) % 150000, (g * 17) % 50000, 0, 0, 0, 0, NOW() - (g || ' seconds')::interval
+        FROM generate_series(1::bigint, {rows}) g""")
+    cursor.execute(f"""
+        INSERT INTO wealth_input (user_id, user_age, retirement_age, current_savings, monthly_investment,
+                                  expected_return, risk_tolerance, liquidity, annual_step_up, created_at)
+        SELECT 'u-' || (g % {users['wealth_input']}), 25 + g % 30, 60, (g * 13) % 2000000, 5000 + g % 50000,
+               8 + g % 6, (ARRAY['Low', 'Medium', 'High'])[1 + g % 3], (ARRAY['Low', 'Medium', 'High'])[1 + g % 3],
+               g % 10, NOW() - (g || ' seconds')::interval
+        FROM generate_series(1::bigint, {rows}) g""")
+    cursor.execute(f"""
+        INSERT INTO schemes (user_id, scheme_id, scheme_name)
+        SELECT 'u-' || (g / 10), 'S' || lpad((g % 10 + (g / 10) % 700)::text, 3, '0'), 'Scheme ' || g % 721
+        FROM generate_series(0::bigint, {rows} - 1) g""")
+    cursor.execute(f"""
+        INSERT INTO tax (user_id, tax_old, tax_new, recommended_regime, tax_saving, notes, generated_at)
+        SELECT 'u-' || g, 0, 0, 'New Regime', 0, '[]', NOW() FROM generate_series(0, {users['tax_input']} - 1) g""")
+    cursor.execute("ANALYZE")
+    return users
+
+
+def timed(cursor, run, samples: int) -> tuple:
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        run(cursor)
+        cursor.fetchall()
+        times.append((time.perf_counter() - start) * 1e3)
+    times.sort()
+    return statistics.median(times), times[min(int(len(times) * 0.99), len(times) - 1)]
+
+
+def measure(conn, users: dict, samples: int, rng: random.Random) -> None:
+    tables = {"latest_tax_input": "tax_input", "latest_wealth_input": "wealth_input", "stored_scheme_ids": "schemes"}
+    print(f"{'query':<22}{'SELECT * p50':>14}{'p99':>9}{'prepared p50':>14}{'p99':>9}   ms")
+    with conn.cursor() as cursor:
+        for name, sql in LEGACY.items():
+            ids = [f"u-{rng.randrange(users[tables[name]])}" for _ in range(samples)]
+            it = iter(ids * 2)
+            legacy = timed(cursor, lambda c: c.execute(sql, (next(it),)), samples)
+            it = iter(ids * 2)
+            prepared = timed(cursor, lambda c: db.execute_prepared(c, STATEMENTS[name], (next(it),)), samples)
+            print(f"{name:<22}{legacy[0]:>14.3f}{legacy[1]:>9.3f}{prepared[0]:>14.3f}{prepared[1]:>9.3f}")
+        row = ("u-0", 1.0, 2.0, "[]")
+        upsert = timed(cursor, lambda c: (db.upsert_rows(c, "tax", ["user_id", "tax_old", "tax_new", "notes"], [row],
+                                                         key="user_id", sql_values={"generated_at": "NOW()"}),
+                                          c.execute("SELECT 1")), samples)
+        print(f"{'tax upsert':<22}{upsert[0]:>14.3f}{upsert[1]:>9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot queries before/after the migrations' indexes.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--before-samples", type=int, default=20, help="samples per query without indexes (seq scans)")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCHEMA} schema")
+    args = parser.parse_args(argv)
+
+    db.DB_PREPARED = True   # one connection for the whole run, as a pooled one would be
+    rng = random.Random(0)
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+            cursor.execute(f"SET search_path TO {SCHEMA}")
+        migrate(conn, target=1)
+        start = time.perf_counter()
+        with conn.cursor() as cursor:
+            users = fill(cursor, args.rows)
+        print(f"📦 {args.rows:,} rows per input table in {time.perf_counter() - start:.1f} s")
+
+        print("\n--- Before (tables only) ---")
+        measure(conn, users, args.before_samples, rng)
+        check_plans(conn)
+        conn.autocommit = True
+
+        start = time.perf_counter()
+        migrate(conn)
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        print(f"🔧 Migrated in {time.perf_counter() - start:.1f} s")
+
+        print("\n--- After (latest migration) ---")
+        measure(conn, users, args.samples, rng)
+        problems = check_plans(conn)
+    finally:
+        if not args.keep:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/eligibility_cache.py
+"""
+Exactness, hit ratio and latency of the schemes eligibility cache
+(schemes_model/eligibility_cache.py).
+
+Exactness: for each synthetic profile (fixtures.synthetic_profiles), another age and
+income are drawn inside the same breakpoint intervals; both profiles must get the
+same prediction from the model (the cache would serve one's result for the other).
+
+Hit ratio: --requests profiles drawn from a population of --users profiles (users
+re-submitting, plus different users landing in the same intervals), replayed through
+the cache with the same predict + filter as /schemes/predict.
+
+Run from the backend directory (needs the trained .pkl artifacts):
+    python -m benchmarks.eligibility_cache --profiles 2000 --users 5000 --requests 20000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from models.encoding import array_input
+from models.registry import registry
+from models.schemes_model import api  # noqa: F401  (registers the schemes model)
+from models.schemes_model.rules import eligible_from_prediction
+
+from .fixtures import INPUT_COLUMNS, synthetic_profiles, user_ids
+from .serving_encoder import schemes_record
+
+
+def same_interval(rng: random.Random, edges, value: int) -> int:
+    """A random integer in the breakpoint interval containing `value`."""
+    i = np.searchsorted(edges, value, side="right")
+    low = edges[i - 1] if i > 0 else min(value, 0) - 1_000
+    high = edges[i] - 1 if i < len(edges) else value + 1_000_000
+    return rng.randint(int(low), int(high))
+
+
+def check_exactness(loaded, records, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    cache, encoder = loaded.cache, loaded.encoder
+    twins = []
+    for record in records:
+        twin = dict(record)
+        for column, edges in cache.edges.items():
+            twin[column] = same_interval(rng, edges, record[column])
+        assert cache.key(twin) == cache.key(record)
+        twins.append(twin)
+    with array_input():
+        original = encoder.estimator.predict(np.vstack([encoder.encode(r) for r in records]))
+        moved = encoder.estimator.predict(np.vstack([encoder.encode(r) for r in twins]))
+    return int((original != moved).any(axis=1).sum())
+
+
+def eligible(loaded, record) -> list:
+    """Predict + filter, as the endpoint does on a miss."""
+    with array_input():
+        prediction = loaded.encoder.estimator.predict(loaded.encoder.encode(record))[0]
+    return eligible_from_prediction(prediction, loaded.scheme_columns, loaded.rules, record["state"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the schemes eligibility cache.")
+    parser.add_argument("--profiles", type=int, default=2000, help="profiles for the exactness check")
+    parser.add_argument("--users", type=int, default=5000, help="distinct profiles in the replayed traffic")
+    parser.add_argument("--requests", type=int, default=20000, help="replayed requests")
+    args = parser.parse_args(argv)
+
+    loaded = registry.active("schemes").bundle
+    if loaded.cache is None:
+        raise SystemExit("❌ The loaded schemes model cannot be cached exactly (see eligibility_cache.py).")
+    print(f"version {loaded.cache.version}: " + ", ".join(f"{len(e) + 1} {c} intervals" for c, e in loaded.cache.edges.items()))
+
+    rows = synthetic_profiles(user_ids(max(args.profiles, args.users), prefix="cache"), seed=1)["schemes_input"]
+    records = [schemes_record(dict(zip(INPUT_COLUMNS["schemes_input"], row))) for row in rows]
+    mismatches = check_exactness(loaded, records[:args.profiles])
+    print(f"{'✅' if not mismatches else '❌'} {mismatches} mismatches for {args.profiles} profiles moved within their intervals")
+
+    rng = random.Random(2)
+    traffic = [rng.choice(records[:args.users]) for _ in range(args.requests)]
+    cache = loaded.cache
+    cache.clear()
+    cache.hits = cache.misses = 0
+    hit_times, miss_times = [], []
+    for record in traffic:
+        start = time.perf_counter()
+        key = cache.key(record)
+        result = cache.get(key)
+        if result is None:
+            cache.put(key, eligible(loaded, record))
+            miss_times.append(time.perf_counter() - start)
+        else:
+            hit_times.append(time.perf_counter() - start)
+    print(f"hit ratio {cache.hits / args.requests:.1%} over {args.requests} requests from {args.users} profiles "
+          f"({len(cache)} entries)")
+    print(f"hit  : mean {np.mean(hit_times) * 1e3:8.3f} ms")
+    print(f"miss : mean {np.mean(miss_times) * 1e3:8.3f} ms")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/fixtures.py
+"""
+Local Postgres fixtures shared by the benchmark and load-test scripts.
+
+ensure_schema() applies the backend's migrations (models/migrate.py) to a scratch
+database, so the services run against the same tables, keys and indexes as in
+production; plus helpers to seed synthetic users and mint tokens the services accept.
+"""
+
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+from jose import jwt
+
+from models import auth
+from models.datasets import read_dataset, resolve_dataset
+from models.db import bulk_insert
+from models.migrate import migrate
+from models.schemes_model.generate_dataset import (
+    VALID_CASTES, VALID_DISABILITIES, VALID_EDUCATIONS, VALID_EMPLOYMENTS, VALID_GENDERS,
+    load_rules as load_scheme_rules,
+)
+
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+TAX_INPUT_COLUMNS = ["user_id", "age", "annual_income", "is_salaried", "investment_80c", "investment_80d",
+                     "home_loan_interest", "education_loan_interest", "donations_80g", "other_deductions"]
+INPUT_COLUMNS = {
+    "tax_input": TAX_INPUT_COLUMNS,
+    "schemes_input": ["user_id", "age", "gender", "state", "caste", "education_level", "employment_type",
+                      "income", "disability_status"],
+    "wealth_input": ["user_id", "user_age", "retirement_age", "current_savings", "monthly_investment",
+                     "expected_return", "risk_tolerance", "liquidity", "annual_step_up"],
+}
+
+
+def ensure_schema(conn) -> None:
+    autocommit = conn.autocommit
+    migrate(conn)
+    conn.autocommit = autocommit
+
+
+def user_ids(count: int, prefix: str = "bench-user") -> List[str]:
+    return [f"{prefix}-{i}" for i in range(count)]
+
+
+def synthetic_profiles(ids: List[str], seed: int = 0) -> Dict[str, list]:
+    """
+    Input rows for `ids`, drawn from the same distributions as the training data:
+    - tax_input: rows resampled from the tax training dataset
+    - schemes_input: half targeted at a random scheme's rule, half uniform over the
+      valid options (as schemes_model/generate_dataset.py does)
+    - wealth_input: age / amount / horizon ranges and the risk / liquidity levels of
+      wealth_model/generate_dataset.py
+    """
+    rng = random.Random(seed)
+    tax_data = read_dataset(resolve_dataset(MODELS_DIR / "tax_model"), "tax", columns=TAX_INPUT_COLUMNS[1:])
+    tax_records = tax_data.to_dict("records")
+    scheme_rules = load_scheme_rules(MODELS_DIR / "schemes_model" / "schemes_rules.csv").to_dict("records")
+    states = sorted({r["state"] for r in scheme_rules if r["state"] != "Any"})
+    wealth_rules = pd.read_csv(MODELS_DIR / "wealth_model" / "schemes_rules.csv")[["risk_level", "liquidity"]].to_dict("records")
+
+    def pick(allowed: str, valid: List[str]) -> str:
+        return rng.choice(allowed.split(",")).strip() if allowed.lower() != "any" else rng.choice(valid)
+
+    rows = {"tax_input": [], "schemes_input": [], "wealth_input": []}
+    for user_id in ids:
+        tax = rng.choice(tax_records)
+        rows["tax_input"].append((user_id, int(tax["age"]), int(tax["annual_income"]), bool(tax["is_salaried"]),
+                                  *(int(tax[c]) for c in TAX_INPUT_COLUMNS[4:])))
+
+        if rng.random() < 0.5:
+            rule = rng.choice(scheme_rules)
+            age = rng.randint(rule["age_min"], min(rule["age_max"], 100))
+            income = rng.randint(rule["annual_income_min"], min(rule["annual_income_max"], 5_000_000))
+            state = rule["state"] if rule["state"] != "Any" else rng.choice(states)
+            profile = (pick(rule["allowed_genders"], VALID_GENDERS), pick(rule["allowed_castes"], VALID_CASTES),
+                       pick(rule["education_levels"], VALID_EDUCATIONS), pick(rule["allowed_employments"], VALID_EMPLOYMENTS),
+                       pick(rule["disability_allowed"], VALID_DISABILITIES))
+        else:
+            age, income, state = rng.randint(0, 100), rng.randint(0, 2_000_000), rng.choice(states)
+            profile = (rng.choice(VALID_GENDERS), rng.choice(VALID_CASTES), rng.choice(VALID_EDUCATIONS),
+                       rng.choice(VALID_EMPLOYMENTS), rng.choice(VALID_DISABILITIES))
+        gender, caste, education, employment, disability = profile
+        rows["schemes_input"].append((user_id, age, gender, state, caste, education, employment, income, disability == "Yes"))
+
+        user_age, years = rng.randint(18, 70), rng.randint(1, 50)
+        levels = rng.choice(wealth_rules)
+        rows["wealth_input"].append((user_id, user_age, user_age + years, rng.randint(0, 2_000_000),
+                                     round(rng.randint(10, 1_000_000) / 12, 2), round(rng.uniform(6, 14), 2),
+                                     levels["risk_level"], levels["liquidity"], round(rng.uniform(0, 10), 1)))
+    return rows
+
+
+def seed_users(conn, ids: List[str], seed: int = 0) -> None:
+    """Replace the input rows of `ids` with synthetic profiles."""
+    rows = synthetic_profiles(ids, seed)
+    with conn.cursor() as cursor:
+        for table, columns in INPUT_COLUMNS.items():
+            cursor.execute(f"DELETE FROM {table} WHERE user_id = ANY(%s)", (ids,))
+            bulk_insert(cursor, table, columns, rows[table])
+    conn.commit()
+
+
+def load_profiles(conn, ids: List[str]) -> Dict[str, dict]:
+    """schemes_input rows as /schemes/predict request bodies, keyed by user id."""
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(INPUT_COLUMNS['schemes_input'])} FROM schemes_input WHERE user_id = ANY(%s)", (ids,))
+        return {row[0]: dict(zip(INPUT_COLUMNS["schemes_input"][1:], row[1:])) for row in cursor.fetchall()}
+
+
+def mint_token(user_id: str, ttl: int = 3600) -> str:
+    """A token shaped like the frontend's (lib/auth.ts): HS256 with a `userId` claim."""
+    secret = auth.JWT_SECRET or os.environ["JWT_SECRET"]
+    return jwt.encode({"userId": user_id, "exp": int(time.time()) + ttl}, secret, algorithm=auth.ALGORITHM)
@@ -0,0 +1,105 @@
+# benchmarks/inference_pool.py
+"""
+Tail latency at saturation with in-process inference vs the inference pool
+(models/inference.py, INFERENCE_POOL=1).
+
+For each mode it starts gunicorn (benchmarks/worker_scaling.start_server) and runs:
+  1. a closed loop of --clients clients over the prediction mix, enough to keep
+     every worker busy, reporting req/s and p50/p99;
+  2. alongside it, a prober hitting the cheap GET / every --probe-interval seconds.
+     Its p50/p99 show how responsive the web tier stays while models are running:
+     with in-process inference a probe waits for the GIL behind tree walks, with
+     the pool it only competes for the event loop.
+
+Both loads share the same CPUs as the pool processes, so on a host with fewer
+cores than web workers + pool workers the pool can only move work around, not
+add capacity; compare the probe percentiles rather than the throughput there.
+
+Run from the backend directory (needs the model artifacts and a local Postgres):
+    DATABASE_URL=... JWT_SECRET=... python -m benchmarks.inference_pool --workers 2 --pool-workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import time
+from pathlib import Path
+
+import httpx
+import psycopg2
+
+from benchmarks import fixtures
+from benchmarks.loadgen import parse_mix, percentile
+from benchmarks.worker_scaling import closed_loop, start_server
+
+
+async def probe(port: int, interval: float, duration: float) -> dict:
+    latencies = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        stop = time.perf_counter() + duration
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            await client.get("/")
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    latencies.sort()
+    return {"probe_p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+            "probe_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "probe_max_ms": round(latencies[-1] * 1000, 2) if latencies else None}
+
+
+async def saturate(port: int, users, tokens, profiles, mix, clients: int, duration: float, interval: float) -> dict:
+    load, probes = await asyncio.gather(closed_loop(port, users, tokens, profiles, mix, clients, duration),
+                                        probe(port, interval, duration))
+    return {**load, **probes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare in-process inference with the inference pool.")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--pool-workers", type=int, default=4,
+                        help="INFERENCE_WORKERS: pool processes on the host, split across the web workers")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("tax=2,schemes=2,wealth=2"))
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args(argv)
+
+    users = fixtures.user_ids(args.users, prefix="pool-user")
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    fixtures.ensure_schema(conn)
+    fixtures.seed_users(conn, users)
+    profiles = fixtures.load_profiles(conn, users)
+    conn.close()
+    tokens = {u: {"Authorization": f"Bearer {fixtures.mint_token(u)}"} for u in users}
+
+    rows = []
+    for pool in (False, True):
+        os.environ.update(INFERENCE_POOL="1" if pool else "0", INFERENCE_WORKERS=str(args.pool_workers))
+        server = start_server(args.workers, True, args.port)
+        try:
+            # Warm up: starts the pools (spawn + model load) before measuring
+            asyncio.run(closed_loop(args.port, users, tokens, profiles, args.mix, args.workers * 2, 5))
+            result = asyncio.run(saturate(args.port, users, tokens, profiles, args.mix, args.clients,
+                                          args.duration, args.probe_interval))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        row = {"pool": pool, **result}
+        rows.append(row)
+        print(f"{'pool' if pool else 'in-process':<11}: {row['rps']:>7.1f} req/s  p50 {row['p50_ms']:>7.1f} ms  "
+              f"p99 {row['p99_ms']:>7.1f} ms  errors {row['error_rate']:.1%}  | GET / p50 {row['probe_p50_ms']:.1f} ms  "
+              f"p99 {row['probe_p99_ms']:.1f} ms  max {row['probe_max_ms']:.1f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps({"cores": os.cpu_count(), "workers": args.workers,
+                                         "pool_workers": args.pool_workers, "rows": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# benchmarks/loadgen.py
+"""
+Synthetic load generator for the combined app (models/app.py).
+
+1. Seeds Postgres with N synthetic users (tax_input, wealth_input, schemes_input)
+   drawn from the training-data distributions (see benchmarks/fixtures.py).
+2. Mints a valid JWT (`userId` claim) per user.
+3. Drives a weighted mix of /tax/predict_tax, /schemes/predict, /wealth/predict and
+   /chat/chat at a target request rate (open loop: requests are scheduled on a fixed
+   clock whether or not earlier ones finished, so a slow server cannot slow the
+   generator down and hide its own latency).
+4. Reports per endpoint: throughput, error rate, status codes and latency
+   percentiles. Latency is measured from the scheduled start, so queueing inside
+   the generator counts against the server the same way it would for real users.
+
+Run from the backend directory, against a running server:
+    DATABASE_URL=... JWT_SECRET=... python -m benchmarks.loadgen --users 1000 --rps 50 --duration 60 \\
+        --url http://localhost:8000 --mix tax=4,schemes=2,wealth=3,chat=1
+
+or in-process (no server; the ASGI app is called directly, useful for quick checks):
+    python -m benchmarks.loadgen --in-process --rps 20 --duration 10 --mix tax=1,wealth=1
+
+The chat endpoint calls the real LLM: keep its weight low (or 0) unless that is what you
+are sizing.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import psycopg2
+
+from benchmarks import fixtures
+
+QUESTIONS = [
+    "What is the difference between the old and new tax regime?",
+    "How does the Public Provident Fund work?",
+    "Which documents are needed to apply for a PM Kisan scheme?",
+    "What is Section 80C?",
+    "How do Sukanya Samriddhi accounts work?",
+]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("tax", "schemes", "wealth", "chat"):
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}' in --mix")
+        mix[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def build_request(endpoint: str, user_id: str, headers: dict, profiles: Dict[str, dict], rng: random.Random):
+    if endpoint == "tax":
+        return "POST", "/tax/predict_tax", {"headers": headers}
+    if endpoint == "wealth":
+        return "POST", "/wealth/predict", {"headers": headers}
+    if endpoint == "schemes":
+        return "POST", "/schemes/predict", {"headers": headers, "json": profiles[user_id]}
+    return "POST", "/chat/chat", {"headers": headers, "json": {"question": rng.choice(QUESTIONS)}}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+async def run_load(client: httpx.AsyncClient, users: List[str], tokens: Dict[str, dict], profiles: Dict[str, dict],
+                   mix: Dict[str, float], rps: float, duration: float, max_inflight: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    endpoints, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    semaphore = asyncio.Semaphore(max_inflight)
+    tasks = []
+
+    async def one(endpoint: str, scheduled: float, method: str, path: str, kwargs: dict):
+        async with semaphore:
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = e.__class__.__name__
+        latencies[endpoint].append(time.perf_counter() - scheduled)
+        statuses[endpoint][status] += 1
+
+    start = time.perf_counter()
+    total = int(rps * duration)
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint = rng.choices(endpoints, weights)[0]
+        user_id = rng.choice(users)
+        method, path, kwargs = build_request(endpoint, user_id, tokens[user_id], profiles, rng)
+        tasks.append(asyncio.create_task(one(endpoint, scheduled, method, path, kwargs)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    report = {}
+    for endpoint in endpoints:
+        values = sorted(latencies[endpoint])
+        count = len(values)
+        ok = sum(n for status, n in statuses[endpoint].items() if status.startswith("2"))
+        report[endpoint] = {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2),
+            "error_rate": round(1 - ok / count, 4) if count else 0.0,
+            "statuses": dict(statuses[endpoint]),
+            "mean_ms": round(statistics.mean(values) * 1000, 2) if values else None,
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p90_ms": round(percentile(values, 0.90) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else None,
+        }
+    return {"elapsed_s": round(elapsed, 2), "target_rps": rps, "achieved_rps": round(len(tasks) / elapsed, 2),
+            "endpoints": report}
+
+
+def print_report(result: dict) -> None:
+    print(f"\n📊 {result['achieved_rps']} req/s achieved (target {result['target_rps']}) over {result['elapsed_s']}s")
+    print(f"{'endpoint':<10} {'reqs':>7} {'req/s':>8} {'errors':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    for name, r in result["endpoints"].items():
+        print(f"{name:<10} {r['requests']:>7} {r['throughput_rps']:>8.1f} {r['error_rate']:>8.2%} {r['p50_ms']:>9.1f} "
+              f"{r['p90_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}  {r['statuses']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive synthetic traffic at the PrajaSeva backend.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="call models.app directly instead of --url")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse users seeded by an earlier run")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("tax=4,schemes=2,wealth=3,chat=1"))
+    parser.add_argument("--max-inflight", type=int, default=256, help="client-side cap on concurrent requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", type=Path, help="write the report here")
+    args = parser.parse_args(argv)
+
+    users = fixtures.user_ids(args.users, prefix="load-user")
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    fixtures.ensure_schema(conn)
+    if not args.skip_seed:
+        start = time.perf_counter()
+        fixtures.seed_users(conn, users, seed=args.seed)
+        print(f"🌱 Seeded {len(users)} users in {time.perf_counter() - start:.1f}s")
+    profiles = fixtures.load_profiles(conn, users)
+    conn.close()
+    ttl = int(args.duration) + 3600
+    tokens = {u: {"Authorization": f"Bearer {fixtures.mint_token(u, ttl=ttl)}"} for u in users}
+
+    if args.in_process:
+        from models.app import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://loadgen"
+    else:
+        transport, base_url = None, args.url
+
+    async def go():
+        limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+        async with httpx.AsyncClient(base_url=base_url, transport=transport, timeout=args.timeout, limits=limits) as client:
+            return await run_load(client, users, tokens, profiles, args.mix, args.rps, args.duration,
+                                  args.max_inflight, args.seed)
+
+    mix_text = ", ".join(f"{k}={v:g}" for k, v in args.mix.items())
+    print(f"🚀 {args.rps:g} req/s for {args.duration:g}s against {base_url} (mix {mix_text})")
+    result = asyncio.run(go())
+    print_report(result)
+    if args.json:
+        args.json.write_text(json.dumps({"args": {k: str(v) for k, v in vars(args).items()}, **result}, indent=2))
+        print(f"📄 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
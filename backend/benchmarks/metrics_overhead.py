@@ -0,0 +1,99 @@
+# benchmarks/metrics_overhead.py
+"""
+Cost of the latency instrumentation in models/metrics.py.
+
+  - stage() timer: enabled vs METRICS_ENABLED=0 (shared no-op) vs no timer at all
+  - a mounted sub-app with auth + three stages behind the root app, with and
+    without MetricsMiddleware (TestClient, so absolute numbers include the client)
+  - render() time for the resulting /metrics payload
+
+Run from the backend directory:
+    python -m benchmarks.metrics_overhead --calls 200000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from models import auth, metrics  # noqa: E402
+
+
+def _ns_per_call(fn, calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def _build_app(with_middleware):
+    service = FastAPI()
+
+    @service.get("/predict")
+    def predict(user_id: str = Depends(auth.get_current_user)):
+        for name in ("db_fetch", "features", "inference"):
+            with metrics.stage(name):
+                pass
+        return {"user_id": user_id}
+
+    root = FastAPI()
+    if with_middleware:
+        root.add_middleware(metrics.MetricsMiddleware)
+    root.mount("/svc", service)
+    return root
+
+
+def _request_us(client, headers, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client.get("/svc/predict", headers=headers)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark metrics instrumentation overhead.")
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    def bare():
+        pass
+
+    def timed():
+        with metrics.stage("bench"):
+            pass
+
+    print(f"\n⏱️  stage() timer ({args.calls} calls)")
+    print(f"{'no timer':<28} {_ns_per_call(bare, args.calls):>8.0f} ns/call")
+    metrics.METRICS_ENABLED = True
+    print(f"{'stage() enabled':<28} {_ns_per_call(timed, args.calls):>8.0f} ns/call")
+    metrics.METRICS_ENABLED = False
+    print(f"{'stage() METRICS_ENABLED=0':<28} {_ns_per_call(timed, args.calls):>8.0f} ns/call")
+
+    token = jwt.encode({"userId": "bench-user", "exp": int(time.time()) + 3600}, auth.JWT_SECRET, algorithm=auth.ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+    print(f"\n🌐 Mounted app with auth + 3 stages ({args.requests} requests)")
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        client = TestClient(_build_app(with_middleware=enabled))
+        client.get("/svc/predict", headers=headers)  # warm the token cache
+        p50, p99 = _request_us(client, headers, args.requests)
+        print(f"{'metrics ' + ('on' if enabled else 'off'):<28} p50 {p50:>8.1f} us   p99 {p99:>8.1f} us")
+
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"\n📄 render(): {len(text.splitlines())} lines in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print("\n".join(line for line in text.splitlines() if "_count" in line))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/response_layer.py
+"""
+Serialization time and bytes on the wire for the response layer (models/responses.py).
+
+Payloads are built the way the endpoints build them, typical and worst case:
+- wealth.predict: the yearly projection of formatted strings (--years, and
+  --worst-years, e.g. age 18 to 100) plus the top-5 schemes with numpy confidences;
+- schemes.predict: --schemes eligible schemes, and every scheme in schemes_rules.csv;
+- tax.what_if: a 10k-point grid (plain float lists).
+
+Serialization, per payload (mean of --repeat renders):
+- default   : jsonable_encoder + JSONResponse (FastAPI's path for a returned dict),
+- fast      : FastJSONResponse (orjson when installed),
+- fast/json : FastJSONResponse with orjson hidden (the json fallback).
+
+Wire size: raw, gzip (COMPRESS_GZIP_LEVEL) and brotli (COMPRESS_BROTLI_QUALITY, when
+the brotli package is installed), with the compression time.
+
+Run from the backend directory (no model artifacts or database needed):
+    python -m benchmarks.response_layer --repeat 200
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import responses
+from models.responses import COMPRESSORS, FastJSONResponse
+
+RULES_PATH = Path(__file__).resolve().parent.parent / "models" / "schemes_model" / "schemes_rules.csv"
+
+
+def wealth_payload(years: int, seed: int = 0) -> dict:
+    """As /wealth/predict builds it: one dict of formatted strings per year."""
+    rng = random.Random(seed)
+    corpus, annual_investment, rate, step_up = 250_000.0, 120_000.0, 11.5, 8.0
+    projection_data = []
+    for year in range(1, years + 1):
+        opening_cap = corpus
+        interest_earned = corpus * (rate / 100)
+        corpus += interest_earned + annual_investment
+        projection_data.append({
+            "year": year, "opening_capital": f"{opening_cap:,.2f}",
+            "annual_investment": f"{annual_investment:,.2f}", "interest_earned": f"{interest_earned:,.2f}",
+            "closing_capital": f"{corpus:,.2f}"
+        })
+        annual_investment *= (1 + step_up / 100)
+    probs = np.array(sorted((rng.random() for _ in range(5)), reverse=True))
+    return {
+        "projected_corpus": f"{corpus:,.2f}",
+        "inflation_adjusted_corpus": f"{corpus / 1.04 ** years:,.2f}",
+        "projection_data": projection_data,
+        "recommended_schemes": [{"scheme_name": f"Scheme {i}", "confidence": round(p, 4)} for i, p in enumerate(probs)],
+    }
+
+
+def schemes_payload(rules: pd.DataFrame, count: int) -> dict:
+    eligible = [{"id": row.scheme_id, "name": row.scheme_name} for row in rules.head(count).itertuples()]
+    return {"eligible_schemes": eligible, "count": len(eligible)}
+
+
+def what_if_payload(points: int) -> dict:
+    income = np.linspace(0, 5_000_000, points)
+    tax_old = np.maximum(income - 500_000, 0) * 0.3 * 1.04
+    tax_new = np.maximum(income - 1_200_000, 0) * 0.2 * 1.04
+    return {
+        "count": points,
+        "scenarios": {"annual_income": income.tolist()},
+        "tax_old": tax_old.tolist(), "tax_new": tax_new.tolist(), "saving_with_new": (tax_old - tax_new).tolist(),
+        "break_even": [1_200_000.0],
+    }
+
+
+def _mean_us(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON rendering and compression of responses.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--worst-years", type=int, default=82)
+    parser.add_argument("--schemes", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    rules = pd.read_csv(RULES_PATH)
+    payloads = {
+        f"wealth.predict {args.years}y": wealth_payload(args.years),
+        f"wealth.predict {args.worst_years}y": wealth_payload(args.worst_years),
+        f"schemes.predict {args.schemes}": schemes_payload(rules, args.schemes),
+        f"schemes.predict {len(rules)}": schemes_payload(rules, len(rules)),
+        "tax.what_if 10k": what_if_payload(10_000),
+    }
+    print(f"JSON encoder: {'orjson' if responses.orjson is not None else 'json (orjson not installed)'}; "
+          f"compressors: {', '.join(COMPRESSORS)}")
+
+    print(f"\n{'payload':<24}{'default us':>12}{'fast us':>10}{'fast/json us':>14}{'speedup':>9}")
+    for name, payload in payloads.items():
+        default = _mean_us(lambda: JSONResponse(jsonable_encoder(payload)), args.repeat)
+        fast = _mean_us(lambda: FastJSONResponse(payload), args.repeat)
+        orjson, responses.orjson = responses.orjson, None
+        try:
+            fallback = _mean_us(lambda: FastJSONResponse(payload), args.repeat)
+        finally:
+            responses.orjson = orjson
+        print(f"{name:<24}{default:>12.1f}{fast:>10.1f}{fallback:>14.1f}{default / fast:>8.1f}x")
+
+    print(f"\n{'payload':<24}{'raw B':>10}" + "".join(f"{e + ' B':>10}{e + ' us':>10}" for e in COMPRESSORS))
+    for name, payload in payloads.items():
+        body = FastJSONResponse(payload).body
+        line = f"{name:<24}{len(body):>10}"
+        for compress in COMPRESSORS.values():
+            line += f"{len(compress(body)):>10}{_mean_us(lambda: compress(body), max(args.repeat // 10, 5)):>10.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/serving_encoder.py
+"""
+Parity and per-request latency of the DataFrame-free serving encoder (models/encoding.py)
+against the fitted sklearn pipelines, for all three models.
+
+Parity: every synthetic profile (fixtures.synthetic_profiles, built into the model
+input exactly as the APIs do), plus copies with an unseen category in each
+categorical column, is predicted both ways; encoder + final estimator must give the
+same output (predict_proba for wealth) or raise the same error.
+
+Latency: one request at a time, features + predict, as the serving path runs it:
+- frame   : one-row DataFrame -> pipeline (the previous serving path)
+- encoder : encoder.encode(record) -> final estimator
+with the encode step also timed on its own.
+
+Run from the backend directory (needs the trained .pkl artifacts):
+    python -m benchmarks.serving_encoder --profiles 2000 --requests 300
+"""
+
+import argparse
+import statistics
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models.encoding import FeatureEncoder, array_input, serving_encoder
+from models.tax_model.tax_utils import NEW_STD_DEDUCTION
+
+from .fixtures import INPUT_COLUMNS, MODELS_DIR, synthetic_profiles, user_ids
+
+TAX_FEATURES = ["age", "annual_income", "is_salaried", "investment_80c", "investment_80d", "home_loan_interest",
+                "education_loan_interest", "donations_80g", "other_deductions", "standard_deduction"]
+
+
+def schemes_record(row: dict) -> dict:
+    return {"age": row["age"], "annual_income": row["income"], "state": row["state"], "gender": row["gender"],
+            "caste": row["caste"], "employment_type": row["employment_type"],
+            "disability_status": "Yes" if row["disability_status"] else "No", "education_level": row["education_level"]}
+
+
+def wealth_record(row: dict) -> dict:
+    return {"user_age": row["user_age"], "investment_amount": row["monthly_investment"] * 12,
+            "years_to_invest": row["retirement_age"] - row["user_age"], "risk_level": row["risk_tolerance"],
+            "liquidity": row["liquidity"]}
+
+
+def tax_record(row: dict) -> dict:
+    record = {c: row[c] for c in TAX_FEATURES[:-1]}
+    record["is_salaried"] = int(row["is_salaried"])
+    record["standard_deduction"] = NEW_STD_DEDUCTION if row["is_salaried"] else 0
+    return record
+
+
+MODELS = {
+    # name: (artifact, input table, record builder, method)
+    "schemes": ("schemes_model/schemes_model.pkl", "schemes_input", schemes_record, "predict"),
+    "wealth": ("wealth_model/investment_model.pkl", "wealth_input", wealth_record, "predict_proba"),
+    "tax": ("tax_model/tax_model.pkl", "tax_input", tax_record, "predict"),
+}
+
+
+def outcome(call):
+    try:
+        return call()
+    except ValueError as exc:
+        return type(exc)
+
+
+def same(a, b) -> bool:
+    if isinstance(a, type) or isinstance(b, type):
+        return a is b
+    return np.array_equal(a, b)
+
+
+def unseen_variants(records, encoder):
+    """Each record once more with an unseen category in one of the categorical columns (round-robin)."""
+    columns = [column for column, _, _ in getattr(encoder, "categorical", [])]
+    return [{**r, columns[i % len(columns)]: "__unseen__"} for i, r in enumerate(records)] if columns else []
+
+
+def check_parity(model, encoder, records, method, columns) -> int:
+    mismatches = 0
+    for record in records:
+        expected = outcome(lambda: getattr(model, method)(pd.DataFrame([record], columns=columns)))
+        with array_input():
+            actual = outcome(lambda: getattr(encoder.estimator, method)(encoder.encode(record)))
+        mismatches += not same(expected, actual)
+    return mismatches
+
+
+def latency(call, records) -> list:
+    times = []
+    for record in records:
+        start = time.perf_counter()
+        call(record)
+        times.append((time.perf_counter() - start) * 1e3)
+    return times
+
+
+def summary(times) -> str:
+    q = statistics.quantiles(times, n=100)
+    return f"p50 {q[49]:8.3f} ms  p99 {q[98]:8.3f} ms  mean {statistics.fmean(times):8.3f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the serving feature encoder.")
+    parser.add_argument("--profiles", type=int, default=2000, help="synthetic profiles for the parity check")
+    parser.add_argument("--requests", type=int, default=300, help="timed requests per path")
+    args = parser.parse_args(argv)
+
+    profiles = synthetic_profiles(user_ids(args.profiles, prefix="encoder"), seed=0)
+    failed = False
+    for name, (artifact, table, build, method) in MODELS.items():
+        model = joblib.load(MODELS_DIR / artifact)
+        columns = TAX_FEATURES if name == "tax" else None
+        encoder = serving_encoder(model, columns=columns)
+        records = [build(dict(zip(INPUT_COLUMNS[table], row))) for row in profiles[table]]
+        kind = type(encoder).__name__
+        if not isinstance(encoder, FeatureEncoder):
+            print(f"⚠️ {name}: no FeatureEncoder for this model, serving falls back to {kind}")
+
+        variants = unseen_variants(records, encoder)
+        mismatches = check_parity(model, encoder, records + variants, method, columns)
+        failed |= mismatches > 0
+        print(f"{'✅' if not mismatches else '❌'} {name:<8} {kind}: {mismatches} mismatches in "
+              f"{len(records)} profiles + {len(variants)} unseen-category variants")
+
+        timed = records[:args.requests]
+        frame = latency(lambda r: getattr(model, method)(pd.DataFrame([r], columns=columns)), timed)
+        with array_input():
+            fast = latency(lambda r: getattr(encoder.estimator, method)(encoder.encode(r)), timed)
+        encode = latency(encoder.encode, timed)
+        print(f"   frame   : {summary(frame)}")
+        print(f"   encoder : {summary(fast)}  (x{statistics.median(frame) / statistics.median(fast):.2f})")
+        print(f"   encode  : {summary(encode)}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
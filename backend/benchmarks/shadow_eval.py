@@ -0,0 +1,106 @@
+# benchmarks/shadow_eval.py
+"""
+Request-path cost and results of shadow evaluation (models/shadow.py).
+
+A candidate schemes model is built for the run: a smaller random forest
+(--trees, --depth) fitted on synthetic profiles labelled by the primary model, and
+saved to a temporary directory. It is registered in the model registry under its
+own name and shadowed with a ShadowEvaluator sampling every request.
+
+Reported:
+- submit() time on the request path (what a live request pays), p50 / p99 / max,
+  for --requests primary predictions submitted in one burst: the queue (--queue)
+  fills and further samples are dropped instead of blocking;
+- the agreement rate and the mean primary / candidate inference time on the
+  samples the background worker scored.
+
+Run from the backend directory (needs the trained .pkl artifacts):
+    python -m benchmarks.shadow_eval --requests 2000 --queue 64
+"""
+
+import argparse
+import operator
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+from models.encoding import array_input, serving_encoder
+from models.registry import registry
+from models.schemes_model import api as schemes_api
+from models.shadow import SHADOW_LATENCY, ShadowEvaluator, candidate_name
+
+from .fixtures import INPUT_COLUMNS, synthetic_profiles, user_ids
+from .serving_encoder import schemes_record
+
+
+def build_candidate(primary, records, trees: int, depth: int, path: Path) -> None:
+    """Distil the primary into a smaller forest with the same preprocessing."""
+    encoder = primary.encoder
+    with array_input():
+        labels = encoder.estimator.predict(np.vstack([encoder.encode(r) for r in records]))
+    pipeline = clone(joblib.load(schemes_api.base_dir / "schemes_model.pkl"))
+    pipeline.steps[-1][1].set_params(n_estimators=trees, max_depth=depth, n_jobs=1)
+    pipeline.fit(pd.DataFrame(records), labels)
+    joblib.dump(pipeline, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark shadow evaluation.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--queue", type=int, default=64)
+    parser.add_argument("--train", type=int, default=20000, help="profiles the candidate is distilled from")
+    parser.add_argument("--trees", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    primary = registry.active("schemes").bundle
+    rows = synthetic_profiles(user_ids(args.train + args.requests, prefix="shadow"), seed=3)["schemes_input"]
+    records = [schemes_record(dict(zip(INPUT_COLUMNS["schemes_input"], row))) for row in rows]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "candidate.pkl"
+        build_candidate(primary, records[:args.train], args.trees, args.depth, path)
+
+        def load(version):
+            return schemes_api.Candidate(serving_encoder(joblib.load(path)), primary.scheme_columns)
+
+        registry.register(candidate_name("bench"), [path], load)
+        evaluator = ShadowEvaluator(sample_rate=1.0, queue_size=args.queue)
+        evaluator.register("bench", schemes_api._score_candidate, operator.eq)
+
+        # Primary outputs first, so the submits below arrive as one burst
+        live = []
+        for record in records[args.train:]:
+            started = time.perf_counter()
+            with array_input():
+                prediction = primary.encoder.estimator.predict(primary.encoder.encode(record))[0]
+            live.append((record, schemes_api.predicted_ids(prediction, primary.scheme_columns),
+                         time.perf_counter() - started))
+
+        submit_times = []
+        for record, primary_ids, inference_seconds in live:
+            started = time.perf_counter()
+            evaluator.submit("bench", record, primary_ids, inference_seconds)
+            submit_times.append((time.perf_counter() - started) * 1e6)
+        evaluator.drain()
+        evaluator.stop()
+
+    counts = evaluator.counts["bench"]
+    q = statistics.quantiles(submit_times, n=100)
+    print(f"submit(): p50 {q[49]:.1f} us  p99 {q[98]:.1f} us  max {max(submit_times):.1f} us")
+    print(f"samples : {counts['agree'] + counts['disagree']} scored, {counts['dropped']} dropped (queue {args.queue}), "
+          f"{counts['error']} errors")
+    print(f"agreement {evaluator.agreement('bench'):.1%} (same predicted scheme set)")
+    for role in ("primary", "candidate"):
+        counts_, total = SHADOW_LATENCY._series[("bench", role)]
+        print(f"{role:<9}: mean inference {total / sum(counts_) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
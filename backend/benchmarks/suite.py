@@ -0,0 +1,387 @@
+# benchmarks/suite.py
+"""
+Micro and macro benchmarks for the backend hot paths, with baselines.
+
+micro:  tax.compute_tax_old / tax.compute_tax_new (tax_utils), tax.optimize (deduction
+        optimizer over _tax_inputs incomes and budgets), tax.what_if_10k (10k-scenario
+        income curve + break-even), tax.ml_predict,
+        schemes.predict_filter (pipeline predict + rules filtering),
+        wealth.projection_top5 (projection loop + predict_proba top 5); the model
+        benchmarks call the services' own encoder, predict() and helper functions,
+        chat.fake_llm (the /chat request path with a stubbed model)
+macro:  http.tax_predict / http.wealth_predict / http.schemes_predict — full HTTP
+        round trips through the root app against a local Postgres
+
+Each benchmark is warmed up, then timed in `repeat` samples of `number` calls;
+results are per call (median, p95, ops/s). Benchmarks whose artifacts or database
+are unavailable are reported as skipped, never silently dropped.
+
+Run from the backend directory:
+    python -m benchmarks.suite                                  # everything available
+    python -m benchmarks.suite --group micro --json out.json
+    python -m benchmarks.suite --artifacts-dir /tmp/models      # train_all --output-dir layout
+    python -m benchmarks.suite --compare benchmarks/baselines.json --threshold 0.15
+    python -m benchmarks.suite --save-baseline                  # overwrite benchmarks/baselines.json
+
+Comparison exits with status 1 when any benchmark's median is slower than its
+baseline by more than the threshold (baselines are machine specific: compare runs
+from the same host).
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+# The per-user rate limits would answer 429 to repeated calls: benchmark the request path itself
+os.environ.setdefault("ADMISSION_ENABLED", "0")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+class Benchmark:
+    def __init__(self, name: str, group: str, setup: Callable[["Context"], Callable[[], None]],
+                 number: int, per_call: int = 1):
+        self.name, self.group, self.setup = name, group, setup
+        self.number = number      # calls per timed sample
+        self.per_call = per_call  # operations done by one call (results are divided by it)
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, group: str = "micro", number: int = 100, per_call: int = 1):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, group, setup, number, per_call))
+        return setup
+    return register
+
+
+class Context:
+    """Shared, lazily loaded state (artifacts, database, app) for the benchmarks of one run."""
+
+    def __init__(self, artifacts_dir: Optional[Path]):
+        self.artifacts_dir = artifacts_dir
+        self._cache: Dict[str, object] = {}
+
+    def service(self, model: str):
+        """
+        (api module, ModelVersion) of one service, loaded by the service's own registry loader:
+        the version it serves, or one built from --artifacts-dir files where those exist.
+        """
+        if model not in self._cache:
+            import importlib
+            from models.registry import registry
+            api = importlib.import_module(f"models.{model}_model.api")
+            files = registry.files(model)
+            if self.artifacts_dir:
+                files = [self.artifacts_dir / model / p.name if (self.artifacts_dir / model / p.name).exists() else p
+                         for p in files]
+            version = registry.active(model)
+            if version is None or files != version.files:
+                try:
+                    version = registry.build(model, files)
+                except Exception as e:  # e.g. a Git LFS pointer instead of the pickle
+                    raise SkipBenchmark(f"{model} model not loadable ({e.__class__.__name__}: {e})")
+            self._cache[model] = api, version
+        return self._cache[model]
+
+
+# --- micro: tax ---
+def _tax_inputs(count=200, seed=0):
+    rng = random.Random(seed)
+    return [dict(age=rng.randint(21, 70), annual_income=rng.randint(200_000, 5_000_000), is_salaried=rng.random() < 0.7,
+                 investment_80c=rng.randint(0, 200_000), investment_80d=rng.randint(0, 60_000),
+                 home_loan_interest=rng.randint(0, 300_000), education_loan_interest=rng.randint(0, 50_000),
+                 donations_80g=rng.randint(0, 20_000), other_deductions=rng.randint(0, 30_000))
+            for _ in range(count)]
+
+
+@benchmark("tax.compute_tax_old", number=20, per_call=200)
+def bench_tax_old(ctx):
+    from models.tax_model.tax_utils import compute_tax_old
+    inputs = _tax_inputs()
+
+    def run():
+        for d in inputs:
+            compute_tax_old(d["annual_income"], d["investment_80c"], d["investment_80d"], d["home_loan_interest"],
+                            d["education_loan_interest"], d["other_deductions"], d["is_salaried"])
+    return run
+
+
+@benchmark("tax.compute_tax_new", number=20, per_call=200)
+def bench_tax_new(ctx):
+    from models.tax_model.tax_utils import compute_tax_new
+    inputs = _tax_inputs()
+
+    def run():
+        for d in inputs:
+            compute_tax_new(d["annual_income"], d["is_salaried"])
+    return run
+
+
+@benchmark("tax.optimize", number=5, per_call=20)
+def bench_tax_optimize(ctx):
+    from models.tax_model.optimizer import optimize_deductions
+    inputs = _tax_inputs(count=20)
+    budgets = [random.Random(i).randint(50_000, 1_000_000) for i in range(len(inputs))]
+
+    def run():
+        for d, budget in zip(inputs, budgets):
+            optimize_deductions(d["annual_income"], budget, current=d, other_deductions=d["other_deductions"],
+                                is_salaried=d["is_salaried"])
+    return run
+
+
+@benchmark("tax.what_if_10k", number=20)
+def bench_tax_what_if(ctx):
+    import numpy as np
+    from models.tax_model.what_if import FIELDS, break_even_incomes, evaluate_scenarios
+    columns = {f: np.zeros(10_000) for f in FIELDS}
+    columns.update(annual_income=np.linspace(0, 5_000_000, 10_000), is_salaried=np.ones(10_000),
+                   investment_80c=np.full(10_000, 150_000.0), home_loan_interest=np.full(10_000, 200_000.0))
+
+    def run():
+        evaluate_scenarios(columns)
+        break_even_incomes(400_000.0, 75_000.0)
+    return run
+
+
+@benchmark("tax.ml_predict", number=50)
+def bench_tax_predict(ctx):
+    from models.inference import predict
+    api, version = ctx.service("tax")
+    data = api.TaxInput(**_tax_inputs(1)[0])
+
+    # /tax/predict_tax's features + inference stages
+    def run():
+        predict("tax", version.bundle.encoder.estimator, api.ml_features(version.bundle, data), version=version)
+    return run
+
+
+# --- micro: schemes ---
+@benchmark("schemes.predict_filter", number=10)
+def bench_schemes(ctx):
+    from models.inference import predict
+    from models.schemes_model.rules import eligible_from_prediction
+    api, version = ctx.service("schemes")
+    profile = api.ProfileData(age=24, income=250000, state="Karnataka", gender="Female", caste="OBC",
+                              employment_type="Student", disability_status=False, education_level="Graduate")
+    loaded = version.bundle
+
+    # /schemes/predict on a cache miss: encode, predict, then the scope/state filter over the rules
+    def run():
+        features = loaded.encoder.encode(api.profile_record(profile))
+        prediction = predict("schemes", loaded.encoder.estimator, features, version=version)[0]
+        return eligible_from_prediction(prediction, loaded.scheme_columns, loaded.rules, profile.state)
+    return run
+
+
+# --- micro: wealth ---
+@benchmark("wealth.projection_top5", number=50)
+def bench_wealth(ctx):
+    from models.inference import predict
+    api, version = ctx.service("wealth")
+    data = api.WealthInput(user_age=30, retirement_age=60, current_savings=200000.0, monthly_investment=15000.0,
+                           expected_return=11.0, risk_tolerance="Low", liquidity="Medium", annual_step_up=5.0)
+    encoder = version.bundle.encoder
+
+    # /wealth/predict's compute, features and inference stages
+    def run():
+        api.project_corpus(data)
+        probs = predict("wealth", encoder.estimator, encoder.encode(api.model_record(data)),
+                        method="predict_proba", version=version)[0]
+        return api.top_schemes(probs, version.bundle.classes)
+    return run
+
+
+# --- micro: chat ---
+@benchmark("chat.fake_llm", number=50)
+def bench_chat(ctx):
+    from fastapi.testclient import TestClient
+    from models import chatbot
+    from benchmarks.fixtures import mint_token
+
+    class FakeModel:
+        def generate_content(self, prompt, request_options=None):
+            return type("Response", (), {"text": "PPF is a long-term small savings scheme."})()
+
+    chatbot.model = FakeModel()
+    client = TestClient(chatbot.app)  # no context manager: startup (Gemini init) does not run
+    headers = {"Authorization": f"Bearer {mint_token('bench-chat')}"}
+
+    def run():
+        response = client.post("/chat", json={"question": "What is PPF?"}, headers=headers)
+        assert response.status_code == 200, response.text
+    return run
+
+
+# --- macro: HTTP round trips against Postgres ---
+def _http_setup(ctx):
+    if "http" not in ctx._cache:
+        if not os.getenv("DATABASE_URL"):
+            raise SkipBenchmark("DATABASE_URL is not set")
+        try:
+            from models.app import app
+        except Exception as e:
+            raise SkipBenchmark(f"models.app failed to import ({e.__class__.__name__}); model artifacts missing?")
+        import psycopg2
+        from fastapi.testclient import TestClient
+        from benchmarks import fixtures
+
+        conn = psycopg2.connect(os.environ["DATABASE_URL"])
+        fixtures.ensure_schema(conn)
+        ids = fixtures.user_ids(50, prefix="suite-user")
+        fixtures.seed_users(conn, ids)
+        conn.close()
+        tokens = [{"Authorization": f"Bearer {fixtures.mint_token(u)}"} for u in ids]
+        ctx._cache["http"] = (TestClient(app), tokens)
+    return ctx._cache["http"]
+
+
+def _round_robin(items):
+    index = [0]
+
+    def next_item():
+        index[0] = (index[0] + 1) % len(items)
+        return items[index[0]]
+    return next_item
+
+
+@benchmark("http.tax_predict", group="macro", number=20)
+def bench_http_tax(ctx):
+    client, tokens = _http_setup(ctx)
+    headers = _round_robin(tokens)
+    return lambda: client.post("/tax/predict_tax", headers=headers()).raise_for_status()
+
+
+@benchmark("http.wealth_predict", group="macro", number=20)
+def bench_http_wealth(ctx):
+    client, tokens = _http_setup(ctx)
+    headers = _round_robin(tokens)
+    return lambda: client.post("/wealth/predict", headers=headers()).raise_for_status()
+
+
+@benchmark("http.schemes_predict", group="macro", number=5)
+def bench_http_schemes(ctx):
+    client, tokens = _http_setup(ctx)
+    headers = _round_robin(tokens)
+    body = {"age": 24, "gender": "Female", "state": "Karnataka", "caste": "OBC", "education_level": "Graduate",
+            "employment_type": "Student", "income": 250000, "disability_status": False}
+    return lambda: client.post("/schemes/predict", json=body, headers=headers()).raise_for_status()
+
+
+# --- Runner ---
+def measure(bench: Benchmark, fn: Callable[[], None], repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(bench.number):
+            fn()
+        samples.append((time.perf_counter() - start) / (bench.number * bench.per_call) * 1e6)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "group": bench.group,
+        "median_us": round(median, 3),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_us": round(samples[0], 3),
+        "ops_per_s": round(1e6 / median, 1),
+        "samples": repeat,
+        "calls_per_sample": bench.number * bench.per_call,
+    }
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+    except Exception:
+        commit = ""
+    return {"created_at": datetime.now(timezone.utc).isoformat(), "commit": commit, "python": platform.python_version(),
+            "platform": platform.platform(), "machine": platform.node(), "cpus": os.cpu_count()}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print a comparison table; return the names that regressed beyond threshold."""
+    regressions = []
+    print(f"\n📏 Compared with baseline (threshold {threshold:.0%})")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if "median_us" not in result or not base or "median_us" not in base:
+            continue
+        ratio = result["median_us"] / base["median_us"]
+        if ratio > 1 + threshold:
+            verdict = "❌ REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            verdict = "✅ faster"
+        else:
+            verdict = "  ok"
+        print(f"{name:<26} {base['median_us']:>12.1f} -> {result['median_us']:>12.1f} us  x{ratio:5.2f}  {verdict}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the backend benchmark suite.")
+    parser.add_argument("--group", choices=["micro", "macro", "all"], default="all")
+    parser.add_argument("--filter", default="*", help="glob on benchmark names, e.g. 'tax.*'")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--artifacts-dir", type=Path, help="load model artifacts from <dir>/<model>/ first")
+    parser.add_argument("--json", type=Path, help="write results here")
+    parser.add_argument("--compare", type=Path, nargs="?", const=BASELINE_PATH, help="baseline file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs baseline (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", type=Path, nargs="?", const=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    ctx = Context(args.artifacts_dir)
+    results: Dict[str, dict] = {}
+    print(f"{'benchmark':<26} {'median us':>12} {'p95 us':>12} {'ops/s':>14}")
+    for bench in BENCHMARKS:
+        if args.group != "all" and bench.group != args.group or not fnmatch.fnmatch(bench.name, args.filter):
+            continue
+        try:
+            fn = bench.setup(ctx)
+            result = measure(bench, fn, args.repeat, args.warmup)
+            print(f"{bench.name:<26} {result['median_us']:>12.1f} {result['p95_us']:>12.1f} {result['ops_per_s']:>14,.0f}")
+        except SkipBenchmark as e:
+            result = {"group": bench.group, "skipped": str(e)}
+            print(f"{bench.name:<26} skipped: {e}")
+        results[bench.name] = result
+
+    report = {"meta": _meta(), "results": results}
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"\n📄 Results written to {args.json}")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/wealth_generator.py
+"""
+Rows per second of the wealth dataset generator: the previous rejection-sampling
+loop vs the vectorized, rejection-free generator (wealth_model/generate_dataset.py).
+
+The previous loop is reproduced below as `rejection_generate`: for each scheme it
+draws users from the full population ranges with random.randint, re-parses the
+scheme's bounds for every draw and keeps only the eligible ones. It is timed for
+--legacy-samples draws per scheme and reported as accepted (written) rows per second.
+The vectorized generator is timed end to end (including writing Parquet) for
+--samples-per-scheme rows per scheme, with 1 and --workers processes.
+
+Run from the backend directory:
+    python -m benchmarks.wealth_generator --samples-per-scheme 20000 --workers 4
+"""
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from models.datasets import write_dataset
+from models.wealth_model import generate_dataset
+
+RULES = generate_dataset.BASE_DIR / "schemes_rules.csv"
+
+
+def rejection_generate(rules_path, output_path, samples_per_scheme, seed=None):
+    """The generator before the vectorized rewrite (draw, then discard ineligible users)."""
+    rng = random.Random(seed)
+    with open(rules_path, newline="", encoding="utf-8") as f:
+        schemes = list(csv.DictReader(f))
+
+    dataset = []
+    for scheme in schemes:
+        for _ in range(samples_per_scheme):
+            user_age = rng.randint(18, 70)
+            user_investment = rng.randint(10, 1000000)
+            years_to_invest = rng.randint(1, 50)
+            min_inv = float(scheme["min_investment"])
+            max_inv = float('inf') if scheme["max_investment"].lower() == 'any' else float(scheme["max_investment"])
+            age_min = int(scheme["eligible_age_min"])
+            age_max = float('inf') if scheme["eligible_age_max"].lower() == 'any' else int(scheme["eligible_age_max"])
+            if age_min <= user_age <= age_max and min_inv <= user_investment <= max_inv:
+                dataset.append({"user_age": user_age, "investment_amount": user_investment,
+                                "years_to_invest": years_to_invest, "risk_level": scheme["risk_level"],
+                                "liquidity": scheme["liquidity"], "recommended_scheme": scheme["scheme_name"]})
+    write_dataset(pd.DataFrame(dataset, columns=generate_dataset.COLUMNS), output_path, "wealth")
+    return len(dataset), len(schemes) * samples_per_scheme
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the wealth dataset generators.")
+    parser.add_argument("--legacy-samples", type=int, default=2000, help="draws per scheme for the rejection loop")
+    parser.add_argument("--samples-per-scheme", type=int, default=20000, help="rows per scheme for the vectorized generator")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        kept, drawn = rejection_generate(RULES, Path(tmp) / "legacy.parquet", args.legacy_samples, seed=0)
+        elapsed = time.perf_counter() - start
+        legacy_rate = kept / elapsed
+        print(f"rejection loop   : {kept:>10,} rows kept of {drawn:,} drawn ({kept / drawn:.1%}) in {elapsed:6.2f}s "
+              f"-> {legacy_rate:>12,.0f} rows/s")
+
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            rows = generate_dataset.generate(RULES, Path(tmp) / f"vectorized-{workers}.parquet",
+                                             samples_per_scheme=args.samples_per_scheme, seed=0, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"vectorized x{workers:<2}   : {rows:>10,} rows in {elapsed:6.2f}s -> {rows / elapsed:>12,.0f} rows/s "
+                  f"(x{rows / elapsed / legacy_rate:,.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/worker_scaling.py
+"""
+Memory and throughput of the gunicorn server (gunicorn.conf.py) for 1..N workers.
+
+For each worker count (and optionally with GUNICORN_PRELOAD=0 for comparison) it:
+  1. starts gunicorn on a scratch port and waits for every worker to boot,
+  2. drives a closed-loop request mix (--concurrency-per-worker clients per worker)
+     for --duration seconds and reports req/s, p50/p99 and errors,
+  3. reads /proc/<pid>/smaps_rollup of the master and the workers after the load:
+     RSS, USS (private pages) and PSS (shared pages split between processes).
+     With preloading, USS per worker is what each extra worker really costs.
+
+Run from the backend directory (needs the model artifacts and a local Postgres):
+    DATABASE_URL=... JWT_SECRET=... python -m benchmarks.worker_scaling --workers 1,2,4 --compare-preload
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import psycopg2
+
+from benchmarks import fixtures
+from benchmarks.loadgen import build_request, parse_mix, percentile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        return [int(p) for p in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+    except OSError:
+        return []
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        key, value = line.split(":", 1)
+        values[key] = int(value.split()[0]) / 1024
+    return {"rss": values["Rss"], "pss": values["Pss"],
+            "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)}
+
+
+def start_server(workers: int, preload: bool, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "GUNICORN_PRELOAD": "1" if preload else "0", "PORT": str(port)}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"], cwd=BACKEND_DIR,
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited: {server.stderr.read().decode()[-2000:]}")
+        if len(_children(server.pid)) == workers:
+            try:
+                # Every worker must answer; keep-alive off so requests spread over workers
+                ok = sum(httpx.get(f"http://127.0.0.1:{port}/", headers={"Connection": "close"}).status_code == 200
+                         for _ in range(workers * 3))
+                if ok == workers * 3:
+                    time.sleep(1)
+                    return server
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("gunicorn did not become ready")
+
+
+async def closed_loop(port: int, users, tokens, profiles, mix, clients: int, duration: float) -> dict:
+    endpoints, weights = list(mix), list(mix.values())
+    latencies, errors = [], 0
+
+    async def client_loop(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            while time.perf_counter() < stop:
+                user_id = rng.choice(users)
+                method, path, kwargs = build_request(rng.choices(endpoints, weights)[0], user_id, tokens[user_id], profiles, rng)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    errors += response.status_code >= 400
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+    stop = time.perf_counter() + duration
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    latencies.sort()
+    return {"requests": len(latencies), "rps": round(len(latencies) / duration, 1),
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 1), "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+            "error_rate": round(errors / max(len(latencies), 1), 4)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure gunicorn worker scaling.")
+    parser.add_argument("--workers", default="1,2,4", help="comma separated worker counts")
+    parser.add_argument("--compare-preload", action="store_true", help="also run every count with GUNICORN_PRELOAD=0")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency-per-worker", type=int, default=4)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("tax=4,schemes=1,wealth=3"))
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args(argv)
+
+    users = fixtures.user_ids(args.users, prefix="scale-user")
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    fixtures.ensure_schema(conn)
+    fixtures.seed_users(conn, users)
+    profiles = fixtures.load_profiles(conn, users)
+    conn.close()
+    tokens = {u: {"Authorization": f"Bearer {fixtures.mint_token(u)}"} for u in users}
+
+    rows = []
+    for preload in ([True, False] if args.compare_preload else [True]):
+        for workers in (int(w) for w in args.workers.split(",")):
+            server = start_server(workers, preload, args.port)
+            try:
+                load = asyncio.run(closed_loop(args.port, users, tokens, profiles, args.mix,
+                                               workers * args.concurrency_per_worker, args.duration))
+                master = memory_mb(server.pid)
+                per_worker = [memory_mb(pid) for pid in _children(server.pid)]
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=60)
+            row = {"workers": workers, "preload": preload, **load,
+                   "master_rss_mb": round(master["rss"], 1),
+                   "worker_rss_mb": round(statistics.mean(m["rss"] for m in per_worker), 1),
+                   "worker_uss_mb": round(statistics.mean(m["uss"] for m in per_worker), 1),
+                   "total_pss_mb": round(master["pss"] + sum(m["pss"] for m in per_worker), 1)}
+            rows.append(row)
+            print(f"{'preload' if preload else 'no-preload':<11} workers {workers:>2}: {row['rps']:>7.1f} req/s  "
+                  f"p50 {row['p50_ms']:>7.1f} ms  p99 {row['p99_ms']:>7.1f} ms  errors {row['error_rate']:.1%}  | "
+                  f"worker RSS {row['worker_rss_mb']:.0f} MB, USS {row['worker_uss_mb']:.0f} MB, "
+                  f"total PSS {row['total_pss_mb']:.0f} MB")
+
+    base = {r["preload"]: r["rps"] for r in rows if r["workers"] == rows[0]["workers"]}
+    print("\n📈 Throughput relative to the smallest worker count:")
+    for r in rows:
+        print(f"  {'preload' if r['preload'] else 'no-preload':<11} {r['workers']:>2} workers: x{r['rps'] / base[r['preload']]:.2f}")
+    if args.json:
+        args.json.write_text(json.dumps({"cores": os.cpu_count(), "rows": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# backend/gunicorn.conf.py
+"""
+Production server settings: `gunicorn -c gunicorn.conf.py app:app`.
+
+- Workers: WEB_CONCURRENCY if set, otherwise one per usable core (CPU affinity and
+  the container's cgroup CPU quota both count). Inference is CPU bound, so more
+  workers than cores only adds memory and context switches.
+- preload_app: the master imports app:app once — sklearn pipelines, rule tables and
+  the rest of the module-level state — and the workers are forked from it, sharing
+  those pages copy-on-write instead of each loading its own copy.
+- gc.freeze() in the master right before forking moves everything allocated so far
+  into the permanent generation. The cyclic GC in the workers then never walks (and
+  writes the GC header of) the preloaded objects, which would otherwise un-share
+  their pages one by one.
+- BLAS/OpenMP pools are pinned to one thread per worker so N workers do not start
+  N x cores threads.
+- The worker count is exported as WEB_CONCURRENCY, so the app (imported after this
+  file) can size per-worker resources. With INFERENCE_POOL=1 every worker starts its
+  own inference pool, each process holding its own copy of the models: INFERENCE_WORKERS
+  is therefore the host total, split across the workers (models/inference.py).
+
+Per-process state (metrics, the auth token cache, write-behind writers) lives in each
+worker. benchmarks/worker_scaling.py measures memory and throughput for 1..N workers.
+Set GUNICORN_PRELOAD=0 to load the app in every worker instead (for comparison).
+"""
+
+import gc
+import os
+
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+
+def available_cores() -> int:
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    # cgroup v2 quota, e.g. "200000 100000" -> 2 cores ("max" means unlimited)
+    try:
+        quota, period = open("/sys/fs/cgroup/cpu.max").read().split()
+        if quota != "max":
+            cores = min(cores, max(1, int(int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", available_cores()))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+    server.log.info("Serving with %d worker(s), preload_app=%s", workers, preload_app)
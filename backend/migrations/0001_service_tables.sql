@@ -0,0 +1,80 @@
+-- Tables the schemes, tax and wealth services read and write.
+-- The frontend writes the *_input tables and reads the result tables. On databases
+-- that already have them (created before this migration existed), IF NOT EXISTS
+-- leaves them alone and only the columns the services rely on are added.
+-- The JSON result columns (tax.notes, wealth.projection_data / recommended_schemes)
+-- are JSONB, as in production.
+
+CREATE TABLE IF NOT EXISTS tax_input (
+    tax_input_id BIGSERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    age INT,
+    annual_income NUMERIC,
+    is_salaried BOOLEAN,
+    investment_80c NUMERIC,
+    investment_80d NUMERIC,
+    home_loan_interest NUMERIC,
+    education_loan_interest NUMERIC,
+    donations_80g NUMERIC,
+    other_deductions NUMERIC,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS wealth_input (
+    wealth_input_id BIGSERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    user_age INT,
+    retirement_age INT,
+    current_savings NUMERIC,
+    monthly_investment NUMERIC,
+    expected_return NUMERIC,
+    risk_tolerance TEXT,
+    liquidity TEXT,
+    annual_step_up NUMERIC,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS schemes_input (
+    user_id TEXT NOT NULL,
+    age INT,
+    gender TEXT,
+    state TEXT,
+    caste TEXT,
+    education_level TEXT,
+    employment_type TEXT,
+    income BIGINT,
+    disability_status BOOLEAN
+);
+
+CREATE TABLE IF NOT EXISTS tax (
+    user_id TEXT PRIMARY KEY,
+    taxable_income_old NUMERIC,
+    tax_old NUMERIC,
+    taxable_income_new NUMERIC,
+    tax_new NUMERIC,
+    recommended_regime TEXT,
+    tax_saving NUMERIC,
+    notes JSONB,
+    generated_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS wealth (
+    user_id TEXT PRIMARY KEY,
+    projected_corpus NUMERIC,
+    inflation_adjusted_corpus NUMERIC,
+    projection_data JSONB,
+    recommended_schemes JSONB,
+    generated_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS schemes (
+    user_id TEXT NOT NULL,
+    scheme_id TEXT NOT NULL,
+    scheme_name TEXT
+);
+
+-- Columns older tables may lack (ORDER BY created_at, GET /result ETags)
+ALTER TABLE tax_input ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE wealth_input ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE tax ADD COLUMN IF NOT EXISTS generated_at TIMESTAMPTZ;
+ALTER TABLE wealth ADD COLUMN IF NOT EXISTS generated_at TIMESTAMPTZ;
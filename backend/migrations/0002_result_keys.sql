@@ -0,0 +1,32 @@
+-- Unique keys the services' writes depend on:
+-- - tax / wealth: INSERT ... ON CONFLICT (user_id) needs a unique index on user_id
+--   (tables created by 0001 have it as their primary key; older ones may not);
+-- - schemes: one row per (user_id, scheme_id); /schemes/predict only inserts the ids
+--   a user does not have yet, so earlier duplicates are collapsed first.
+
+DO $$
+DECLARE
+    target TEXT;
+BEGIN
+    FOREACH target IN ARRAY ARRAY['tax', 'wealth'] LOOP
+        IF NOT EXISTS (
+            SELECT 1
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = to_regclass(target) AND i.indisunique AND i.indnkeyatts = 1
+              AND a.attname = 'user_id'
+        ) THEN
+            -- Keep the latest result per user before adding the key
+            EXECUTE format(
+                'DELETE FROM %I t USING %I d WHERE t.user_id = d.user_id '
+                'AND (COALESCE(t.generated_at, ''-infinity''), t.ctid) < (COALESCE(d.generated_at, ''-infinity''), d.ctid)',
+                target, target);
+            EXECUTE format('CREATE UNIQUE INDEX %I ON %I (user_id)', target || '_user_id_key', target);
+        END IF;
+    END LOOP;
+END $$;
+
+DELETE FROM schemes t USING schemes d
+WHERE t.user_id = d.user_id AND t.scheme_id = d.scheme_id AND t.ctid < d.ctid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS schemes_user_scheme_key ON schemes (user_id, scheme_id);
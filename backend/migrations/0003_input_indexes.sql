@@ -0,0 +1,14 @@
+-- migrate: no-transaction
+-- Indexes for the per-user input reads (see models/queries.py). Built CONCURRENTLY
+-- so a live database keeps taking writes; the statements are idempotent, so a run
+-- interrupted half way is simply re-run (an index left INVALID by a failed build is
+-- reported by `python -m models.migrate --check`; drop it and re-run).
+
+-- Latest tax input: WHERE user_id = $1 ORDER BY created_at DESC LIMIT 1
+CREATE INDEX CONCURRENTLY IF NOT EXISTS tax_input_user_created_idx ON tax_input (user_id, created_at DESC);
+
+-- Latest wealth input, same shape
+CREATE INDEX CONCURRENTLY IF NOT EXISTS wealth_input_user_created_idx ON wealth_input (user_id, created_at DESC);
+
+-- Profile lookups by user (frontend profile page, recompute jobs)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS schemes_input_user_idx ON schemes_input (user_id);
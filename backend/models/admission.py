@@ -0,0 +1,315 @@
+# backend/models/admission.py
+"""
+Admission control for the expensive endpoints: per-user rate limits, per-class
+concurrency caps and load shedding.
+
+Routes opt in by endpoint class:
+
+    @app.post("/predict", dependencies=[Depends(admit("predict"))])
+
+- chat     /chat/chat (a paid LLM call)
+- predict  /schemes/predict, /tax/predict_tax, /wealth/predict
+- compute  /tax/optimize, /tax/what_if
+
+Each request first takes a token from its user's bucket for the class (keyed by the
+JWT userId; `rate` tokens per second, up to `burst`). An empty bucket answers 429
+with Retry-After set to when the next token is due. The bucket is a GCRA (one
+"theoretical arrival time" per key), kept in memory per worker (ADMISSION_BACKEND=memory)
+or in a Postgres table shared by every worker and host (ADMISSION_BACKEND=postgres;
+fails open when the database is unreachable).
+
+Then it takes one of the class's `concurrency` slots in this worker, waiting in
+FIFO order. A request is shed with 503 + Retry-After, instead of queueing, when the
+expected wait (waiters ahead / concurrency x recent service time) exceeds `max_wait`,
+or when it has actually waited `max_wait`. So admitted requests stay within
+roughly max_wait + service time under any load, and shed ones fail fast.
+`concurrency` is per web worker: a host running N gunicorn workers (one per core
+unless WEB_CONCURRENCY is set, gunicorn.conf.py) admits up to N x concurrency
+requests of a class at once, i.e. the defaults allow `concurrency` per core.
+
+Limits per class come from ADMISSION_<CLASS>, e.g.
+ADMISSION_CHAT="rate=0.2,burst=5,concurrency=4,max_wait=5"; ADMISSION_ENABLED=0
+turns the whole layer off.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, NamedTuple, Optional
+
+import psycopg2
+from fastapi import Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from .auth import get_current_user
+from .db import DATABASE_URL
+from .metrics import Counter, Histogram, register, register_gauge
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") != "0"
+ADMISSION_BACKEND = os.getenv("ADMISSION_BACKEND", "memory")
+ADMISSION_BUCKETS = int(os.getenv("ADMISSION_BUCKETS", "100000"))   # memory backend: keys kept (LRU)
+
+ADMISSION_RESULTS = register(Counter("prajaseva_admission_total", "Admission decisions by endpoint class.",
+                                     ["endpoint_class", "outcome"]))
+ADMISSION_WAIT = register(Histogram("prajaseva_admission_wait_seconds", "Time waited for a concurrency slot.",
+                                    ["endpoint_class"]))
+
+
+class Policy(NamedTuple):
+    rate: float         # tokens per second per user (<= 0: no rate limit)
+    burst: float        # bucket size
+    concurrency: int    # requests in progress per web worker (<= 0: no cap); host-wide: x workers
+    max_wait: float     # seconds a request may queue for a slot before it is shed
+
+
+# Concurrency caps are per web worker (one per core by default): a host admits workers x concurrency
+DEFAULT_POLICIES = {
+    "chat": Policy(rate=0.2, burst=5, concurrency=4, max_wait=5.0),
+    "predict": Policy(rate=1.0, burst=10, concurrency=4, max_wait=2.0),
+    "compute": Policy(rate=2.0, burst=10, concurrency=2, max_wait=2.0),
+}
+
+
+def parse_policy(spec: str, default: Policy) -> Policy:
+    """"rate=0.2,burst=5" -> default with those fields replaced."""
+    fields = {}
+    for part in spec.split(","):
+        key, _, value = part.strip().partition("=")
+        if key in Policy._fields and value:
+            fields[key] = int(value) if key == "concurrency" else float(value)
+    return default._replace(**fields)
+
+
+POLICIES = {name: parse_policy(os.getenv(f"ADMISSION_{name.upper()}", ""), policy)
+            for name, policy in DEFAULT_POLICIES.items()}
+
+
+def _retry_after(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+# --- Per-user token buckets ---
+class RateLimitBackend:
+    """take(key, rate, burst) -> 0 when a token was taken, else seconds until one is due."""
+
+    blocking = False    # True: take() does I/O and is called from the threadpool
+
+    def take(self, key: str, rate: float, burst: float, now: Optional[float] = None) -> float:
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """GCRA buckets in this process: a bounded LRU of key -> theoretical arrival time."""
+
+    def __init__(self, max_keys: int = ADMISSION_BUCKETS):
+        self.max_keys = max_keys
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        interval = 1.0 / rate
+        with self._lock:
+            tat = max(self._tat.get(key, now), now) + interval
+            wait = tat - now - burst * interval
+            if wait > 0:
+                return wait
+            self._tat[key] = tat
+            self._tat.move_to_end(key)
+            while len(self._tat) > self.max_keys:
+                self._tat.popitem(last=False)
+        return 0.0
+
+
+class PostgresBackend(RateLimitBackend):
+    """
+    GCRA buckets in an UNLOGGED table, shared by all workers: one atomic upsert per
+    request. Times are epoch seconds from the callers' clocks.
+    """
+
+    blocking = True
+
+    TAKE_SQL = """
+        INSERT INTO admission_buckets AS b (key, tat) VALUES (%(key)s, %(now)s + %(interval)s)
+        ON CONFLICT (key) DO UPDATE SET tat = GREATEST(b.tat, %(now)s) + %(interval)s
+        WHERE GREATEST(b.tat, %(now)s) + %(interval)s - %(now)s <= %(window)s
+        RETURNING tat
+    """
+
+    def __init__(self, dsn: Optional[str] = None):
+        self.dsn = dsn
+        self._local = threading.local()
+        self.errors = 0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn.closed:
+            conn = psycopg2.connect(self.dsn or DATABASE_URL, connect_timeout=2)
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("CREATE UNLOGGED TABLE IF NOT EXISTS admission_buckets "
+                               "(key TEXT PRIMARY KEY, tat DOUBLE PRECISION NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, burst: float, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        interval = 1.0 / rate
+        params = {"key": key, "now": now, "interval": interval, "window": burst * interval}
+        try:
+            with self._connection().cursor() as cursor:
+                cursor.execute(self.TAKE_SQL, params)
+                if cursor.fetchone() is not None:
+                    return 0.0
+                cursor.execute("SELECT tat FROM admission_buckets WHERE key = %s", (key,))
+                row = cursor.fetchone()
+        except Exception as e:
+            # Fail open: a broken limiter must not take the service down with it
+            self.errors += 1
+            self._local.conn = None
+            print(f"⚠️ Rate limit backend unavailable, admitting: {e}")
+            return 0.0
+        return max(row[0], now) + interval - now - burst * interval if row else 0.0
+
+
+# --- Per-class concurrency caps ---
+class ConcurrencyGate:
+    """At most `limit` requests in progress; FIFO waiters, shed past `max_wait`."""
+
+    def __init__(self, limit: int, max_wait: float, service_time: float = 0.1):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._lock = threading.Lock()
+        self.service_time = service_time     # EWMA of slot hold times, seconds
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self) -> float:
+        return (len(self._waiters) + 1) / self.limit * self.service_time
+
+    async def acquire(self) -> Optional[float]:
+        """None once a slot is held, else the Retry-After for a shed request."""
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return None
+            expected = self.expected_wait()
+            if expected > self.max_wait:
+                return expected
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            if self._withdraw(waiter):
+                self._free()
+            raise
+        return None if self._withdraw(waiter) else self.max_wait
+
+    def _withdraw(self, waiter: asyncio.Future) -> bool:
+        """Take `waiter` off the queue; True if release() had already handed it a slot."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                return True
+            return False
+
+    def _free(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # The slot passes straight to the next waiter (active stays the same)
+                waiter = self._waiters.popleft()
+                waiter.get_loop().call_soon_threadsafe(_grant, waiter)
+            else:
+                self.active -= 1
+
+    def release(self, held: float) -> None:
+        self.service_time += 0.2 * (held - self.service_time)
+        self._free()
+
+
+def _grant(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# --- FastAPI dependency ---
+class AdmissionController:
+    def __init__(self, policies: Dict[str, Policy], backend: RateLimitBackend):
+        self.policies = policies
+        self.backend = backend
+        self.gates = {name: ConcurrencyGate(p.concurrency, p.max_wait)
+                      for name, p in policies.items() if p.concurrency > 0}
+        for name, gate in self.gates.items():
+            register_gauge(f"prajaseva_admission_active_{name}", f"{name} requests holding a slot in this worker.",
+                           lambda gate=gate: gate.active)
+            register_gauge(f"prajaseva_admission_waiting_{name}", f"{name} requests queued for a slot in this worker.",
+                           lambda gate=gate: gate.waiting)
+
+    async def check_rate(self, endpoint_class: str, user_id: str) -> None:
+        policy = self.policies[endpoint_class]
+        if policy.rate <= 0:
+            return
+        key = f"{endpoint_class}:{user_id}"
+        if self.backend.blocking:
+            wait = await run_in_threadpool(self.backend.take, key, policy.rate, policy.burst)
+        else:
+            wait = self.backend.take(key, policy.rate, policy.burst)
+        if wait > 0:
+            ADMISSION_RESULTS.inc(endpoint_class, "rate_limited")
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                detail="Too many requests, please retry later.", headers=_retry_after(wait))
+
+    def dependency(self, endpoint_class: str) -> Callable:
+        if endpoint_class not in self.policies:
+            raise KeyError(f"Unknown endpoint class: {endpoint_class}")
+
+        async def admitted(user_id: str = Depends(get_current_user)):
+            if not ADMISSION_ENABLED:
+                yield
+                return
+            await self.check_rate(endpoint_class, str(user_id))
+            gate = self.gates.get(endpoint_class)
+            if gate is None:
+                ADMISSION_RESULTS.inc(endpoint_class, "admitted")
+                yield
+                return
+            queued = time.perf_counter()
+            retry_after = await gate.acquire()
+            if retry_after is not None:
+                ADMISSION_RESULTS.inc(endpoint_class, "shed")
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                    detail="Server is busy, please retry later.", headers=_retry_after(retry_after))
+            started = time.perf_counter()
+            ADMISSION_WAIT.observe(started - queued, endpoint_class)
+            ADMISSION_RESULTS.inc(endpoint_class, "admitted")
+            try:
+                yield
+            finally:
+                gate.release(time.perf_counter() - started)
+
+        return admitted
+
+
+def _backend() -> RateLimitBackend:
+    if ADMISSION_BACKEND == "postgres":
+        return PostgresBackend()
+    if ADMISSION_BACKEND != "memory":
+        print(f"⚠️ Unknown ADMISSION_BACKEND={ADMISSION_BACKEND!r}, using memory")
+    return MemoryBackend()
+
+
+admission = AdmissionController(POLICIES, _backend())
+
+
+def admit(endpoint_class: str) -> Callable:
+    """Route dependency: rate limit + concurrency cap for `endpoint_class` (see the module docstring)."""
+    return admission.dependency(endpoint_class)
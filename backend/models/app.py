@@ -1,5 +1,8 @@
 # backend/models/app.py
-from fastapi import FastAPI
+import os
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
@@ -9,9 +12,16 @@ from .schemes_model.api import app as schemes_app
 from .tax_model.api import app as tax_app
 from .wealth_model.api import app as wealth_app
 from .chatbot import app as chatbot_app
+from .db import close_writers
+from . import inference, metrics, profiler
+from .auth import require_admin
+from .registry import VERSION_HEADER, registry
+from .responses import COMPRESSION_ENABLED, CompressionMiddleware, FastJSONResponse
+from .deadlines import DeadlineMiddleware
+from .shadow import shadow
 
 # ---------------------- MAIN APP ----------------------
-app = FastAPI(title="PrajaSeva AI Platform")
+app = FastAPI(title="PrajaSeva AI Platform", default_response_class=FastJSONResponse)
 
 # Enable CORS
 app.add_middleware(
@@ -20,14 +30,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[VERSION_HEADER, "ETag", "Retry-After"],
 )
 
+# gzip / brotli for large bodies; inside the metrics middleware, so its time is measured (see models/responses.py)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Per-request deadline (route default or X-Request-Timeout), enforced at stages, in Postgres and on the LLM call
+app.add_middleware(DeadlineMiddleware)
+
+# Request latency / status metrics for every mounted service (see models/metrics.py)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+# Opt-in 1-in-N request profiling (see models/profiler.py)
+if profiler.request_profiles.enabled:
+    app.add_middleware(profiler.RequestProfilerMiddleware)
+
 # ---------------------- MOUNT ALL SERVICES ----------------------
 app.mount("/schemes", schemes_app)
 app.mount("/tax", tax_app)
 app.mount("/wealth", wealth_app)
 app.mount("/chat", chatbot_app)
 
+# Mounted sub-apps do not receive lifespan events, so startup/shutdown work is hooked here
+@app.on_event("startup")
+def on_startup():
+    # Installed per worker (after the server sets up its own signal handlers)
+    profiler.install_signal_handler()
+    # Each worker watches the model artifacts itself (see models/registry.py)
+    registry.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    close_writers()
+    inference.close_pool()
+    registry.stop()
+    shadow.stop()
+
 # ---------------------- ROOT ENDPOINT ----------------------
 @app.get("/")
 def root():
@@ -41,6 +81,61 @@ def root():
         }
     }
 
+# ---------------------- MODEL VERSIONS ----------------------
+@app.get("/models")
+def model_versions():
+    return registry.status()
+
+# ---------------------- METRICS ----------------------
+if metrics.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# ---------------------- ADMIN: PROFILING ----------------------
+# Sync handlers: they run in the threadpool, so sleeping while sampling never blocks the event loop
+@app.get("/admin/profile", include_in_schema=False)
+def admin_profile(seconds: float = 10.0, interval_ms: float = 5.0, admin: str = Depends(require_admin)):
+    try:
+        return PlainTextResponse(profiler.profile_for(seconds, interval_ms / 1000))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/admin/profile/requests", include_in_schema=False)
+def admin_request_profiles(admin: str = Depends(require_admin)):
+    return {"rate": profiler.request_profiles.rate, "slowest": profiler.request_profiles.summaries()}
+
+@app.get("/admin/profile/requests/{request_id}", include_in_schema=False)
+def admin_request_profile(request_id: int, admin: str = Depends(require_admin)):
+    collapsed = profiler.request_profiles.get(request_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found (evicted or never sampled)")
+    return PlainTextResponse(collapsed)
+
+# ---------------------- ADMIN: MODELS ----------------------
+# Applied here at once and by every other worker's watcher within MODEL_RELOAD_INTERVAL (pin file, models/registry.py)
+def _check_model_admin(name: str) -> None:
+    if name not in registry:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
+    if registry.interval <= 0 and int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise HTTPException(status_code=409, detail="Model watcher disabled (MODEL_RELOAD_INTERVAL=0): "
+                                                    "only this worker would change; restart the workers instead.")
+
+@app.post("/admin/models/{name}/reload", include_in_schema=False)
+def admin_reload_model(name: str, admin: str = Depends(require_admin)):
+    _check_model_admin(name)
+    registry.reload(name)
+    return registry.status()[name]
+
+@app.post("/admin/models/{name}/rollback", include_in_schema=False)
+def admin_rollback_model(name: str, admin: str = Depends(require_admin)):
+    _check_model_admin(name)
+    try:
+        registry.rollback(name)
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return registry.status()[name]
+
 # ---------------------- START SERVER ----------------------
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,157 @@
+# backend/models/auth.py
+"""
+Shared authentication dependency for the schemes, tax, wealth and chat services.
+
+get_current_user() verifies the bearer JWT (HS256, `userId` claim) exactly like the
+per-service copies did, but remembers tokens it has already verified. The frontend
+sends the same token on every request of a session, so after the first request the
+cost is one sha256 and a dict lookup instead of a full python-jose decode.
+
+Cache rules:
+- Keyed by the sha256 digest of the token (raw tokens are never kept in memory).
+- Bounded LRU (AUTH_CACHE_SIZE entries); only successfully verified tokens are stored.
+- An entry expires at the token's `exp`, and never later than AUTH_CACHE_TTL seconds
+  after it was verified (tokens without `exp` are re-verified periodically).
+
+Key rotation: tokens are verified against JWT_SECRET first, then each secret in
+JWT_PREVIOUS_SECRETS (comma separated), so tokens issued before a rotation keep
+working until they expire or the old secret is removed from the list.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from dotenv import load_dotenv
+
+from .metrics import register_gauge, stage
+
+load_dotenv()
+JWT_SECRET = os.getenv("JWT_SECRET")
+JWT_PREVIOUS_SECRETS = [s.strip() for s in os.getenv("JWT_PREVIOUS_SECRETS", "").split(",") if s.strip()]
+ALGORITHM = "HS256"
+
+ADMIN_USER_IDS = {s.strip() for s in os.getenv("ADMIN_USER_IDS", "").split(",") if s.strip()}
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "900"))
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+# --- Verified-token cache ---
+class TokenCache:
+    """Bounded, expiry-aware LRU of token digest -> (user_id, expires_at)."""
+
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, max_ttl: float = AUTH_CACHE_TTL):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes, now: Optional[float] = None) -> Optional[str]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user_id
+
+    def put(self, key: bytes, user_id: str, exp: Optional[float], now: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        now = time.time() if now is None else now
+        expires_at = now + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[key] = (user_id, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+register_gauge("prajaseva_auth_cache_hits", "Verified-token cache hits.", lambda: token_cache.hits)
+register_gauge("prajaseva_auth_cache_misses", "Verified-token cache misses.", lambda: token_cache.misses)
+register_gauge("prajaseva_auth_cache_entries", "Tokens currently cached.", lambda: len(token_cache))
+
+
+# --- Verification ---
+def _secrets() -> List[str]:
+    return [s for s in [JWT_SECRET, *JWT_PREVIOUS_SECRETS] if s]
+
+
+def decode_token(token: str) -> dict:
+    """Full signature + claims check against the current secret, then any previous ones."""
+    secrets = _secrets()
+    if not secrets:
+        # Fail loudly so a missing secret is visible to ops instead of looking like bad tokens
+        raise HTTPException(status_code=500, detail="Server misconfiguration: JWT_SECRET is not set")
+    error: Optional[JWTError] = None
+    for secret in secrets:
+        try:
+            return jwt.decode(token, secret, algorithms=[ALGORITHM])
+        except JWTError as e:
+            error = e
+    raise error
+
+
+def verify_token(token: str) -> str:
+    """Return the token's user id, using the cache when the token was verified before."""
+    key = token_cache.digest(token)
+    user_id = token_cache.get(key)
+    if user_id is not None:
+        return user_id
+
+    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        raise credentials_exception
+    user_id = payload.get("userId")
+    if user_id is None:
+        raise credentials_exception
+    token_cache.put(key, user_id, payload.get("exp"))
+    return user_id
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
+    with stage("auth"):
+        return verify_token(token)
+
+
+def require_admin(user_id: str = Depends(get_current_user)) -> str:
+    """Operational endpoints (profiling, ...) are limited to the ids in ADMIN_USER_IDS."""
+    if str(user_id) not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user_id
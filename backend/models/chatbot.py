@@ -17,12 +17,16 @@ import socket
 import traceback
 from typing import Optional
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import google.generativeai as genai
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+
+from .auth import get_current_user
+from .admission import admit
+from .responses import FastJSONResponse
+from .metrics import stage
+from .deadlines import exceeded, remaining
 
 # Load local .env if present (HF Spaces: secrets must be set via UI)
 load_dotenv()
@@ -30,8 +34,7 @@ load_dotenv()
 # Environment / secrets
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 AI_NAME = os.getenv("AI_NAME", "PrajaSeva AI")
-JWT_SECRET = os.getenv("JWT_SECRET")
-ALGORITHM = "HS256"
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))   # seconds; shortened to the request's deadline
 
 # Global model state
 model = None  # set by initialize_gemini()
@@ -39,33 +42,7 @@ init_error: Optional[str] = None
 _last_init_attempt_ts: Optional[float] = None
 
 # FastAPI app
-app = FastAPI(title=f"{AI_NAME} Chatbot API")
-
-# OAuth2 (same as your original)
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-
-def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
-    """
-    Decode JWT and return user id (same behavior as original).
-    Raises 401 if invalid.
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials"
-    )
-    if not JWT_SECRET:
-        # If JWT_SECRET not set, fail early with 500 so it's visible to ops
-        raise HTTPException(status_code=500, detail="Server misconfiguration: JWT_SECRET is not set")
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        user_id: Optional[str] = payload.get("userId")
-        if user_id is None:
-            raise credentials_exception
-        return user_id
-    except JWTError:
-        raise credentials_exception
+app = FastAPI(title=f"{AI_NAME} Chatbot API", default_response_class=FastJSONResponse)
 
 
 def _can_reach_google_api(host: str = "generativelanguage.googleapis.com", port: int = 443, timeout: float = 5.0) -> (bool, Optional[str]):
@@ -229,6 +206,11 @@ def _normalize_genai_response(resp) -> Optional[str]:
     return None
 
 
+def _llm_timeout() -> float:
+    left = remaining()
+    return LLM_TIMEOUT if left is None else max(min(left, LLM_TIMEOUT), 0.001)
+
+
 def chat_with_gemini(question: str) -> str:
     """
     Send the system prompt + user question to the configured Gemini model and return text.
@@ -275,16 +257,17 @@ If outside scope, politely decline with: "My expertise is in Indian government s
         # Try common patterns safely
         try:
             # preferred: model.generate_content(prompt)
-            if hasattr(model, "generate_content"):
-                response = model.generate_content(full_prompt)
-            # older/newer clients might have generate() method
-            elif hasattr(model, "generate"):
-                response = model.generate(full_prompt)
-            # fallback to top-level genai.generate (some samples use genai.generate(...))
-            elif hasattr(genai, "generate"):
-                response = genai.generate(full_prompt)
-            else:
-                raise RuntimeError("GenAI client does not expose a supported generate method.")
+            with stage("llm"):
+                if hasattr(model, "generate_content"):
+                    response = model.generate_content(full_prompt, request_options={"timeout": _llm_timeout()})
+                # older/newer clients might have generate() method
+                elif hasattr(model, "generate"):
+                    response = model.generate(full_prompt)
+                # fallback to top-level genai.generate (some samples use genai.generate(...))
+                elif hasattr(genai, "generate"):
+                    response = genai.generate(full_prompt)
+                else:
+                    raise RuntimeError("GenAI client does not expose a supported generate method.")
         except Exception as inner_exc:
             # Log and re-raise to outer try/except to handle uniformly
             print("Exception while calling model generate:", inner_exc)
@@ -301,7 +284,13 @@ If outside scope, politely decline with: "My expertise is in Indian government s
 
         return text
 
+    except HTTPException:
+        raise   # deadline already exceeded at a stage boundary
     except Exception as e:
+        left = remaining()
+        if left is not None and left <= 0:
+            print(f"Gemini call stopped by the request deadline: {e}")
+            raise exceeded("llm") from e
         # Log full traceback server-side for diagnostics
         print("Error during Gemini API call:")
         print(traceback.format_exc())
@@ -316,7 +305,7 @@ class ChatRequest(BaseModel):
     question: str
 
 
-@app.post("/chat")
+@app.post("/chat", dependencies=[Depends(admit("chat"))])
 def chat_endpoint(req: ChatRequest, user_id: str = Depends(get_current_user)):
     """
     Chat endpoint: requires auth via get_current_user. Returns the answer or 503 on Gemini failure.
@@ -324,6 +313,8 @@ def chat_endpoint(req: ChatRequest, user_id: str = Depends(get_current_user)):
     try:
         answer = chat_with_gemini(req.question)
         return {"answer": answer}
+    except HTTPException:
+        raise   # 504 when the request deadline expired (models/deadlines.py)
     except RuntimeError as e:
         # RuntimeError messages are safe user-facing messages (we keep them short)
         raise HTTPException(status_code=503, detail=str(e))
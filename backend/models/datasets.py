@@ -0,0 +1,207 @@
+# backend/models/datasets.py
+"""
+Typed columnar storage for the training datasets.
+
+CSV is re-parsed with type inference on every training / evaluation run. The
+datasets are stored as Parquet (or Feather, picked by file suffix) with fixed
+dtypes instead: categorical columns for the low-cardinality text fields
+(state, gender, caste, risk level, ...) and the smallest integer types that fit.
+
+- read_dataset(path, kind): whole dataset (optionally only some columns).
+- iter_dataset(path, kind, batch_size): chunked reading for datasets that do not fit in memory.
+- DatasetWriter: chunked writing (generators append batches without holding everything).
+- write_generated(path, kind, fn, tasks): run fn(*task) in a process pool, write results in order.
+- resolve_dataset(directory): training_dataset.parquet if present, else the legacy CSV.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+PathLike = Union[str, Path]
+
+# Column dtypes per dataset. Columns not listed (e.g. the 700+ scheme label columns) use `default`.
+SCHEMAS: Dict[str, Dict[str, object]] = {
+    "schemes": {
+        "columns": {
+            "age": "int16",
+            "annual_income": "int64",
+            "state": "category",
+            "gender": "category",
+            "caste": "category",
+            "employment_type": "category",
+            "disability_status": "category",
+            "education_level": "category",
+        },
+        "default": "uint8",  # one 0/1 label column per scheme
+    },
+    "tax": {
+        "columns": {
+            "age": "int16",
+            "annual_income": "int64",
+            "is_salaried": "int8",
+            "investment_80c": "int64",
+            "investment_80d": "int64",
+            "home_loan_interest": "int64",
+            "education_loan_interest": "int64",
+            "donations_80g": "int64",
+            "other_deductions": "int64",
+            "standard_deduction": "int64",
+            "taxable_old": "float64",
+            "tax_old": "float64",
+            "taxable_new": "float64",
+            "tax_new": "float64",
+            "best_regime": "category",
+        },
+        "default": None,
+    },
+    "wealth": {
+        "columns": {
+            "user_age": "int16",
+            "investment_amount": "int64",
+            "years_to_invest": "int16",
+            "risk_level": "category",
+            "liquidity": "category",
+            "recommended_scheme": "category",
+        },
+        "default": None,
+    },
+}
+
+COLUMNAR_SUFFIXES = {".parquet", ".feather", ".arrow"}
+
+
+def apply_schema(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """Cast a frame to the dataset's declared dtypes."""
+    schema = SCHEMAS[kind]
+    dtypes = {c: schema["columns"].get(c, schema["default"]) for c in df.columns}
+    return df.astype({c: t for c, t in dtypes.items() if t is not None and str(df[c].dtype) != str(t)})
+
+
+def resolve_dataset(directory: PathLike, stem: str = "training_dataset") -> Path:
+    """Prefer the columnar file; fall back to the CSV that older checkouts ship."""
+    directory = Path(directory)
+    for suffix in (".parquet", ".feather", ".csv"):
+        candidate = directory / f"{stem}{suffix}"
+        if candidate.exists():
+            return candidate
+    return directory / f"{stem}.parquet"
+
+
+def read_dataset(path: PathLike, kind: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df = pq.read_table(path, columns=columns).to_pandas()
+    elif path.suffix in (".feather", ".arrow"):
+        df = feather.read_feather(path, columns=columns)
+    else:
+        schema = SCHEMAS[kind]
+        df = pd.read_csv(path, usecols=columns, dtype=schema["columns"] if schema["default"] is None else None)
+    return apply_schema(df, kind)
+
+
+def iter_dataset(path: PathLike, kind: str, batch_size: int = 100_000,
+                 columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield the dataset in typed chunks of at most batch_size rows."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield apply_schema(batch.to_pandas(), kind)
+    elif path.suffix in (".feather", ".arrow"):
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        for batch in table.to_batches(max_chunksize=batch_size):
+            yield apply_schema(batch.to_pandas(), kind)
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=batch_size):
+            yield apply_schema(chunk, kind)
+
+
+def write_dataset(df: pd.DataFrame, path: PathLike, kind: str) -> Path:
+    """Write a whole frame; the format follows the file suffix."""
+    path = Path(path)
+    df = apply_schema(df, kind)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    elif path.suffix in (".feather", ".arrow"):
+        feather.write_feather(df.reset_index(drop=True), path, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+class DatasetWriter:
+    """
+    Append typed chunks to one Parquet file (or CSV) without keeping earlier chunks in memory.
+
+        with DatasetWriter(path, "tax") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path: PathLike, kind: str):
+        self.path = Path(path)
+        self.kind = kind
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        chunk = apply_schema(chunk, self.kind)
+        if self.path.suffix == ".parquet":
+            # Each chunk has its own categories: categoricals are written as dictionary columns with
+            # one fixed index/value type, so every row group shares one schema while keeping its own
+            # dictionary (readers merge them into one set of categories).
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._schema = pa.schema(
+                    [pa.field(f.name, pa.dictionary(pa.int32(), pa.string())) if pa.types.is_dictionary(f.type) else f
+                     for f in table.schema], metadata=table.schema.metadata)
+                self._writer = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+            self._writer.write_table(table.cast(self._schema))
+        elif self.path.suffix in COLUMNAR_SUFFIXES:
+            raise ValueError("Chunked writing supports .parquet and .csv; convert to Feather afterwards.")
+        else:
+            chunk.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        self.rows += len(chunk)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_generated(path: PathLike, kind: str, generate_chunk: Callable[..., pd.DataFrame],
+                    tasks: Sequence[tuple], workers: int = 1) -> int:
+    """
+    Write generate_chunk(*task) for every task, in task order, to one file.
+    With workers > 1 the chunks are produced by a process pool, at most two per
+    worker in flight, so memory stays flat however many tasks there are.
+    Returns the number of rows written.
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    workers = max(1, min(workers, len(tasks)))
+    with DatasetWriter(path, kind) as writer:
+        if workers == 1:
+            for task in tasks:
+                writer.write(generate_chunk(*task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending, submitted = [], 0
+                while submitted < len(tasks) or pending:
+                    while submitted < len(tasks) and len(pending) < 2 * workers:
+                        pending.append(pool.submit(generate_chunk, *tasks[submitted]))
+                        submitted += 1
+                    writer.write(pending.pop(0).result())
+    return writer.rows
@@ -0,0 +1,482 @@
+# backend/models/db.py
+"""
+Shared database helpers for the schemes, tax and wealth services.
+
+- get_db_connection(): one psycopg2 connection per request (same behaviour the
+  services had individually), or, with DB_POOL_SIZE > 0, one borrowed from a
+  per-process pool (close() returns it, rolled back). Either way its
+  statement_timeout / lock_timeout follow the request's deadline (models/deadlines.py).
+- execute_prepared(): the named hot queries of models/queries.py, as server-side
+  prepared statements on pooled connections (parsed and planned once per
+  connection), or as plain statements on per-request ones (DB_PREPARED overrides).
+- bulk_insert / bulk_delete / upsert_rows: multi-row statements built with
+  psycopg2.extras.execute_values, so N rows cost N/page_size round trips
+  instead of N (cursor.executemany sends one statement per row).
+- copy_rows(): COPY ... FROM STDIN for very large loads (jobs, benchmarks).
+- WriteBehindWriter: optional write-behind mode for per-request upserts. Rows are
+  journaled to disk, queued (bounded, one row per key) and flushed in batches by a
+  background thread. Enable with DB_WRITE_BEHIND=1.
+"""
+
+import atexit
+import csv
+import fcntl
+import glob
+import io
+import json
+import math
+import os
+import re
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from .deadlines import exceeded, remaining
+from .metrics import stage
+
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+WRITE_BEHIND_ENABLED = os.getenv("DB_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_DIR = Path(os.getenv("DB_WRITE_BEHIND_DIR", "/tmp/prajaseva-write-behind"))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0"))
+DB_LOCK_TIMEOUT = float(os.getenv("DB_LOCK_TIMEOUT", "2"))
+# A PREPARE costs a round trip, repaid only when the connection is reused
+DB_PREPARED = os.getenv("DB_PREPARED", "1" if DB_POOL_SIZE > 0 else "0") == "1"
+
+PAGE_SIZE = 1000
+
+
+# --- Connections ---
+def _timeouts_ms() -> Tuple[int, int]:
+    """(statement_timeout, lock_timeout) for the current request; 0 disables a timeout."""
+    left = remaining()
+    if left is None:
+        return 0, int(DB_LOCK_TIMEOUT * 1000)
+    left_ms = max(int(left * 1000), 1)
+    return left_ms, min(left_ms, int(DB_LOCK_TIMEOUT * 1000)) if DB_LOCK_TIMEOUT > 0 else left_ms
+
+
+class PooledConnection:
+    """A pool connection whose close() hands it back (rolled back) instead of closing it."""
+
+    def __init__(self, pool: ThreadedConnectionPool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if not conn.closed:
+                conn.rollback()
+            self._pool.putconn(conn, close=bool(conn.closed))
+        except Exception:
+            self._pool.putconn(conn, close=True)
+
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool, _pool_pid = ThreadedConnectionPool(0, DB_POOL_SIZE, DATABASE_URL), os.getpid()
+    return _pool
+
+
+def _connect():
+    statement_ms, lock_ms = _timeouts_ms()
+    if DB_POOL_SIZE > 0:
+        pool = _get_pool()
+        try:
+            conn = pool.getconn()
+        except PoolError:
+            conn = None     # exhausted: fall through to a connection of its own
+        if conn is not None:
+            # Session settings, outside any transaction (a rolled-back SET would be undone)
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s; SET lock_timeout = %s", (statement_ms, lock_ms))
+            conn.autocommit = False
+            return PooledConnection(pool, conn)
+    # libpq counts connect_timeout in whole seconds (0 waits indefinitely)
+    left = remaining()
+    return psycopg2.connect(DATABASE_URL, connect_timeout=0 if left is None else max(1, math.ceil(left)),
+                            options=f"-c statement_timeout={statement_ms} -c lock_timeout={lock_ms}")
+
+
+def get_db_connection():
+    try:
+        with stage("db_connect"):
+            return _connect()
+    except HTTPException:
+        raise
+    except Exception:
+        left = remaining()
+        if left is not None and left <= 0:
+            raise exceeded("db_connect")
+        # Keep error message generic for security, but log in your infra if needed
+        raise HTTPException(status_code=500, detail="Database connection failed.")
+
+
+# --- Prepared statements ---
+_prepared_on: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()    # raw connection -> names prepared
+
+
+def execute_prepared(cursor, statement, params: Sequence) -> None:
+    """
+    Run a queries.Statement. Prepared statements live as long as the server session
+    (a rollback does not drop them), so each connection prepares a name once.
+    """
+    if not DB_PREPARED:
+        cursor.execute(statement.pyformat, params)
+        return
+    conn = cursor.connection
+    names = _prepared_on.setdefault(conn, set())
+    if statement.name not in names:
+        cursor.execute(f"PREPARE {statement.name} AS {statement.sql}")
+        names.add(statement.name)
+    cursor.execute(f"EXECUTE {statement.name} ({', '.join(['%s'] * len(params))})", params)
+
+
+def to_pyformat(sql: str) -> str:
+    """$1, $2 ... placeholders (in order) as psycopg2's %s."""
+    return re.sub(r"\$\d+", "%s", sql)
+
+
+# --- Multi-row statements ---
+def _values_template(columns: Sequence[str], sql_values: Dict[str, str]) -> str:
+    """'(%s, %s, NOW())' style template: bound params first, then literal SQL expressions."""
+    return "(" + ", ".join(["%s"] * len(columns) + list(sql_values.values())) + ")"
+
+
+def bulk_insert(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence],
+                sql_values: Optional[Dict[str, str]] = None, page_size: int = PAGE_SIZE,
+                skip_existing: Optional[str] = None) -> None:
+    """
+    INSERT many rows with one statement per page. With skip_existing (a unique key,
+    e.g. "user_id, scheme_id") rows whose key is already there are skipped
+    (ON CONFLICT DO NOTHING), e.g. when a concurrent request inserted them first.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    sql_values = sql_values or {}
+    all_columns = ", ".join(list(columns) + list(sql_values))
+    conflict = f" ON CONFLICT ({skip_existing}) DO NOTHING" if skip_existing else ""
+    execute_values(
+        cursor,
+        f"INSERT INTO {table} ({all_columns}) VALUES %s{conflict}",
+        rows,
+        template=_values_template(columns, sql_values),
+        page_size=page_size,
+    )
+
+
+def bulk_delete(cursor, table: str, key_columns: Sequence[str], keys: Iterable[Sequence],
+                page_size: int = PAGE_SIZE) -> None:
+    """DELETE the rows whose key tuple is in `keys` (compared as text, so int/uuid ids both work)."""
+    keys = list(keys)
+    if not keys:
+        return
+    match = " AND ".join(f"t.{c}::text = d.{c}" for c in key_columns)
+    execute_values(
+        cursor,
+        f"DELETE FROM {table} AS t USING (VALUES %s) AS d({', '.join(key_columns)}) WHERE {match}",
+        [tuple(str(v) for v in key) for key in keys],
+        page_size=page_size,
+    )
+
+
+def upsert_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence], key: str,
+                sql_values: Optional[Dict[str, str]] = None, page_size: int = PAGE_SIZE) -> None:
+    """
+    INSERT ... ON CONFLICT (key) DO UPDATE for many rows.
+    Duplicate keys inside one batch are collapsed (last row wins), since Postgres
+    refuses to update the same row twice in one statement.
+    """
+    sql_values = sql_values or {}
+    key_pos = list(columns).index(key)
+    latest = {}
+    for row in rows:
+        latest[row[key_pos]] = row
+    if not latest:
+        return
+
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in list(columns) + list(sql_values) if c != key)
+    all_columns = ", ".join(list(columns) + list(sql_values))
+    execute_values(
+        cursor,
+        f"INSERT INTO {table} ({all_columns}) VALUES %s ON CONFLICT ({key}) DO UPDATE SET {updates}",
+        list(latest.values()),
+        template=_values_template(columns, sql_values),
+        page_size=page_size,
+    )
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """Stream rows with COPY FROM STDIN (CSV). Returns the number of rows sent."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(["\\N" if v is None else v for v in row])
+        count += 1
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer,
+    )
+    return count
+
+
+# --- Write-behind ---
+class WriteBehindWriter:
+    """
+    Batches upserts from many requests into periodic flushes.
+
+    - submit() appends the row to a per-process journal (fsync'd) before queueing it,
+      so an accepted row survives a crash. Each writer holds an flock on
+      `<table>.<pid>.lock` while it lives; journals whose lock can be taken belong to a
+      writer that is gone and are replayed when the next writer for the table starts
+      (one process at a time, under a lock file, so a journal is never replayed twice).
+      The lock, not PID liveness, decides: PIDs are reused across container restarts.
+    - The queue holds one row per key: a newer row for a queued key replaces it.
+    - The queue is bounded (`max_queue` keys). When it is full, submit() returns False
+      and the caller must write synchronously instead (backpressure). It only does so
+      for keys with no row queued or being flushed. A row for such a key is always
+      accepted, so a synchronous write can never be overwritten by an older queued row.
+    - A flush happens every `flush_interval` seconds or once `batch_size` rows are
+      waiting. The journal is rotated into a segment before the batch is written and
+      the segment is deleted only after the batch commits. A failed batch is retried
+      as it is, and the queue is not drained meanwhile: during an outage it fills up
+      and submit() pushes back, instead of the failed batches growing without bound.
+    """
+
+    def __init__(self, table: str, columns: Sequence[str], key: str,
+                 sql_values: Optional[Dict[str, str]] = None, max_queue: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 0.5,
+                 journal_dir: Path = WRITE_BEHIND_DIR, fsync: bool = True):
+        self.table = table
+        self.columns = list(columns)
+        self.key = key
+        self._key_pos = self.columns.index(key)
+        self.sql_values = sql_values or {}
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._pending: Dict[object, List] = {}     # key -> latest row, insertion ordered
+        self._batch: Optional[Tuple[Path, List[List]]] = None   # (segment, rows) being written
+        self._inflight: set = set()                # keys of _batch
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._segment_seq = 0
+        self._journal_dir = journal_dir
+        self._pid = None
+        self._owner_lock = None
+        self.flushed_rows = 0
+        self.rejected_rows = 0
+        _writers.append(self)
+
+    def _ensure_started(self) -> None:
+        """Start lazily in the process that submits, so a writer created before a fork still works."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        if self._owner_lock is not None:
+            # Inherited across a fork: drop our copy so the parent's lock dies with the parent
+            self._owner_lock.close()
+            self._owner_lock = None
+        self._journal_dir.mkdir(parents=True, exist_ok=True)
+        self._journal_path = self._journal_dir / f"{self.table}.{self._pid}.journal"
+        self._recover()
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.table}", daemon=True)
+        self._thread.start()
+
+    def _recover(self) -> None:
+        """Replay journals (and unflushed segments) whose writer no longer holds its lock, then take ours."""
+        def replay_order(path):
+            # <table>.<pid>.journal[.<seq>]: older segments first, the live journal last
+            parts = Path(path).name.split(".")
+            return int(parts[1]), int(parts[3]) if len(parts) > 3 else float("inf")
+
+        # Workers starting together take turns: the second one finds the files already replayed
+        with open(self._journal_dir / f"{self.table}.recover.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            paths = sorted(glob.glob(str(self._journal_dir / f"{self.table}.*.journal*")), key=replay_order)
+            owners: Dict[int, List[str]] = {}
+            for path in paths:
+                owners.setdefault(replay_order(path)[0], []).append(path)
+            # Our own PID's files are left by an earlier process that had it (container restart)
+            owners.setdefault(os.getpid(), [])
+            for pid, files in owners.items():
+                owner_lock = self._take_owner_lock(pid)
+                if owner_lock is None:
+                    continue   # its writer is alive
+                replayed = self._replay(files)
+                if pid == os.getpid():
+                    self._owner_lock = owner_lock
+                else:
+                    if replayed:
+                        _remove_if_exists(owner_lock.name)
+                    owner_lock.close()
+
+    def _take_owner_lock(self, pid: int):
+        """The open, flock'd lock file of `pid`'s writer, or None while that writer holds it."""
+        owner_lock = open(self._journal_dir / f"{self.table}.{pid}.lock", "a")
+        try:
+            fcntl.flock(owner_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            owner_lock.close()
+            return None
+        return owner_lock
+
+    def _replay(self, paths: List[str]) -> bool:
+        """Write and delete journal files in order. Returns False when one failed (it and the rest are kept)."""
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                if rows:
+                    self._write(rows)
+                    print(f"Write-behind: replayed {len(rows)} rows for {self.table} from {path}")
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                # Keep the file (and the later ones, in order); the next writer to start retries them
+                print(f"Write-behind: could not replay {path}: {e}")
+                return False
+        return True
+
+    def submit(self, row: Sequence) -> bool:
+        """
+        Journal and queue one row. Returns False (row not accepted, write it now) when
+        the queue is full and no row with the same key is queued or being flushed.
+        """
+        row = list(row)
+        key = row[self._key_pos]
+        with self._lock:
+            self._ensure_started()
+            if len(self._pending) >= self.max_queue and key not in self._pending and key not in self._inflight:
+                self.rejected_rows += 1
+                return False
+            self._journal.write(json.dumps(row) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._pending.pop(key, None)
+            self._pending[key] = row
+        return True
+
+    def _write(self, rows: List[List]) -> None:
+        conn = psycopg2.connect(DATABASE_URL)
+        try:
+            with conn.cursor() as cursor:
+                upsert_rows(cursor, self.table, self.columns, rows, self.key, self.sql_values)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of rows written."""
+        if self._pid != os.getpid():
+            return 0
+        with self._flush_lock:
+            written = 0
+            # A batch left by a failed flush first, then what is queued now
+            for _ in range(2):
+                # Rotate the journal together with draining the queue, so the segment holds exactly this batch
+                with self._lock:
+                    if self._batch is None and self._pending:
+                        rows, self._pending = list(self._pending.values()), {}
+                        self._journal.close()
+                        self._segment_seq += 1
+                        segment = self._journal_path.with_name(f"{self._journal_path.name}.{self._segment_seq:06d}")
+                        os.replace(self._journal_path, segment)
+                        self._journal = open(self._journal_path, "a", encoding="utf-8")
+                        self._batch = (segment, rows)
+                        self._inflight = {r[self._key_pos] for r in rows}
+                    if self._batch is None:
+                        break
+                    segment, rows = self._batch
+                self._write(rows)  # raises: the batch is retried by the next flush, before anything newer
+                with self._lock:
+                    self._batch, self._inflight = None, set()
+                os.remove(segment)
+                written += len(rows)
+                self.flushed_rows += len(rows)
+            return written
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while not self._stop.is_set():
+            self._stop.wait(min(self.flush_interval, 0.05))
+            due = time.monotonic() - last_flush >= self.flush_interval
+            if due or len(self._pending) >= self.batch_size:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Write-behind flush for {self.table} failed, will retry: {e}")
+                last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Stop the flusher and write what is left (called on app shutdown)."""
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._journal.close()
+            clean = not self._pending and os.path.getsize(self._journal_path) == 0
+            if clean:
+                os.remove(self._journal_path)
+            if self._owner_lock is not None:
+                if clean and self._batch is None:
+                    _remove_if_exists(self._owner_lock.name)
+                self._owner_lock.close()
+                self._owner_lock = None
+            self._pid = None
+
+
+_writers: List[WriteBehindWriter] = []
+
+
+@atexit.register
+def close_writers() -> None:
+    """Flush every write-behind writer of this process (app shutdown / interpreter exit)."""
+    for writer in _writers:
+        try:
+            writer.close()
+        except Exception as e:
+            print(f"Write-behind close for {writer.table} failed; rows stay journaled: {e}")
+
+
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
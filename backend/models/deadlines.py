@@ -0,0 +1,140 @@
+# backend/models/deadlines.py
+"""
+End-to-end request deadlines.
+
+DeadlineMiddleware (root app) gives every request an absolute deadline: the
+route's budget (REQUEST_DEADLINE, or the longest matching prefix in
+REQUEST_DEADLINES, e.g. "/chat=30,/admin=0"; 0 means none), or the client's own
+X-Request-Timeout (seconds, capped at REQUEST_DEADLINE_MAX). It lives in a context
+variable, so handlers, dependencies and threadpool code see it without passing it around.
+
+It is enforced where the request waits:
+- at every stage() boundary (models/metrics.py): a request past its deadline stops
+  there with 504 instead of starting the next stage;
+- in Postgres: get_db_connection() sets statement_timeout to the time left, and
+  lock_timeout to the smaller of that and DB_LOCK_TIMEOUT, so a query or a lock wait is
+  cancelled server side. The resulting QueryCanceled / LockNotAvailable become 504s;
+- on the LLM call, as its request timeout (models/chatbot.py).
+
+Every expiry counts in prajaseva_deadline_exceeded_total{service, stage}.
+
+    left = remaining()          # seconds, or None without a deadline
+    check("features")           # raises DeadlineExceeded (504) once expired
+"""
+
+import contextvars
+import os
+import time
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from psycopg2.errors import LockNotAvailable, QueryCanceled
+from starlette.datastructures import Headers
+
+from .metrics import Counter, add_stage_checkpoint, current_service, register
+from .responses import FastJSONResponse
+
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "10"))
+REQUEST_DEADLINE_MAX = float(os.getenv("REQUEST_DEADLINE_MAX", "60"))
+DEADLINE_HEADER = "X-Request-Timeout"
+
+DEADLINE_EXCEEDED = register(Counter("prajaseva_deadline_exceeded_total", "Requests stopped by their deadline.",
+                                     ["service", "stage"]))
+
+DB_CANCELLED = (QueryCanceled, LockNotAvailable)
+
+
+def parse_route_deadlines(spec: str) -> Dict[str, float]:
+    routes = {}
+    for part in spec.split(","):
+        prefix, _, seconds = part.strip().partition("=")
+        if prefix and seconds:
+            routes[prefix] = float(seconds)
+    return routes
+
+
+ROUTE_DEADLINES = parse_route_deadlines(os.getenv("REQUEST_DEADLINES", "/chat=30,/tax/what_if=15,/admin=0,/metrics=0"))
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, stage: str):
+        super().__init__(status_code=504, detail="Request deadline exceeded.")
+        self.stage = stage
+
+
+def exceeded(stage: str) -> DeadlineExceeded:
+    """Count an expiry at `stage` and return the exception to raise."""
+    DEADLINE_EXCEEDED.inc(current_service(), stage)
+    return DeadlineExceeded(stage)
+
+
+# --- Reading the deadline ---
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check(stage: str) -> None:
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise exceeded(stage)
+
+
+add_stage_checkpoint(check)
+
+
+def passthrough(e: Exception, stage: str = "db") -> None:
+    """For a handler's catch-all: re-raise HTTP errors (404, 504, ...) and DB cancellations as 504."""
+    if isinstance(e, HTTPException):
+        raise e
+    if isinstance(e, DB_CANCELLED):
+        raise exceeded(stage) from e
+
+
+async def _db_cancelled(request: Request, exc: Exception):
+    DEADLINE_EXCEEDED.inc(current_service(), "db")
+    return FastJSONResponse({"detail": "Request deadline exceeded."}, status_code=504)
+
+
+# Service apps: FastAPI(..., exception_handlers=deadline_handlers), for queries outside a catch-all
+deadline_handlers = {QueryCanceled: _db_cancelled, LockNotAvailable: _db_cancelled}
+
+
+# --- Setting it per request ---
+def route_deadline(path: str) -> Optional[float]:
+    """Budget in seconds for `path` (longest matching prefix), None for no deadline."""
+    best, seconds = "", REQUEST_DEADLINE
+    for prefix, value in ROUTE_DEADLINES.items():
+        if path.startswith(prefix) and len(prefix) > len(best):
+            best, seconds = prefix, value
+    return seconds if seconds > 0 else None
+
+
+def request_budget(path: str, header: Optional[str]) -> Optional[float]:
+    """The route's budget, or the client's X-Request-Timeout (positive, capped) when it sends one."""
+    if header:
+        try:
+            seconds = float(header)
+        except ValueError:
+            seconds = 0.0
+        if seconds > 0:
+            return min(seconds, REQUEST_DEADLINE_MAX)
+    return route_deadline(path)
+
+
+class DeadlineMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        budget = request_budget(scope["path"], Headers(scope=scope).get(DEADLINE_HEADER))
+        token = _deadline.set(time.monotonic() + budget if budget is not None else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
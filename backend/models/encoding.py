@@ -0,0 +1,130 @@
+# backend/models/encoding.py
+"""
+Serving-side feature encoding without pandas.
+
+Every prediction used to build a one-row DataFrame and run it through the fitted
+ColumnTransformer / OneHotEncoder, which costs more than walking the trees. An
+encoder built once from the fitted pipeline does the same mapping with plain
+lookups instead:
+
+- the output row is a preallocated float64 template (dropped / unknown categories
+  stay 0) copied per request,
+- passthrough columns are written to their output index,
+- each one-hot column has a category -> output index dict taken from the fitted
+  OneHotEncoder's categories_ (and drop_idx_).
+
+It then feeds the pipeline's final estimator directly. serving_encoder(model)
+returns a FrameEncoder (the DataFrame path through the whole model) for anything
+it cannot reproduce exactly: other transformers, infrequent-category grouping, or
+an output width that does not match the fitted preprocessor.
+
+    encoder = serving_encoder(pipeline)
+    row = encoder.encode({"age": 30, "state": "Kerala", ...})
+    with array_input():
+        encoder.estimator.predict(row)
+"""
+
+import warnings
+from contextlib import contextmanager
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+
+@contextmanager
+def array_input():
+    """
+    Silence the "X does not have valid feature names" warning of estimators fitted on
+    DataFrames while they are given encoded arrays (the encoder guarantees the column order).
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        yield
+
+
+class FrameEncoder:
+    """Fallback: the record as a one-row DataFrame, predicted by the whole model."""
+
+    def __init__(self, model, columns: Optional[Sequence[str]] = None):
+        self.estimator = model
+        self.columns = list(columns) if columns is not None else None
+
+    def encode(self, record: Mapping) -> pd.DataFrame:
+        return pd.DataFrame([record], columns=self.columns)
+
+
+class FeatureEncoder:
+    """Maps a record straight to the final estimator's input row."""
+
+    def __init__(self, estimator, width: int, numeric: List[Tuple[str, int]],
+                 categorical: List[Tuple[str, Dict[object, Optional[int]], bool]]):
+        self.estimator = estimator
+        self.width = width
+        self.numeric = numeric
+        self.categorical = categorical
+        self._template = np.zeros((1, width), dtype=np.float64)
+
+    def encode(self, record: Mapping) -> np.ndarray:
+        row = self._template.copy()
+        values = row[0]
+        for column, index in self.numeric:
+            values[index] = record[column]
+        for column, lookup, strict in self.categorical:
+            value = record[column]
+            if value in lookup:
+                index = lookup[value]
+                if index is not None:
+                    values[index] = 1.0
+            elif strict:
+                raise ValueError(f"Found unknown categories [{value!r}] in column {column!r} during transform")
+        return row
+
+    @classmethod
+    def from_model(cls, model) -> Optional["FeatureEncoder"]:
+        """The encoder for a fitted Pipeline(ColumnTransformer, estimator) or a bare estimator, else None."""
+        if not isinstance(model, Pipeline):
+            names = getattr(model, "feature_names_in_", None)
+            if names is None:
+                return None
+            return cls(model, len(names), [(str(c), i) for i, c in enumerate(names)], [])
+
+        if len(model.steps) != 2 or not isinstance(model.steps[0][1], ColumnTransformer):
+            return None
+        transformer, estimator = model.steps[0][1], model.steps[1][1]
+        input_names = list(getattr(transformer, "feature_names_in_", []))
+        numeric, categorical, offset = [], [], 0
+        for _, step, columns in transformer.transformers_:
+            columns = [input_names[c] if isinstance(c, (int, np.integer)) else c for c in np.atleast_1d(columns).tolist()]
+            if step == "drop" or not columns:
+                continue
+            # A fitted "passthrough" is stored as an identity FunctionTransformer
+            if step == "passthrough" or (isinstance(step, FunctionTransformer) and step.func is None):
+                numeric += [(c, offset + i) for i, c in enumerate(columns)]
+                offset += len(columns)
+            elif isinstance(step, OneHotEncoder) and not getattr(step, "_infrequent_enabled", False):
+                drop_idx = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(columns)
+                for column, categories, dropped in zip(columns, step.categories_, drop_idx):
+                    lookup, position = {}, offset
+                    for j, category in enumerate(categories.tolist()):
+                        if dropped is not None and j == dropped:
+                            lookup[category] = None
+                        else:
+                            lookup[category] = position
+                            position += 1
+                    categorical.append((column, lookup, step.handle_unknown == "error"))
+                    offset = position
+            else:
+                return None
+
+        if offset != len(transformer.get_feature_names_out()):
+            return None
+        return cls(estimator, offset, numeric, categorical)
+
+
+def serving_encoder(model, columns: Optional[Sequence[str]] = None):
+    """FeatureEncoder for `model` when it can be extracted, else the DataFrame fallback."""
+    return FeatureEncoder.from_model(model) or FrameEncoder(model, columns)
@@ -0,0 +1,63 @@
+# backend/models/http_cache.py
+"""
+Conditional GET helpers for the stored-result endpoints (GET /tax/result, ...).
+
+A stored result changes only when its predict endpoint rewrites the row, which also
+sets generated_at, so the ETag is a hash of (kind, user, generated_at). Services
+look up generated_at first when the request carries If-None-Match and answer
+304 Not Modified without reading the rest of the row.
+
+ETags are weak (W/"..."): the same result may be sent gzip-compressed or not.
+Responses are per user, hence Cache-Control: private (shared proxies must not store
+them) and Vary: Authorization. RESULT_MAX_AGE (seconds, default 0) lets the browser
+reuse a result without asking; with 0 it revalidates every time (no-cache), which a
+fresh POST predict needs to be seen immediately.
+"""
+
+import hashlib
+import os
+from typing import Optional, Union
+
+from fastapi import Request, Response
+
+from .responses import FastJSONResponse
+
+RESULT_MAX_AGE = int(os.getenv("RESULT_MAX_AGE", "0"))
+
+
+def result_etag(kind: str, user_id: str, version) -> str:
+    """Weak ETag for one stored result; `version` is its generated_at (or a digest of the rows)."""
+    digest = hashlib.sha256(f"{kind}\0{user_id}\0{version}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _headers(etag: str) -> dict:
+    cache_control = f"private, max-age={RESULT_MAX_AGE}" if RESULT_MAX_AGE > 0 else "private, no-cache"
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """If-None-Match against `etag` (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_headers(etag))
+
+
+def result_response(request: Request, payload: Union[dict, str], etag: str) -> Response:
+    """
+    The stored result with its validators, or 304 when the client already has it.
+    `payload` may be already-encoded JSON text (e.g. spliced from JSON columns as stored).
+    """
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if isinstance(payload, str):
+        return Response(payload, media_type="application/json", headers=_headers(etag))
+    return FastJSONResponse(payload, headers=_headers(etag))
@@ -0,0 +1,320 @@
+# backend/models/inference.py
+"""
+Optional out-of-process inference for the schemes, wealth and tax models.
+
+By default every model runs on the request thread (predict(...) below just calls the
+pipeline). With INFERENCE_POOL=1 the fitted classifiers are hosted in a pool of
+processes instead:
+
+- The web tier keeps the cheap part of each model: it encodes the request into a
+  float64 feature array (encoding.py, or the fitted preprocessor).
+- Each pool process owns a shared-memory slot and starts without models. The first
+  call for a model version (registry.py) tells it to load that version from the
+  model file; it checks the files still have the version's fingerprint, so a
+  version whose files were replaced since (e.g. after a rollback) is never served
+  from a newer file: such calls run in-process instead. Hot reloads reach the pool
+  without a restart. Each process keeps the INFERENCE_VERSIONS_KEPT latest versions
+  of each model (default 1: a loaded forest can be many times its compressed file
+  size, so older versions are dropped before the new one is loaded; rolled-back
+  calls then run in-process until the next reload).
+- For each call the web tier writes the feature array into the slot, sends
+  (model, version, method, shape) over the process's pipe and blocks on the reply;
+  the process predicts and writes the result back into the same slot. Only a few
+  bytes of metadata cross the pipe; arrays that do not fit in the slot fall back to
+  being pickled over it.
+- Waiting on the pipe releases the GIL, so the web worker keeps parsing requests and
+  encoding responses while trees are being walked in another process.
+- Waiting for an idle process and for its reply is bounded by the request's deadline
+  (models/deadlines.py), or INFERENCE_TIMEOUT without one. Past the deadline the call
+  raises a 504 (stage "inference"); past INFERENCE_TIMEOUT it runs in-process. A process
+  that missed its reply is taken out of rotation: it is put back if it answers within
+  INFERENCE_TIMEOUT (e.g. a slow model load), and killed and replaced otherwise.
+
+Pool processes are started with the "spawn" method (a clean interpreter: forking a
+threaded web worker is unsafe), lazily on first use in each web process, and are
+restarted if one dies (the request is then served in-process).
+
+Every web worker has its own pool, so the processes multiply: W gunicorn workers with
+P pool processes each run W x P of them, and each one loads its own copy of every
+model it serves (spawned, so nothing is shared with the preloaded master). To keep
+that bounded, INFERENCE_WORKERS is the total for the host: it is split evenly across
+the WEB_CONCURRENCY workers (gunicorn.conf.py exports the count), with at least one
+process per web worker. The pools then hold at most max(INFERENCE_WORKERS, W) copies of the models.
+"""
+
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from .deadlines import DeadlineExceeded, exceeded, remaining
+from .encoding import array_input
+
+INFERENCE_POOL_ENABLED = os.getenv("INFERENCE_POOL", "0") == "1"
+# Pool processes on the host, split across the web workers (at least one each)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+WEB_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+POOL_WORKERS = max(1, INFERENCE_WORKERS // WEB_WORKERS)
+SLOT_BYTES = int(os.getenv("INFERENCE_SLOT_BYTES", str(1 << 20)))
+# Versions of one model a pool process keeps loaded
+VERSIONS_KEPT = max(1, int(os.getenv("INFERENCE_VERSIONS_KEPT", "1")))
+# Longest wait on the pool (idle process, then its reply) for requests without a deadline
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "60"))
+
+
+def split_pipeline(model):
+    """(preprocessor or None, final estimator) of a fitted pipeline or bare estimator."""
+    if isinstance(model, Pipeline):
+        return model[:-1], model.steps[-1][1]
+    return None, model
+
+
+def to_features(model, frame) -> np.ndarray:
+    """What the pool's estimator expects: the preprocessed frame as a dense float64 array."""
+    preprocessor, _ = split_pipeline(model)
+    features = preprocessor.transform(frame) if preprocessor is not None else frame
+    if hasattr(features, "toarray"):
+        features = features.toarray()
+    return np.ascontiguousarray(features, dtype=np.float64)
+
+
+class StaleModel(LookupError):
+    """The model files no longer hold the requested version."""
+
+
+def _wait() -> float:
+    """Seconds this request may still wait on the pool."""
+    left = remaining()
+    return INFERENCE_TIMEOUT if left is None else max(min(left, INFERENCE_TIMEOUT), 0.0)
+
+
+def _timed_out(what: str) -> Exception:
+    """504 once the request's deadline has passed, else TimeoutError (an OSError: served in-process)."""
+    left = remaining()
+    if left is not None and left <= 0:
+        return exceeded("inference")
+    return TimeoutError(f"{what} within {INFERENCE_TIMEOUT:g} s")
+
+
+# --- Pool process ---
+def _evicted(loaded: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """The versions of one model (oldest first) to drop before loading another."""
+    return loaded[:max(len(loaded) - VERSIONS_KEPT + 1, 0)]
+
+
+def _load_version(version: str, files: List[str]):
+    """The final estimator of the pickled model files[0], or None if the files are not at `version`."""
+    import joblib
+    from .registry import fingerprint
+
+    if fingerprint(files) != version:
+        return None
+    estimator = split_pipeline(joblib.load(files[0]))[1]
+    if fingerprint(files) != version:   # replaced while loading
+        return None
+    # One pool process = one core; the pool itself is the parallelism
+    estimator.set_params(**{k: 1 for k in estimator.get_params() if k.endswith("n_jobs")})
+    return estimator
+
+
+def _serve(conn, slot_name: str) -> None:
+    estimators: Dict[Tuple[str, str], object] = {}
+    slot = shared_memory.SharedMemory(name=slot_name)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            if message[0] == "load":
+                _, name, version, files = message
+                # Make room first, so only one extra model is ever being loaded
+                for stale in _evicted([key for key in estimators if key[0] == name]):
+                    del estimators[stale]
+                try:
+                    estimator = _load_version(version, files)
+                except Exception as e:
+                    conn.send(("error", repr(e), None))
+                    continue
+                if estimator is not None:
+                    estimators[(name, version)] = estimator
+                conn.send(("loaded", estimator is not None, None))
+                continue
+            _, name, version, method, shape, inline = message
+            try:
+                features = inline if inline is not None else np.ndarray(shape, dtype=np.float64, buffer=slot.buf)
+                with array_input():
+                    result = np.asarray(getattr(estimators[(name, version)], method)(features))
+                if result.dtype != object and result.nbytes <= slot.size:
+                    np.ndarray(result.shape, dtype=result.dtype, buffer=slot.buf)[...] = result
+                    conn.send(("shm", result.shape, result.dtype.str))
+                else:
+                    conn.send(("inline", result, None))
+            except Exception as e:
+                conn.send(("error", repr(e), None))
+    finally:
+        slot.close()
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.slot = shared_memory.SharedMemory(create=True, size=SLOT_BYTES)
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_serve, args=(child, self.slot.name), name="inference-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.loaded = []    # (name, version) sent to the process, oldest first
+        self.awaiting: Optional[tuple] = None   # ("load" | "call", name, version) whose reply is unread
+
+    def _reply(self, kind: str, name: str, version: str):
+        self.awaiting = (kind, name, version)
+        if not self.conn.poll(_wait()):
+            raise _timed_out("no reply from the inference worker")
+        reply = self.conn.recv()
+        self.awaiting = None
+        return reply
+
+    def finish(self, timeout: float) -> bool:
+        """Read the reply a timed-out call left unread. False if the process died or is still busy."""
+        if self.awaiting is None or not self.process.is_alive():
+            return False
+        try:
+            if not self.conn.poll(timeout):
+                return False
+            kind, payload, _ = self.conn.recv()
+        except (EOFError, OSError):
+            return False
+        if self.awaiting[0] == "load" and kind == "loaded" and payload:
+            self.loaded.append(self.awaiting[1:])
+        self.awaiting = None
+        return True
+
+    def call(self, name: str, version: str, files: List[str], method: str, features: np.ndarray):
+        if (name, version) not in self.loaded:
+            # Mirror the process's eviction
+            for stale in _evicted([key for key in self.loaded if key[0] == name]):
+                self.loaded.remove(stale)
+            self.conn.send(("load", name, version, files))
+            kind, payload, _ = self._reply("load", name, version)
+            if kind == "error":
+                raise StaleModel(f"inference worker could not load {name} {version}: {payload}")
+            if not payload:
+                raise StaleModel(f"{name} model files are no longer at version {version}")
+            self.loaded.append((name, version))
+        if features.nbytes <= self.slot.size:
+            np.ndarray(features.shape, dtype=np.float64, buffer=self.slot.buf)[...] = features
+            self.conn.send(("call", name, version, method, features.shape, None))
+        else:
+            self.conn.send(("call", name, version, method, features.shape, features))
+        kind, payload, dtype = self._reply("call", name, version)
+        if kind == "shm":
+            return np.ndarray(payload, dtype=np.dtype(dtype), buffer=self.slot.buf).copy()
+        if kind == "inline":
+            return payload
+        raise RuntimeError(f"inference worker failed: {payload}")
+
+    def close(self, timeout: float = 5) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.kill()
+        self.slot.close()
+        self.slot.unlink()
+
+
+class InferencePool:
+    """A fixed set of model-hosting processes; each call checks one out exclusively."""
+
+    def __init__(self, workers: int = POOL_WORKERS):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stale = set()     # (name, version) the files no longer match: served in-process
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = [_Worker(self._ctx) for _ in range(max(1, workers))]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def call(self, name: str, version: str, files: List[str], method: str, features: np.ndarray):
+        if (name, version) in self._stale:
+            raise StaleModel(f"{name} model files are no longer at version {version}")
+        try:
+            worker = self._idle.get(timeout=_wait())
+        except queue.Empty:
+            raise _timed_out("no idle inference worker") from None
+        try:
+            return worker.call(name, version, files, method, features)
+        except StaleModel:
+            self._stale.add((name, version))
+            raise
+        except (EOFError, OSError, DeadlineExceeded):
+            # The process died (OOM, crash) or did not answer in time: out of rotation until
+            # _recover puts it back or replaces it; the caller falls back or returns 504
+            threading.Thread(target=self._recover, args=(worker,), name="inference-recover", daemon=True).start()
+            worker = None
+            raise
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+    def _recover(self, worker: _Worker) -> None:
+        if not worker.finish(INFERENCE_TIMEOUT):
+            self._workers.remove(worker)
+            worker.close(timeout=0)
+            worker = _Worker(self._ctx)
+            self._workers.append(worker)
+        self._idle.put(worker)
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+
+
+_pool: Optional[InferencePool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> InferencePool:
+    """The pool of this web process (created on first use, so each forked worker gets its own)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool, _pool_pid = InferencePool(), os.getpid()
+        return _pool
+
+
+@atexit.register
+def close_pool() -> None:
+    global _pool
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close()
+        _pool = None
+
+
+# --- Entry point used by the services ---
+def predict(name: str, model, frame, method: str = "predict", version=None):
+    """
+    model.<method>(frame), run in the inference pool when INFERENCE_POOL=1.
+    `version` is the registry ModelVersion `model` was loaded from (the pool loads the same
+    version from its files); without one the call runs in-process.
+    """
+    if not INFERENCE_POOL_ENABLED or version is None:
+        with array_input():
+            return getattr(model, method)(frame)
+    features = to_features(model, frame)
+    try:
+        return get_pool().call(name, version.id, [str(p) for p in version.files], method, features)
+    except (EOFError, OSError, StaleModel):
+        with array_input():
+            return getattr(model, method)(frame)
@@ -0,0 +1,204 @@
+# backend/models/metrics.py
+"""
+In-process request / stage latency metrics in Prometheus text format.
+
+- MetricsMiddleware (pure ASGI, on the root app) times every request and counts
+  responses by service, method, route template and status.
+- stage("db_fetch") times one step of a request (auth, db_connect, db_fetch,
+  features, inference, db_upsert, llm, ...). The service label comes from the
+  request being handled, so the same helper works in every sub-app and in the
+  shared modules (auth, db).
+- render() produces the exposition text served at /metrics on the root app.
+
+METRICS_ENABLED=0 turns stage() into a shared no-op context manager and leaves
+the middleware and /metrics out entirely; benchmarks/metrics_overhead.py
+measures the cost in both modes.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Seconds. Covers cached auth (microseconds) up to slow LLM calls.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_service = contextvars.ContextVar("metrics_service", default="root")
+
+
+# --- Metric types ---
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str]):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((values, (list(counts), total)) for values, (counts, total) in self._series.items())
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+REQUEST_LATENCY = Histogram("prajaseva_request_seconds", "End-to-end request latency.", ["service", "method", "route"])
+REQUEST_COUNT = Counter("prajaseva_requests_total", "Requests by response status.", ["service", "method", "route", "status"])
+STAGE_LATENCY = Histogram("prajaseva_stage_seconds", "Latency of one stage of a request.", ["service", "stage"])
+STAGE_ERRORS = Counter("prajaseva_stage_errors_total", "Stages that raised.", ["service", "stage"])
+
+_registry: List[object] = [REQUEST_LATENCY, REQUEST_COUNT, STAGE_LATENCY, STAGE_ERRORS]
+_gauges: List[Tuple[str, str, Callable[[], float]]] = []
+_checkpoints: List[Callable[[str], None]] = []
+
+
+def register(metric):
+    """Add a Counter / Histogram defined in another module to the exposition."""
+    _registry.append(metric)
+    return metric
+
+
+def register_gauge(name: str, help: str, fn: Callable[[], float]) -> None:
+    """A value read at scrape time (cache sizes, queue depths, ...)."""
+    _gauges.append((name, help, fn))
+
+
+def add_stage_checkpoint(fn: Callable[[str], None]) -> None:
+    """`fn(stage_name)` runs as every stage starts (with or without metrics) and may raise to stop the request."""
+    _checkpoints.append(fn)
+
+
+def current_service() -> str:
+    return _service.get()
+
+
+# --- Stage timers ---
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        service = _service.get()
+        STAGE_LATENCY.observe(time.perf_counter() - self.start, service, self.name)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(service, self.name)
+        return False
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+def stage(name: str):
+    """`with stage("inference"): ...` records the block's duration for the current service."""
+    for checkpoint in _checkpoints:
+        checkpoint(name)
+    return _Stage(name) if METRICS_ENABLED else _NOOP
+
+
+# --- Middleware ---
+class MetricsMiddleware:
+    """Times HTTP requests; the service label is the first path segment (/tax, /schemes, ...)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        segment = scope["path"].split("/", 2)[1]
+        token = _service.set(segment or "root")
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Route templates (not raw paths) keep label cardinality bounded
+            route = scope.get("route")
+            template = scope.get("root_path", "") + route.path if route is not None and hasattr(route, "path") else "unmatched"
+            service = _service.get()
+            REQUEST_LATENCY.observe(elapsed, service, scope["method"], template)
+            REQUEST_COUNT.inc(service, scope["method"], template, str(status_code))
+            _service.reset(token)
+
+
+# --- Exposition ---
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    for name, help, fn in _gauges:
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {fn():g}"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,217 @@
+# backend/models/migrate.py
+"""
+Schema migrations for the services' tables (backend/migrations/NNNN_name.sql).
+
+Files are applied in version order, each once: schema_migrations records the
+version, name and sha256 of every applied file, and an applied file that has since
+been edited is reported (never re-run). A run holds a Postgres advisory lock, so two
+deploys starting at once apply each migration once.
+
+A migration runs in one transaction, unless its first line is
+`-- migrate: no-transaction` (CREATE INDEX CONCURRENTLY). Then its statements
+(separated by a `;` at the end of a line) run one by one, and must be idempotent:
+a run interrupted half way repeats them.
+
+--check EXPLAINs the services' hot statements (models/queries.py) with sequential
+scans disabled, and each ON CONFLICT upsert: it fails when a statement would still
+scan or sort a table (its index is missing), when an upsert has no unique key to
+conflict on, or when an index is INVALID (a failed concurrent build).
+
+Run from the backend directory:
+    python -m models.migrate              # apply pending migrations
+    python -m models.migrate --status
+    python -m models.migrate --to 1       # up to version 1 only
+    python -m models.migrate --check
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import psycopg2
+from dotenv import load_dotenv
+
+from .queries import STATEMENTS, UPSERT_KEYS
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+LOCK_KEY = 7_305_115_001     # pg_advisory_lock key for migration runs
+NO_TRANSACTION = "-- migrate: no-transaction"
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    sql: str
+    checksum: str
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION)
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = re.fullmatch(r"(\d+)_(\w+)\.sql", path.name)
+        if not match:
+            raise ValueError(f"Migration file names look like 0001_name.sql, got {path.name}")
+        sql = path.read_text()
+        migrations.append(Migration(int(match.group(1)), match.group(2), sql, hashlib.sha256(sql.encode()).hexdigest()))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def split_statements(sql: str) -> Iterator[str]:
+    """Statements of a no-transaction file: each ends with `;` at the end of a line."""
+    current = []
+    for line in sql.splitlines():
+        if line.strip().startswith("--") and not current:
+            continue
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statement = "\n".join(current).strip()
+            current = []
+            if statement:
+                yield statement
+    if "\n".join(current).strip():
+        yield "\n".join(current).strip()
+
+
+def _ensure_table(cursor) -> None:
+    cursor.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY, name TEXT NOT NULL, checksum TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW())""")
+
+
+def applied_migrations(cursor) -> Dict[int, tuple]:
+    _ensure_table(cursor)
+    cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+def migrate(conn, target: Optional[int] = None, directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Apply the pending migrations up to `target` (all by default). Returns those applied."""
+    conn.autocommit = True
+    done = []
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+        try:
+            applied = applied_migrations(cursor)
+            for migration in load_migrations(directory):
+                if target is not None and migration.version > target:
+                    break
+                if migration.version in applied:
+                    if applied[migration.version][1] != migration.checksum:
+                        print(f"⚠️ Migration {migration.version:04d}_{migration.name} changed after it was applied "
+                              f"(not re-run); add a new migration instead")
+                    continue
+                print(f"⏳ Applying {migration.version:04d}_{migration.name}")
+                if migration.transactional:
+                    cursor.execute("BEGIN")
+                    try:
+                        cursor.execute(migration.sql)
+                        _record(cursor, migration)
+                        cursor.execute("COMMIT")
+                    except Exception:
+                        cursor.execute("ROLLBACK")
+                        raise
+                else:
+                    for statement in split_statements(migration.sql):
+                        cursor.execute(statement)
+                    _record(cursor, migration)
+                done.append(migration)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+    return done
+
+
+def _record(cursor, migration: Migration) -> None:
+    cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                   (migration.version, migration.name, migration.checksum))
+
+
+# --- EXPLAIN check ---
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def check_plans(conn) -> List[str]:
+    """Problems found (empty when every hot statement is index-backed); see the module docstring."""
+    problems = []
+    conn.autocommit = False
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for statement in STATEMENTS:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {statement.pyformat}", statement.example)
+                plan = cursor.fetchone()[0]
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                nodes = [n["Node Type"] for n in _plan_nodes(plan)]
+                bad = [n for n in nodes if n in ("Seq Scan", "Sort", "Incremental Sort")]
+                status = "❌" if bad else "✅"
+                print(f"{status} {statement.name:<22} {' -> '.join(nodes)}")
+                if bad:
+                    problems.append(f"{statement.name}: {', '.join(bad)} (missing index?)")
+            for table, key in UPSERT_KEYS.items():
+                try:
+                    cursor.execute("SAVEPOINT upsert_check")
+                    values = ", ".join(["'explain-user'"] * len(key.split(",")))
+                    cursor.execute(f"EXPLAIN INSERT INTO {table} ({key}) VALUES ({values}) "
+                                   f"ON CONFLICT ({key}) DO NOTHING")
+                    print(f"✅ {table} ON CONFLICT ({key})")
+                except psycopg2.Error as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT upsert_check")
+                    print(f"❌ {table} ON CONFLICT ({key})")
+                    problems.append(f"{table} ON CONFLICT ({key}): {str(e).strip()}")
+            cursor.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE NOT indisvalid")
+            for (index,) in cursor.fetchall():
+                print(f"❌ index {index} is INVALID")
+                problems.append(f"index {index} is INVALID (drop it and re-run the migration)")
+        finally:
+            conn.rollback()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply / inspect the backend's schema migrations.")
+    parser.add_argument("--to", type=int, default=None, help="apply up to this version")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--check", action="store_true", help="EXPLAIN the hot queries (no changes)")
+    parser.add_argument("--dir", type=Path, default=MIGRATIONS_DIR)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        if args.status:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                applied = applied_migrations(cursor)
+            for migration in load_migrations(args.dir):
+                row = applied.get(migration.version)
+                state = "pending" if row is None else f"applied {row[2]:%Y-%m-%d %H:%M}" + \
+                    (" (changed since)" if row[1] != migration.checksum else "")
+                print(f"{migration.version:04d}_{migration.name:<28} {state}")
+        elif args.check:
+            problems = check_plans(conn)
+            if problems:
+                print("\n".join(["", "Problems:"] + problems))
+                sys.exit(1)
+        else:
+            done = migrate(conn, args.to, args.dir)
+            print(f"✅ {len(done)} migration(s) applied" if done else "✅ Schema is up to date")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# backend/models/profiler.py
+"""
+Low-overhead sampling profiler for a running worker.
+
+A background thread reads every thread's current stack (sys._current_frames) at a
+fixed interval and counts identical stacks. Output is the collapsed-stack format
+used by flamegraph.pl / speedscope / inferno:
+
+    models/app.py:root;models/schemes_model/api.py:predict_schemes;... 42
+
+Ways to use it:
+- GET /admin/profile?seconds=10 on the root app (ADMIN_USER_IDS only) profiles the
+  worker that serves the request and returns the collapsed stacks.
+- Signal hook: the root app installs a PROFILE_SIGNAL (default SIGUSR2) handler on
+  startup. `python -m models.profiler <pid> --seconds 10` asks that worker for a
+  profile and prints where it was written.
+- Request sampling (opt-in): PROFILE_REQUEST_RATE=N profiles 1 in N requests and keeps
+  the PROFILE_REQUEST_KEEP slowest ones (GET /admin/profile/requests). Samples cover
+  every busy thread while the request is in flight, so concurrent requests show up too.
+
+Idle threads (waiting on a lock, queue or selector) are skipped so the output shows work.
+"""
+
+import argparse
+import heapq
+import itertools
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_INTERVAL = 0.005
+MIN_INTERVAL = 0.001         # a shorter interval would keep the sampler holding the GIL
+MAX_PROFILE_SECONDS = 60.0
+PROFILE_REQUEST_RATE = int(os.getenv("PROFILE_REQUEST_RATE", "0"))
+PROFILE_REQUEST_KEEP = int(os.getenv("PROFILE_REQUEST_KEEP", "20"))
+PROFILE_SIGNAL = getattr(signal, os.getenv("PROFILE_SIGNAL", "SIGUSR2"), None)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", tempfile.gettempdir()))
+
+# Leaf frames that mean "this thread is waiting, not working"
+_IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("thread.py", "_worker"), ("_base.py", "result"),
+    ("profiler.py", "profile_for"),  # the thread that asked for the profile, sleeping until it ends
+}
+_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+class SamplingProfiler:
+    """Counts collapsed stacks of all threads (except its own) every `interval` seconds."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_once(self, accumulate: bool = True) -> Dict[str, int]:
+        own = threading.get_ident()
+        taken = {}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or _is_idle(frame):
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            stack = ";".join(reversed(labels))
+            taken[stack] = taken.get(stack, 0) + 1
+        if accumulate:
+            self.stacks.update(taken)
+        self.samples += 1
+        return taken
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+_profile_lock = threading.Lock()
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    """`value` within [low, high]; NaN becomes `low`."""
+    return min(value, high) if value >= low else low
+
+
+def profile_for(seconds: float, interval: float = DEFAULT_INTERVAL) -> str:
+    """Profile this process for `seconds` and return collapsed stacks. One profile at a time."""
+    seconds = _clamp(seconds, 0.1, MAX_PROFILE_SECONDS)
+    interval = _clamp(interval, MIN_INTERVAL, 1.0)
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running in this worker.")
+    try:
+        profiler = SamplingProfiler(interval).start()
+        time.sleep(seconds)
+        profiler.stop()
+    finally:
+        _profile_lock.release()
+    header = f"# pid {os.getpid()} seconds {seconds:g} interval {interval:g} samples {profiler.samples}\n"
+    return header + profiler.collapsed()
+
+
+# --- 1-in-N request profiling ---
+class RequestProfiles:
+    """
+    Profiles 1 in `rate` requests and keeps the `keep` slowest (a min-heap on duration).
+
+    One shared sampler thread runs while at least one sampled request is in flight;
+    each sample is credited to every in-flight sampled request.
+    """
+
+    def __init__(self, rate: int = PROFILE_REQUEST_RATE, keep: int = PROFILE_REQUEST_KEEP,
+                 interval: float = DEFAULT_INTERVAL):
+        self.rate = rate
+        self.keep = keep
+        self.interval = interval
+        self._counter = itertools.count()
+        self._ids = itertools.count(1)
+        self._active: Dict[int, Counter] = {}
+        self._slowest: List[tuple] = []  # (duration, id, summary, collapsed)
+        self._lock = threading.Lock()
+        self._sampler: Optional[SamplingProfiler] = None
+        self._sampler_thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def should_sample(self) -> bool:
+        return self.enabled and next(self._counter) % self.rate == 0
+
+    def _sampler_loop(self, profiler: SamplingProfiler) -> None:
+        while not profiler._stop.wait(self.interval):
+            taken = profiler.sample_once(accumulate=False)
+            with self._lock:
+                for stacks in self._active.values():
+                    stacks.update(taken)
+
+    def begin(self) -> int:
+        request_id = next(self._ids)
+        with self._lock:
+            self._active[request_id] = Counter()
+            if self._sampler is None:
+                self._sampler = SamplingProfiler(self.interval)
+                self._sampler_thread = threading.Thread(target=self._sampler_loop, args=(self._sampler,),
+                                                        name="request-profiler", daemon=True)
+                self._sampler_thread.start()
+        return request_id
+
+    def end(self, request_id: int, duration: float, method: str, path: str) -> None:
+        with self._lock:
+            stacks = self._active.pop(request_id)
+            if not self._active and self._sampler is not None:
+                self._sampler._stop.set()
+                self._sampler = None
+            entry = (duration, request_id, {"id": request_id, "method": method, "path": path,
+                                            "duration_ms": round(duration * 1000, 2),
+                                            "samples": sum(stacks.values())},
+                     "".join(f"{s} {c}\n" for s, c in stacks.most_common()))
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def summaries(self) -> List[dict]:
+        with self._lock:
+            return [e[2] for e in sorted(self._slowest, reverse=True)]
+
+    def get(self, request_id: int) -> Optional[str]:
+        with self._lock:
+            for entry in self._slowest:
+                if entry[1] == request_id:
+                    return entry[3]
+        return None
+
+
+request_profiles = RequestProfiles()
+
+
+class RequestProfilerMiddleware:
+    """ASGI middleware feeding request_profiles; only added when PROFILE_REQUEST_RATE > 0."""
+
+    def __init__(self, app, profiles: RequestProfiles = request_profiles):
+        self.app = app
+        self.profiles = profiles
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiles.should_sample():
+            await self.app(scope, receive, send)
+            return
+        request_id = self.profiles.begin()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiles.end(request_id, time.perf_counter() - start, scope["method"], scope["path"])
+
+
+# --- Signal hook ---
+def _request_file(pid: int) -> Path:
+    return PROFILE_DIR / f"prajaseva-profile-{pid}.request"
+
+
+def _signal_handler(signum, frame) -> None:
+    # Never block inside a signal handler: profile on a separate thread and write a file
+    request = _request_file(os.getpid())
+    try:
+        seconds = float(request.read_text().strip())
+        request.unlink()
+    except (OSError, ValueError):
+        seconds = 10.0
+
+    def run():
+        try:
+            text = profile_for(seconds)
+        except RuntimeError as e:
+            text = f"# {e}\n"
+        target = PROFILE_DIR / f"prajaseva-profile-{os.getpid()}-{int(time.time())}.txt"
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(text)
+        tmp.rename(target)
+        print(f"📈 Profile written to {target}")
+
+    threading.Thread(target=run, name="signal-profiler", daemon=True).start()
+
+
+def install_signal_handler() -> bool:
+    """Install the PROFILE_SIGNAL handler (main thread only). Returns whether it was installed."""
+    if PROFILE_SIGNAL is None or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(PROFILE_SIGNAL, _signal_handler)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile a running PrajaSeva worker via its profiling signal.")
+    parser.add_argument("pid", type=int)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--output", type=Path, help="copy the collapsed stacks here")
+    args = parser.parse_args(argv)
+
+    if PROFILE_SIGNAL is None:
+        sys.exit("PROFILE_SIGNAL is not available on this platform.")
+    existing = set(PROFILE_DIR.glob(f"prajaseva-profile-{args.pid}-*.txt"))
+    _request_file(args.pid).write_text(str(args.seconds))
+    os.kill(args.pid, PROFILE_SIGNAL)
+
+    deadline = time.time() + min(args.seconds, MAX_PROFILE_SECONDS) + 10
+    while time.time() < deadline:
+        new = set(PROFILE_DIR.glob(f"prajaseva-profile-{args.pid}-*.txt")) - existing
+        if new:
+            result = max(new, key=lambda p: p.stat().st_mtime)
+            if args.output:
+                args.output.write_text(result.read_text())
+            print(f"✅ Profile of pid {args.pid}: {args.output or result}")
+            return
+        time.sleep(0.2)
+    sys.exit("No profile appeared; is the worker running with the profiling signal installed?")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# backend/models/queries.py
+"""
+The services' per-request reads, as named statements (db.execute_prepared).
+
+Each one selects only the columns its service uses, and is served by an index from
+migrations/ (named next to it). `python -m models.migrate --check` EXPLAINs every
+statement here, and the ON CONFLICT upserts, against the database and fails when
+one would need a sequential scan or a sort.
+"""
+
+from typing import List, NamedTuple
+
+from .db import to_pyformat
+
+
+class Statement(NamedTuple):
+    name: str
+    sql: str            # $1, $2 ... parameters
+    pyformat: str       # the same with %s, for unprepared execution
+    example: tuple      # parameters for EXPLAIN
+
+
+def statement(name: str, sql: str, example: tuple) -> Statement:
+    sql = " ".join(sql.split())
+    return Statement(name, sql, to_pyformat(sql), example)
+
+
+TAX_INPUT_COLUMNS = ["age", "annual_income", "is_salaried", "investment_80c", "investment_80d",
+                     "home_loan_interest", "education_loan_interest", "donations_80g", "other_deductions"]
+WEALTH_INPUT_COLUMNS = ["user_age", "retirement_age", "current_savings", "monthly_investment",
+                        "expected_return", "risk_tolerance", "liquidity", "annual_step_up"]
+
+# tax_input_user_created_idx
+LATEST_TAX_INPUT = statement("latest_tax_input", f"""
+    SELECT {', '.join(TAX_INPUT_COLUMNS)} FROM tax_input
+    WHERE user_id = $1 ORDER BY created_at DESC LIMIT 1""", ("explain-user",))
+
+# wealth_input_user_created_idx
+LATEST_WEALTH_INPUT = statement("latest_wealth_input", f"""
+    SELECT {', '.join(WEALTH_INPUT_COLUMNS)} FROM wealth_input
+    WHERE user_id = $1 ORDER BY created_at DESC LIMIT 1""", ("explain-user",))
+
+# schemes_user_scheme_key
+STORED_SCHEME_IDS = statement("stored_scheme_ids", "SELECT scheme_id FROM schemes WHERE user_id = $1",
+                              ("explain-user",))
+
+STATEMENTS: List[Statement] = [LATEST_TAX_INPUT, LATEST_WEALTH_INPUT, STORED_SCHEME_IDS]
+
+# Tables written with INSERT ... ON CONFLICT (key): the key needs a unique index
+UPSERT_KEYS = {"tax": "user_id", "wealth": "user_id", "schemes": "user_id, scheme_id"}
+SCHEMES_KEY = UPSERT_KEYS["schemes"]
@@ -0,0 +1,315 @@
+# backend/models/registry.py
+"""
+Versioned model artifacts with hot reload.
+
+Each service registers the files one of its models is built from (the pickled
+pipeline first, then label / column lists, rule tables) and a loader that turns them into
+whatever the request path needs (encoder, rules frame, caches, ...). Loaders read the
+files from version.files, never from fixed paths. The registry:
+
+- identifies a version by the sha256 of those files (first 16 hex digits). Loaders read
+  the files after they were hashed, so they are hashed again once loaded: a version
+  whose files changed meanwhile is discarded and loaded again (LOAD_ATTEMPTS times);
+- watches them from a background thread (every MODEL_RELOAD_INTERVAL seconds, 0
+  disables it): when a file's mtime / size changes and then stays unchanged for one
+  more check (so half-copied files are not loaded), the new version is loaded on the
+  watcher thread, off the request path;
+- swaps it in with a single reference assignment. A request takes `active(name)` once
+  and uses that version throughout, so it never mixes two versions;
+- keeps the version it replaced: rollback(name) swaps back instantly (the files on
+  disk are left alone, and are not reloaded until they change again);
+- shares rollbacks between processes through a pin file next to the first artifact
+  (`<file>.pin`: the version to serve and the on-disk version it replaces). Every
+  watcher serves the pinned version while the files still hold the version it replaces,
+  and the on-disk version otherwise, so each web worker follows a rollback (and the
+  reload that undoes it) within one interval. A process that no longer has the pinned
+  version loaded keeps its version and reports the error. A new version on disk
+  outdates the pin;
+- keeps serving the loaded version when a new one fails to load, and reports the error.
+
+Versions loaded by the watcher are per process: each web worker holds its own copy of
+a hot-reloaded model (only the version loaded before gunicorn forks is shared), until
+the workers are restarted.
+
+Services put the version they served in the X-Model-Version response header; GET
+/models on the root app lists every model's active, previous and on-disk versions.
+
+    registry.register("tax", [base_dir / "tax_model.pkl"], load_tax)
+    version = registry.active("tax")      # ModelVersion(id, bundle, ...) or None
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .metrics import register_gauge
+
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+
+VERSION_HEADER = "X-Model-Version"
+LOAD_ATTEMPTS = 3
+
+
+def fingerprint(paths: Iterable[Path]) -> str:
+    """Content hash of a model's artifacts: its version id."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).name.encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class ModelVersion:
+    """One loaded version of a model: what the loader built from the files with this fingerprint."""
+
+    __slots__ = ("id", "files", "bundle", "loaded_at")
+
+    def __init__(self, id: str, files: List[Path], bundle=None):
+        self.id = id
+        self.files = files
+        self.bundle = bundle
+        self.loaded_at = time.time()
+
+    def describe(self) -> dict:
+        return {"version": self.id, "loaded_at": round(self.loaded_at, 3)}
+
+
+def _build(loader: Callable[[ModelVersion], object], files: List[Path], version_id: str) -> ModelVersion:
+    """Load `files` (fingerprint `version_id`) with `loader`, retrying while they change underneath it."""
+    for _ in range(LOAD_ATTEMPTS):
+        version = ModelVersion(version_id, files)
+        version.bundle = loader(version)
+        loaded_id, version_id = version_id, fingerprint(files)
+        if version_id == loaded_id:
+            return version
+    raise RuntimeError(f"files kept changing while loading ({LOAD_ATTEMPTS} attempts)")
+
+
+class _Entry:
+    def __init__(self, name: str, paths: List[Path], loader: Callable[[ModelVersion], object], optional: List[Path]):
+        self.name = name
+        self.paths = paths
+        self.optional = optional
+        self.pin_path = paths[0].with_name(paths[0].name + ".pin")
+        self.loader = loader
+        self.active: Optional[ModelVersion] = None
+        self.previous: Optional[ModelVersion] = None
+        self.disk_version: Optional[str] = None
+        self.signature: Optional[tuple] = None     # stat of the files behind disk_version
+        self.pending: Optional[tuple] = None       # changed stat waiting to settle for one check
+        self.error: Optional[str] = None
+        self.pin_error: Optional[str] = None   # the pin file could not be followed here
+        self.reloads = 0
+        self.lock = threading.Lock()           # swaps
+        self.loading = threading.Lock()        # one load at a time (watcher vs admin reload)
+
+    def files(self) -> List[Path]:
+        return self.paths + [p for p in self.optional if p.exists()]
+
+    def stat(self) -> Optional[tuple]:
+        """(path, mtime, size) of every file, or None while a required file is missing."""
+        if not all(p.exists() for p in self.paths):
+            return None
+        try:
+            return tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in self.files())
+        except OSError:
+            return None
+
+
+class ModelRegistry:
+    def __init__(self, interval: float = MODEL_RELOAD_INTERVAL):
+        self.interval = interval
+        self._entries: Dict[str, _Entry] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+
+    # --- Registration & lookup ---
+    def register(self, name: str, paths: List[Path], loader: Callable[[ModelVersion], object],
+                 optional: Optional[List[Path]] = None) -> Optional[ModelVersion]:
+        """
+        Load the current version now (the service's cold start) and watch it from then on.
+        `loader(version)` receives the ModelVersion (its id is set, its bundle not yet) and
+        returns the bundle. Missing required files leave the model unloaded until they appear.
+        """
+        entry = _Entry(name, [Path(p) for p in paths], loader, [Path(p) for p in optional or []])
+        self._entries[name] = entry
+        self._load(entry, entry.stat())
+        return entry.active
+
+    def active(self, name: str) -> Optional[ModelVersion]:
+        return self._entries[name].active
+
+    def files(self, name: str) -> List[Path]:
+        """The files `name` is loaded from (optional ones only when present)."""
+        return self._entries[name].files()
+
+    def build(self, name: str, files: List[Path]) -> ModelVersion:
+        """
+        A version of `name` loaded from other `files` (same order and roles as files(name)),
+        without activating it: benchmarks and offline checks of freshly trained artifacts.
+        """
+        files = [Path(p) for p in files]
+        return _build(self._entries[name].loader, files, fingerprint(files))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    # --- Reload / rollback ---
+    def _load(self, entry: _Entry, signature: Optional[tuple], force: bool = False) -> bool:
+        if signature is None:
+            return False
+        with entry.loading:
+            return self._load_locked(entry, signature, force)
+
+    def _load_locked(self, entry: _Entry, signature: tuple, force: bool = False) -> bool:
+        try:
+            files = entry.files()
+            version_id = fingerprint(files)
+            if entry.active is not None and version_id == entry.disk_version and not force:
+                entry.signature = signature    # touched, same content
+                return False
+            version = _build(entry.loader, files, version_id)
+            if version.id != version_id:       # replaced while loading: that stat is stale
+                signature = entry.stat() or signature
+            version_id = version.id
+        except Exception as e:
+            entry.signature = signature        # retried once the files change again
+            entry.error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Could not load {entry.name} model, keeping version "
+                  f"{entry.active.id if entry.active else 'none'}: {entry.error}")
+            return False
+        with entry.lock:
+            entry.previous, entry.active = entry.active, version
+            entry.disk_version, entry.signature, entry.error = version_id, signature, None
+            entry.reloads += entry.previous is not None
+        if entry.previous is not None:
+            print(f"🔄 {entry.name} model {entry.previous.id} -> {version.id}")
+        return True
+
+    def check(self, name: str) -> bool:
+        """
+        One watcher step for `name`: load the files if they changed and have settled, then
+        follow the pin file. True if swapped.
+        """
+        entry = self._entries[name]
+        signature = entry.stat()
+        swapped = False
+        if signature is None or signature == entry.signature:
+            entry.pending = None
+        elif signature != entry.pending:
+            entry.pending = signature
+        else:
+            entry.pending = None
+            swapped = self._load(entry, signature)
+        return self._follow_pin(entry) or swapped
+
+    def reload(self, name: str) -> Optional[ModelVersion]:
+        """Drop the pin and load the files on disk now (no settle delay); the active version afterwards."""
+        entry = self._entries[name]
+        self._write_pin(entry, None)
+        self._load(entry, entry.stat())
+        self._follow_pin(entry)
+        return entry.active
+
+    def rollback(self, name: str) -> ModelVersion:
+        """
+        Pin the previous version for every process and swap to it here. Raises LookupError
+        when there is no previous one.
+        """
+        entry = self._entries[name]
+        previous = entry.previous
+        if previous is None:
+            raise LookupError(f"No previous {name} model version to roll back to.")
+        self._write_pin(entry, previous.id)
+        self._follow_pin(entry)
+        return entry.active
+
+    # --- Pin file (rollbacks shared by every process) ---
+    def _read_pin(self, entry: _Entry) -> Optional[str]:
+        """The pinned version id while the pin is current (it replaces the version on disk), else None."""
+        try:
+            pin = json.loads(entry.pin_path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            entry.pin_error = f"Unreadable pin file {entry.pin_path}: {e}"
+            return None
+        return pin["version"] if pin.get("replaces") == entry.disk_version else None
+
+    def _write_pin(self, entry: _Entry, version_id: Optional[str]) -> None:
+        """Pin `version_id` in place of the version on disk, or remove the pin (None, or the on-disk version)."""
+        if version_id is None or version_id == entry.disk_version:
+            try:
+                os.remove(entry.pin_path)
+            except FileNotFoundError:
+                pass
+            return
+        staging = entry.pin_path.with_name(f"{entry.pin_path.name}.{os.getpid()}")
+        staging.write_text(json.dumps({"version": version_id, "replaces": entry.disk_version}))
+        os.replace(staging, entry.pin_path)
+
+    def _follow_pin(self, entry: _Entry) -> bool:
+        """Serve the pinned version, or the on-disk one when nothing is pinned. True if swapped."""
+        entry.pin_error = None
+        target = self._read_pin(entry) or entry.disk_version
+        if entry.active is None or target is None or entry.active.id == target:
+            return False
+        with entry.lock:
+            if entry.previous is not None and entry.previous.id == target:
+                entry.active, entry.previous = entry.previous, entry.active
+                print(f"↩️ {entry.name} model {entry.previous.id} -> {entry.active.id} (pin file)")
+                return True
+        if target == entry.disk_version:
+            # Unpinned, but the on-disk version was dropped here: load it again (once, unless it fails)
+            return entry.error is None and self._load(entry, entry.stat(), force=True)
+        entry.pin_error = f"Pinned version {target} is not loaded in this process; serving {entry.active.id}"
+        return False
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "active": entry.active.describe() if entry.active else None,
+                "previous": entry.previous.describe() if entry.previous else None,
+                "on_disk": entry.disk_version,
+                "pinned": self._read_pin(entry),
+                "reloads": entry.reloads,
+                "error": entry.error or entry.pin_error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+    # --- Watcher ---
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            for name in list(self._entries):
+                try:
+                    self.check(name)
+                except Exception as e:
+                    print(f"⚠️ Model watcher failed for {name}: {e}")
+
+    def start(self) -> None:
+        """Start this process's watcher thread (no-op when disabled or already running here)."""
+        if self.interval <= 0 or (self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+
+registry = ModelRegistry()
+register_gauge("prajaseva_model_reloads", "Model versions swapped in by hot reload.",
+               lambda: sum(e.reloads for e in registry._entries.values()))
@@ -0,0 +1,156 @@
+# backend/models/responses.py
+"""
+Response layer shared by every service: fast JSON rendering and body compression.
+
+FastJSONResponse renders with orjson when it is installed (numpy scalars and arrays
+included), else with json and compact separators. Every service app uses it as
+its default_response_class. FastAPI still walks a handler's return value with
+jsonable_encoder first; handlers whose payload is already plain (dicts, lists, str,
+numbers, numpy scalars) return FastJSONResponse(payload) themselves, which skips it.
+Headers set on an injected `response: Response` are not carried over then, so
+those handlers pass them (e.g. X-Model-Version) to FastJSONResponse directly.
+
+CompressionMiddleware (root app) compresses complete bodies of at least
+COMPRESS_MIN_SIZE bytes with a text-like content type: brotli when the client
+accepts br and the brotli package is installed, else gzip. Streamed bodies,
+already-encoded responses and bodies that would not shrink are sent as they are.
+Levels are kept low (COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY): bodies are
+compressed on every request. Bodies from COMPRESS_THREAD_SIZE bytes up (a 10k-point
+what-if is ~650 KB, ~30 ms of gzip) are compressed in the threadpool, off the event loop.
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    return FastJSONResponse(payload, headers={VERSION_HEADER: version.id})
+"""
+
+import gzip
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import orjson
+except ImportError:     # optional: falls back to json
+    orjson = None
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") != "0"
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "5"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+COMPRESS_THREAD_SIZE = int(os.getenv("COMPRESS_THREAD_SIZE", str(64 * 1024)))
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _json_default(value):
+    # numpy scalars / arrays that are not float or str subclasses
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """JSON bytes for plain data, as FastJSONResponse sends them."""
+    if orjson is not None:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_json_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# --- Compression ---
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+
+_PREFERENCE = ("br", "gzip")
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The best encoding we have that the Accept-Encoding header allows (q > 0), or None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    for encoding in _PREFERENCE:
+        if encoding in COMPRESSORS and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _compressible(headers: Headers, body: bytes, minimum_size: int) -> bool:
+    content_type = headers.get("content-type", "")
+    return (len(body) >= minimum_size and "content-encoding" not in headers
+            and content_type.startswith(_COMPRESSIBLE) and not content_type.startswith("text/event-stream"))
+
+
+class CompressionMiddleware:
+    """Compresses complete response bodies above `minimum_size` (see the module docstring)."""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message     # held back until the first body chunk shows its size
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or not _compressible(headers, body, self.minimum_size):
+                await send(start)
+                await send(message)
+                return
+            compress = COMPRESSORS[encoding]
+            compressed = await run_in_threadpool(compress, body) if len(body) >= COMPRESS_THREAD_SIZE else compress(body)
+            if len(compressed) >= len(body):
+                await send(start)
+                await send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,22 +1,34 @@
 # schemes_model/api.py
-import os
-from fastapi import FastAPI, Depends, HTTPException, status
+import operator
+import time
+from fastapi import FastAPI, Depends, HTTPException, Request
 from pydantic import BaseModel
-import pandas as pd
 import joblib
 from pathlib import Path
-import psycopg2
+from typing import Dict, FrozenSet, NamedTuple, Optional
 from psycopg2.extras import DictCursor
-from jose import JWTError, jwt
 from dotenv import load_dotenv
 
+from ..auth import get_current_user
+from ..admission import admit
+from ..metrics import register_gauge, stage
+from ..inference import predict
+from ..encoding import array_input, serving_encoder
+from ..db import bulk_insert, execute_prepared, get_db_connection
+from ..queries import SCHEMES_KEY, STORED_SCHEME_IDS
+from ..registry import VERSION_HEADER, ModelVersion, registry
+from ..responses import FastJSONResponse
+from ..deadlines import deadline_handlers, passthrough
+from ..http_cache import result_etag, result_response
+from ..shadow import candidate_name, shadow
+from .eligibility_cache import EligibilityCache
+from .rules import eligible_from_prediction, load_rules, rules_by_id
+
 # --- Environment Setup ---
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
-JWT_SECRET = os.getenv("JWT_SECRET")
-ALGORITHM = "HS256"
 
-app = FastAPI(title="Schemes Eligibility API")
+app = FastAPI(title="Schemes Eligibility API", default_response_class=FastJSONResponse,
+              exception_handlers=deadline_handlers)
 
 # --- Pydantic model for the request body ---
 class ProfileData(BaseModel):
@@ -29,80 +41,170 @@ class ProfileData(BaseModel):
     income: int
     disability_status: bool
 
-# --- Security & Authentication ---
-from fastapi.security import OAuth2PasswordBearer
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
-    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        user_id: str = payload.get("userId")
-        if user_id is None: raise credentials_exception
-        return user_id
-    except JWTError:
-        raise credentials_exception
-
-# --- Database Connection ---
-def get_db_connection():
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        return conn
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Database connection failed.")
+def profile_record(profile: ProfileData) -> dict:
+    """The request as the model's input record."""
+    return {
+        "age": profile.age,
+        "annual_income": profile.income,
+        "state": profile.state,
+        "gender": profile.gender,
+        "caste": profile.caste,
+        "employment_type": profile.employment_type,
+        "disability_status": "Yes" if profile.disability_status else "No",
+        "education_level": profile.education_level
+    }
 
 # --- Load ML Model & Data ---
 base_dir = Path(__file__).resolve().parent
-pipeline = joblib.load(base_dir / "schemes_model.pkl")
-scheme_columns = joblib.load(base_dir / "label_encoder.pkl")
-rules_df = pd.read_csv(base_dir / "schemes_rules.csv")
+
+
+class Artifacts(NamedTuple):
+    encoder: object
+    scheme_columns: list
+    rules: Dict[str, dict]     # scheme_id -> rule (rules.rules_by_id)
+    cache: Optional[EligibilityCache]
+
+
+def _load_artifacts(version: ModelVersion) -> Artifacts:
+    """One registry version: model, labels and rules, with a result cache of their own."""
+    model_path, labels_path, rules_path = version.files
+    encoder = serving_encoder(joblib.load(model_path))
+    rules = load_rules(rules_path)
+    cache = EligibilityCache.build(encoder, rules, version.id)
+    return Artifacts(encoder, joblib.load(labels_path), rules_by_id(rules), cache)
+
+
+# Reloaded (with a new cache) whenever one of these files changes; see models/registry.py
+registry.register("schemes", [base_dir / "schemes_model.pkl", base_dir / "label_encoder.pkl",
+                              base_dir / "schemes_rules.csv"], _load_artifacts)
+
+
+# --- Shadow candidate (see models/shadow.py) ---
+class Candidate(NamedTuple):
+    encoder: object
+    scheme_columns: list
+
+
+def _load_candidate(version: ModelVersion) -> Candidate:
+    return Candidate(serving_encoder(joblib.load(version.files[0])), joblib.load(version.files[1]))
+
+
+def predicted_ids(prediction, scheme_columns) -> FrozenSet[str]:
+    """Scheme ids a model predicts (before the state filter): what primary and candidate are compared on."""
+    return frozenset(scheme_id for flag, scheme_id in zip(prediction, scheme_columns) if flag == 1)
+
+
+def _score_candidate(candidate: Candidate, record: dict) -> FrozenSet[str]:
+    with array_input():
+        prediction = candidate.encoder.estimator.predict(candidate.encoder.encode(record))[0]
+    return predicted_ids(prediction, candidate.scheme_columns)
+
+
+registry.register(candidate_name("schemes"), [base_dir / "schemes_model.candidate.pkl", base_dir / "label_encoder.pkl"],
+                  _load_candidate)
+shadow.register("schemes", _score_candidate, operator.eq)
+
+
+def _active_cache() -> Optional[EligibilityCache]:
+    version = registry.active("schemes")
+    return version.bundle.cache if version is not None else None
+
+
+def _cache_stat(name: str) -> float:
+    cache = _active_cache()
+    return getattr(cache, name) if cache is not None else 0
+
+
+register_gauge("prajaseva_schemes_cache_hits", "Eligibility result cache hits.", lambda: _cache_stat("hits"))
+register_gauge("prajaseva_schemes_cache_misses", "Eligibility result cache misses.", lambda: _cache_stat("misses"))
+register_gauge("prajaseva_schemes_cache_entries", "Eligibility results currently cached.",
+               lambda: len(_active_cache() or ()))
+register_gauge("prajaseva_schemes_cache_hit_ratio", "Eligibility cache hits / lookups since the cache was built.",
+               lambda: _cache_stat("hits") / max(_cache_stat("hits") + _cache_stat("misses"), 1))
 
 # --- API Endpoint ---
-@app.post("/predict")
+@app.post("/predict", dependencies=[Depends(admit("predict"))])
 def predict_schemes(profile: ProfileData, user_id: str = Depends(get_current_user)):
+    version = registry.active("schemes")
+    if version is None:
+        raise HTTPException(status_code=503, detail="Schemes model is not available.")
+    loaded = version.bundle
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        # 1. Convert input from request body to a DataFrame
-        user_data = pd.DataFrame([{
-            "age": profile.age,
-            "annual_income": profile.income,
-            "state": profile.state,
-            "gender": profile.gender,
-            "caste": profile.caste,
-            "employment_type": profile.employment_type,
-            "disability_status": "Yes" if profile.disability_status else "No",
-            "education_level": profile.education_level
-        }])
-
-        # 2. Predict eligibility
-        prediction = pipeline.predict(user_data)[0]
-
-        # 3. Filter results
-        eligible_schemes = []
-        for flag, scheme_id in zip(prediction, scheme_columns):
-            if flag == 1:
-                scheme_row = rules_df[rules_df["scheme_id"] == scheme_id].iloc[0]
-                if scheme_row["scope"].lower() == "state" and user_data.iloc[0]["state"].lower() != scheme_row["state"].lower():
-                    continue
-                eligible_schemes.append({"id": scheme_id, "name": scheme_row['scheme_name']})
-        
-        # 4. Store results in the database
-        cursor.execute("DELETE FROM schemes WHERE user_id = %s", (user_id,))
-        if eligible_schemes:
-            insert_query = "INSERT INTO schemes (user_id, scheme_id, scheme_name) VALUES (%s, %s, %s)"
-            values = [(user_id, s["id"], s["name"]) for s in eligible_schemes]
-            cursor.executemany(insert_query, values)
-        conn.commit()
-
-        return {
+        record = profile_record(profile)
+        # 0. Profiles in the same breakpoint intervals share their result (see eligibility_cache.py)
+        with stage("cache"):
+            cache_key = loaded.cache.key(record) if loaded.cache is not None else None
+            eligible_schemes = loaded.cache.get(cache_key) if loaded.cache is not None else None
+
+        if eligible_schemes is None:
+            # 1. Encode the request into the model's feature row
+            with stage("features"):
+                user_data = loaded.encoder.encode(record)
+
+            # 2. Predict eligibility
+            with stage("inference"):
+                started = time.perf_counter()
+                prediction = predict("schemes", loaded.encoder.estimator, user_data, version=version)[0]
+                inference_seconds = time.perf_counter() - started
+            shadow.submit("schemes", record, predicted_ids(prediction, loaded.scheme_columns), inference_seconds)
+
+            # 3. Filter results (the same filter as recompute.py)
+            with stage("filter"):
+                eligible_schemes = eligible_from_prediction(prediction, loaded.scheme_columns, loaded.rules,
+                                                            profile.state)
+            if loaded.cache is not None:
+                loaded.cache.put(cache_key, eligible_schemes)
+
+        # 4. Store results in the database (only the rows that actually changed)
+        with stage("db_fetch"):
+            execute_prepared(cursor, STORED_SCHEME_IDS, (user_id,))
+            stored_ids = {row[0] for row in cursor.fetchall()}
+        with stage("db_upsert"):
+            new_ids = {s["id"] for s in eligible_schemes}
+            stale_ids = list(stored_ids - new_ids)
+            if stale_ids:
+                cursor.execute("DELETE FROM schemes WHERE user_id = %s AND scheme_id = ANY(%s)", (user_id, stale_ids))
+            values = [(user_id, s["id"], s["name"]) for s in eligible_schemes if s["id"] not in stored_ids]
+            if values:
+                # A concurrent /predict for the same user may have inserted some of them already
+                bulk_insert(cursor, "schemes", ["user_id", "scheme_id", "scheme_name"], values, skip_existing=SCHEMES_KEY)
+            conn.commit()
+
+        # Plain data: rendered directly, without jsonable_encoder (models/responses.py)
+        return FastJSONResponse({
             "eligible_schemes": eligible_schemes,
             "count": len(eligible_schemes)
-        }
+        }, headers={VERSION_HEADER: version.id})
     except Exception as e:
         conn.rollback()
+        passthrough(e)      # 404s as they are; DB timeouts as 504 (models/deadlines.py)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     finally:
         cursor.close()
         conn.close()
+
+
+@app.get("/result")
+def stored_schemes_result(request: Request, user_id: str = Depends(get_current_user)):
+    """
+    The eligible schemes the last /predict stored, without recomputing them. The schemes
+    rows carry no generated_at, so the ETag is a digest of the stored (id, name) pairs.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        with stage("db_fetch"):
+            cursor.execute("SELECT scheme_id, scheme_name FROM schemes WHERE user_id = %s ORDER BY scheme_id", (user_id,))
+            rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    etag = result_etag("schemes", user_id, rows)
+    return result_response(request, {
+        "eligible_schemes": [{"id": scheme_id, "name": name} for scheme_id, name in rows],
+        "count": len(rows),
+    }, etag)
@@ -0,0 +1,103 @@
+# compare_models.py - Train each schemes classifier option and compare speed, size and accuracy
+import argparse
+import json
+import os
+import pickle
+import statistics
+import tempfile
+import time
+
+import joblib
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import f1_score
+
+from ..datasets import read_dataset, resolve_dataset
+from .train_model import BASE_DIR, MODEL_TYPES, build_pipeline
+
+FEATURE_COLS = ["age", "annual_income", "state", "gender", "caste",
+                "employment_type", "disability_status", "education_level"]
+
+
+def time_calls(fn, repeats):
+    """Median and p95 latency of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def evaluate(model_type, X_train, X_test, y_train, y_test, repeats):
+    print(f"🚀 Training {model_type}...")
+    start = time.perf_counter()
+    pipeline = build_pipeline(model_type)
+    pipeline.fit(X_train, y_train)
+    train_s = time.perf_counter() - start
+
+    # Uncompressed pickle size approximates the in-memory footprint once loaded
+    memory_mb = len(pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6
+
+    # Size and load time of the artifact exactly as train_model.py saves it
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        joblib.dump(pipeline, path, compress=("xz", 3))
+        size_mb = os.path.getsize(path) / 1e6
+        start = time.perf_counter()
+        pipeline = joblib.load(path)
+        load_s = time.perf_counter() - start
+
+    # Single-request latency uses a one-row DataFrame, like the API does
+    one_row = X_test.iloc[[0]]
+    single_p50, single_p95 = time_calls(lambda: pipeline.predict(one_row), repeats)
+
+    start = time.perf_counter()
+    y_pred = pipeline.predict(X_test)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "model": model_type,
+        "train_s": round(train_s, 2),
+        "size_mb": round(size_mb, 2),
+        "memory_mb": round(memory_mb, 1),
+        "load_s": round(load_s, 3),
+        "single_p50_ms": round(single_p50, 2),
+        "single_p95_ms": round(single_p95, 2),
+        "batch_rows_per_s": round(len(X_test) / batch_s),
+        "f1_micro": round(f1_score(y_test, y_pred, average="micro", zero_division=0), 4),
+        "f1_macro": round(f1_score(y_test, y_pred, average="macro", zero_division=0), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare schemes model options.")
+    parser.add_argument("--models", nargs="+", choices=MODEL_TYPES, default=MODEL_TYPES)
+    parser.add_argument("--dataset", default=None, help="defaults to training_dataset.parquet (or .csv)")
+    parser.add_argument("--repeats", type=int, default=50, help="single-row predictions timed per model")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    df = read_dataset(args.dataset or resolve_dataset(BASE_DIR), "schemes")
+    target_cols = [c for c in df.columns if c not in FEATURE_COLS]
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURE_COLS], df[target_cols], test_size=0.2, random_state=42
+    )
+    print(f"📂 {len(X_train)} train / {len(X_test)} test rows, {len(target_cols)} schemes")
+
+    results = [evaluate(m, X_train, X_test, y_train, y_test, args.repeats) for m in args.models]
+
+    print("\n📊 Results")
+    header = list(results[0])
+    print("  ".join(f"{h:>17}" for h in header))
+    for row in results:
+        print("  ".join(f"{str(row[h]):>17}" for h in header))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# schemes_model/eligibility_cache.py
+"""
+Exact cache of /schemes/predict results.
+
+A prediction depends on the profile's categorical attributes (state, gender, caste,
+employment, disability, education) and on its age and income, and the filter step
+only on the state. Age and income only matter through comparisons against fixed
+breakpoints, so every age / income inside the same interval between consecutive
+breakpoints gets the same result:
+
+- rule breakpoints: schemes_rules.csv checks age_min <= age <= age_max (and the same
+  for annual income), i.e. on integers the result can only change at age_min and
+  age_max + 1;
+- model breakpoints: the classifier is a tree ensemble, and a tree only ever asks
+  `age <= threshold`, which on integers changes at floor(threshold) + 1.
+
+The cache key is therefore (the categorical values, the age interval, the income
+interval), with the interval found by bisecting the sorted union of both
+breakpoint tables. The model breakpoints are needed for the key to be exact: the
+forest does not split exactly at the rule bounds.
+
+The tables are derived when the model and rules are loaded: every model registry
+version (registry.py, a sha256 of the model, label and rules files) gets a cache of
+its own, so entries never outlive the model and rules they were computed with, and a
+rollback brings back the previous version's cache with it. Bounded LRU
+(SCHEMES_CACHE_SIZE entries, 0 disables it).
+
+Profiles whose age or income is not an integer bypass the cache, as does a model
+the breakpoints cannot be read from (non-tree estimators, DataFrame fallback).
+"""
+
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..encoding import FeatureEncoder
+
+SCHEMES_CACHE_SIZE = int(os.getenv("SCHEMES_CACHE_SIZE", "50000"))
+
+# Model feature -> rule column prefix (`<prefix>_min` / `<prefix>_max`)
+RULE_BOUNDS = {"age": "age", "annual_income": "annual_income"}
+
+
+def _trees(estimator):
+    """Every fitted decision tree inside `estimator` (forests, boosting stages, multi-output wrappers)."""
+    if hasattr(estimator, "tree_"):
+        yield estimator.tree_
+        return
+    members = getattr(estimator, "estimators_", None)
+    if members is None:
+        return
+    for member in np.ravel(np.asarray(members, dtype=object)):
+        yield from _trees(member)
+
+
+def breakpoints(encoder: FeatureEncoder, rules: pd.DataFrame) -> Optional[Dict[str, List[int]]]:
+    """Sorted integer breakpoints per numeric feature, or None when the model's are not readable."""
+    trees = list(_trees(encoder.estimator))
+    if not trees:
+        return None
+    edges = {}
+    for column, index in encoder.numeric:
+        values = [np.floor(tree.threshold[tree.feature == index]) + 1 for tree in trees]
+        prefix = RULE_BOUNDS.get(column)
+        if prefix is not None:
+            values += [rules[f"{prefix}_min"].to_numpy(), rules[f"{prefix}_max"].to_numpy() + 1]
+        edges[column] = np.unique(np.concatenate(values)).astype(np.int64).tolist()
+    return edges
+
+
+class EligibilityCache:
+    """Bounded LRU of interval key -> eligible schemes, for one model + rules fingerprint."""
+
+    def __init__(self, edges: Dict[str, List[int]], categorical: Sequence[str], version: str,
+                 max_size: int = SCHEMES_CACHE_SIZE):
+        self.edges = edges
+        self.categorical = list(categorical)
+        self.version = version
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def build(cls, encoder, rules: pd.DataFrame, version: str,
+              max_size: int = SCHEMES_CACHE_SIZE) -> Optional["EligibilityCache"]:
+        """The cache for this encoder's model and these rules, or None if results cannot be keyed exactly."""
+        if max_size <= 0 or not isinstance(encoder, FeatureEncoder):
+            return None
+        edges = breakpoints(encoder, rules)
+        if edges is None:
+            return None
+        return cls(edges, [column for column, _, _ in encoder.categorical], version, max_size)
+
+    def key(self, record: Mapping) -> Optional[tuple]:
+        """The record's cache key, or None if it cannot be cached."""
+        key = [record[column] for column in self.categorical]
+        for column, edges in self.edges.items():
+            value = record[column]
+            if value != int(value):
+                return None
+            key.append(bisect_right(edges, value))
+        return tuple(key)
+
+    def get(self, key: Optional[tuple]) -> Optional[list]:
+        with self._lock:
+            result = self._entries.get(key) if key is not None else None
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Optional[tuple], result: list) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
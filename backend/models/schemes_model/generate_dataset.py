@@ -1,37 +1,35 @@
 import pandas as pd
 import random
 import sys
+from pathlib import Path
 
-print("Starting dataset generation...")
+from ..datasets import write_dataset
 
-# Load rules
-try:
-    rules = pd.read_csv("schemes_rules.csv")
-    print("Successfully loaded schemes_rules.csv")
-except FileNotFoundError:
-    print("Error: schemes_rules.csv not found. Please make sure the file is in the correct directory.")
-    sys.exit()
-
-
-# --- Data Cleaning and Preprocessing ---
-# Replace "Any" or missing values with default numbers for reliable comparison
-rules["age_min"] = pd.to_numeric(rules["age_min"], errors="coerce").fillna(0).astype(int)
-rules["age_max"] = pd.to_numeric(rules["age_max"], errors="coerce").fillna(120).astype(int) # Increased max age for safety
-rules["annual_income_min"] = pd.to_numeric(rules["annual_income_min"], errors="coerce").fillna(0).astype(int)
-rules["annual_income_max"] = pd.to_numeric(rules["annual_income_max"], errors="coerce").fillna(10**9).astype(int)
-# Ensure all 'allowed' columns are strings to prevent errors
-for col in ['allowed_genders', 'allowed_castes', 'allowed_employments', 'disability_allowed', 'education_levels']:
-    rules[col] = rules[col].astype(str)
+BASE_DIR = Path(__file__).resolve().parent
 
 # --- Define Valid User Profile Options (CORRECTED) ---
 # These lists should ONLY contain actual values a user can have, never "Any".
-VALID_STATES = list(set(rules[rules["state"] != "Any"]["state"].unique()))
-VALINDERS = ["Male", "Female", "Other"]
-VALID_CASTD_GEES = ["General", "OBC", "SC", "ST"]
+VALID_GENDERS = ["Male", "Female", "Other"]
+VALID_CASTES = ["General", "OBC", "SC", "ST"]
 VALID_EMPLOYMENTS = ["Student", "Farmer", "Private-employed", "Government-employed", "Retired", "Self-employed", "Un-employed"]
 VALID_DISABILITIES = ["Yes", "No"]
 VALID_EDUCATIONS = ["Un-educated", "Secondary", "Graduate", "Postgraduate", "Other"]
 
+
+def load_rules(rules_path):
+    rules = pd.read_csv(rules_path)
+
+    # --- Data Cleaning and Preprocessing ---
+    # Replace "Any" or missing values with default numbers for reliable comparison
+    rules["age_min"] = pd.to_numeric(rules["age_min"], errors="coerce").fillna(0).astype(int)
+    rules["age_max"] = pd.to_numeric(rules["age_max"], errors="coerce").fillna(120).astype(int) # Increased max age for safety
+    rules["annual_income_min"] = pd.to_numeric(rules["annual_income_min"], errors="coerce").fillna(0).astype(int)
+    rules["annual_income_max"] = pd.to_numeric(rules["annual_income_max"], errors="coerce").fillna(10**9).astype(int)
+    # Ensure all 'allowed' columns are strings to prevent errors
+    for col in ['allowed_genders', 'allowed_castes', 'allowed_employments', 'disability_allowed', 'education_levels']:
+        rules[col] = rules[col].astype(str)
+    return rules
+
 # --- Eligibility Checking Function (Unchanged from your logic) ---
 def is_eligible(user, rule):
     # Helper function to check if a user's attribute matches a rule's requirement.
@@ -64,89 +62,106 @@ def is_eligible(user, rule):
     return True
 
 # --- Balanced Dataset Generation ---
-data = []
-labels = []
-samples_per_scheme = 100 # Increased samples for better training
-max_attempts = samples_per_scheme * 20
-
-print(f"Generating {samples_per_scheme} samples for each of the {len(rules)} schemes...")
-
-for index, rule in rules.iterrows():
-    scheme_id = rule["scheme_id"]
-
-    # --- Generate Positive Samples (GUARANTEED ELIGIBLE) ---
-    pos_count = 0
-    attempts = 0
-    while pos_count < samples_per_scheme // 2 and attempts < max_attempts:
-        attempts += 1
-        
-        # FIX: Correctly choose ONE valid option from multi-value rules (e.g., 'SC,ST' -> 'SC' or 'ST')
-        # FIX: Correctly choose a random valid user option when the rule is 'Any'
-        user = {
-            "age": random.randint(rule["age_min"], rule["age_max"]),
-            "annual_income": random.randint(rule["annual_income_min"], rule["annual_income_max"]),
-            "state": rule["state"] if rule["state"] != "Any" else random.choice(VALID_STATES),
-            "gender": random.choice(rule["allowed_genders"].split(',')) if rule["allowed_genders"].lower() != "any" else random.choice(VALID_GENDERS),
-            "caste": random.choice(rule["allowed_castes"].split(',')) if rule["allowed_castes"].lower() != "any" else random.choice(VALID_CASTES),
-            "employment_type": random.choice(rule["allowed_employments"].split(',')) if rule["allowed_employments"].lower() != "any" else random.choice(VALID_EMPLOYMENTS),
-            "disability_status": rule["disability_allowed"] if rule["disability_allowed"].lower() != "any" else random.choice(VALID_DISABILITIES),
-            "education_level": random.choice(rule["education_levels"].split(',')) if rule["education_levels"].lower() != "any" else random.choice(VALID_EDUCATIONS),
-        }
-        
-        # We created a perfect user, so it must be eligible for the target rule.
-        # Now, check its eligibility against ALL schemes to create a correct multi-label vector.
-        if is_eligible(user, rule):
-            pos_count += 1
-            row_labels = [1 if is_eligible(user, r) else 0 for _, r in rules.iterrows()]
-            data.append(user)
-            labels.append(row_labels)
-
-    # --- Generate Negative Samples ---
-    neg_count = 0
-    attempts = 0
-    while neg_count < samples_per_scheme // 2 and attempts < max_attempts:
-        attempts += 1
-        user = {
-            "age": random.randint(0, 100),
-            "annual_income": random.randint(0, 2000000), # Realistic random income range
-            "state": random.choice(VALID_STATES),
-            "gender": random.choice(VALID_GENDERS),
-            "caste": random.choice(VALID_CASTES),
-            "employment_type": random.choice(VALID_EMPLOYMENTS),
-            "disability_status": random.choice(VALID_DISABILITIES),
-            "education_level": random.choice(VALID_EDUCATIONS),
-        }
-        
-        # Ensure this random user is NOT eligible for the current scheme
-        if not is_eligible(user, rule):
-            neg_count += 1
-            # Check eligibility against ALL schemes to create the multi-label vector
-            row_labels = [1 if is_eligible(user, r) else 0 for _, r in rules.iterrows()]
-            data.append(user)
-            labels.append(row_labels)
-    
-    if (index + 1) % 10 == 0:
-        print(f"  Processed {index + 1}/{len(rules)} schemes...")
-
-
-# --- Save the Final Dataset ---
-df = pd.DataFrame(data)
-labels_df = pd.DataFrame(labels, columns=rules["scheme_id"].tolist())
-dataset = pd.concat([df, labels_df], axis=1)
-dataset.to_csv("training_dataset.csv", index=False)
-
-print("\n-------------------------------------------")
-print(f"✅ Generated balanced dataset with shape: {dataset.shape}")
-print("-------------------------------------------")
-# Verify that we have positive labels for all schemes
-positive_counts = labels_df.sum()
-print("Number of positive samples generated per scheme:")
-print(positive_counts)
-
-schemes_with_zero_positives = positive_counts[positive_counts == 0]
-if not schemes_with_zero_positives.empty:
-    print("\nWARNING: The following schemes had 0 positive samples generated. Check their rules in schemes_rules.csv!")
-    print(schemes_with_zero_positives)
-else:
-    print("\n✅ All schemes have at least one positive sample.")
-
+def generate(rules_path=BASE_DIR / "schemes_rules.csv", output_path=BASE_DIR / "training_dataset.parquet",
+             samples_per_scheme=100, seed=None):
+    """Generate the balanced multi-label dataset and write it to output_path. Returns the DataFrame."""
+    print("Starting dataset generation...")
+    try:
+        rules = load_rules(rules_path)
+        print("Successfully loaded schemes_rules.csv")
+    except FileNotFoundError:
+        print("Error: schemes_rules.csv not found. Please make sure the file is in the correct directory.")
+        sys.exit()
+
+    rng = random.Random(seed)
+    # Sorted so a fixed seed gives the same dataset on every run
+    valid_states = sorted(rules[rules["state"] != "Any"]["state"].unique())
+    # Plain dicts: iterating rows of a DataFrame for every label vector is by far the slowest part otherwise
+    all_rules = rules.to_dict("records")
+
+    data = []
+    labels = []
+    max_attempts = samples_per_scheme * 20
+
+    print(f"Generating {samples_per_scheme} samples for each of the {len(rules)} schemes...")
+
+    for index, rule in enumerate(all_rules):
+        # --- Generate Positive Samples (GUARANTEED ELIGIBLE) ---
+        pos_count = 0
+        attempts = 0
+        while pos_count < samples_per_scheme // 2 and attempts < max_attempts:
+            attempts += 1
+
+            # FIX: Correctly choose ONE valid option from multi-value rules (e.g., 'SC,ST' -> 'SC' or 'ST')
+            # FIX: Correctly choose a random valid user option when the rule is 'Any'
+            user = {
+                "age": rng.randint(rule["age_min"], rule["age_max"]),
+                "annual_income": rng.randint(rule["annual_income_min"], rule["annual_income_max"]),
+                "state": rule["state"] if rule["state"] != "Any" else rng.choice(valid_states),
+                "gender": rng.choice(rule["allowed_genders"].split(',')) if rule["allowed_genders"].lower() != "any" else rng.choice(VALID_GENDERS),
+                "caste": rng.choice(rule["allowed_castes"].split(',')) if rule["allowed_castes"].lower() != "any" else rng.choice(VALID_CASTES),
+                "employment_type": rng.choice(rule["allowed_employments"].split(',')) if rule["allowed_employments"].lower() != "any" else rng.choice(VALID_EMPLOYMENTS),
+                "disability_status": rule["disability_allowed"] if rule["disability_allowed"].lower() != "any" else rng.choice(VALID_DISABILITIES),
+                "education_level": rng.choice(rule["education_levels"].split(',')) if rule["education_levels"].lower() != "any" else rng.choice(VALID_EDUCATIONS),
+            }
+
+            # We created a perfect user, so it must be eligible for the target rule.
+            # Now, check its eligibility against ALL schemes to create a correct multi-label vector.
+            if is_eligible(user, rule):
+                pos_count += 1
+                row_labels = [1 if is_eligible(user, r) else 0 for r in all_rules]
+                data.append(user)
+                labels.append(row_labels)
+
+        # --- Generate Negative Samples ---
+        neg_count = 0
+        attempts = 0
+        while neg_count < samples_per_scheme // 2 and attempts < max_attempts:
+            attempts += 1
+            user = {
+                "age": rng.randint(0, 100),
+                "annual_income": rng.randint(0, 2000000), # Realistic random income range
+                "state": rng.choice(valid_states),
+                "gender": rng.choice(VALID_GENDERS),
+                "caste": rng.choice(VALID_CASTES),
+                "employment_type": rng.choice(VALID_EMPLOYMENTS),
+                "disability_status": rng.choice(VALID_DISABILITIES),
+                "education_level": rng.choice(VALID_EDUCATIONS),
+            }
+
+            # Ensure this random user is NOT eligible for the current scheme
+            if not is_eligible(user, rule):
+                neg_count += 1
+                # Check eligibility against ALL schemes to create the multi-label vector
+                row_labels = [1 if is_eligible(user, r) else 0 for r in all_rules]
+                data.append(user)
+                labels.append(row_labels)
+
+        if (index + 1) % 10 == 0:
+            print(f"  Processed {index + 1}/{len(rules)} schemes...")
+
+    # --- Save the Final Dataset ---
+    df = pd.DataFrame(data)
+    labels_df = pd.DataFrame(labels, columns=rules["scheme_id"].tolist())
+    dataset = pd.concat([df, labels_df], axis=1)
+    write_dataset(dataset, output_path, "schemes")
+
+    print("\n-------------------------------------------")
+    print(f"✅ Generated balanced dataset with shape: {dataset.shape}")
+    print("-------------------------------------------")
+    # Verify that we have positive labels for all schemes
+    positive_counts = labels_df.sum()
+    print("Number of positive samples generated per scheme:")
+    print(positive_counts)
+
+    schemes_with_zero_positives = positive_counts[positive_counts == 0]
+    if not schemes_with_zero_positives.empty:
+        print("\nWARNING: The following schemes had 0 positive samples generated. Check their rules in schemes_rules.csv!")
+        print(schemes_with_zero_positives)
+    else:
+        print("\n✅ All schemes have at least one positive sample.")
+    return dataset
+
+
+if __name__ == "__main__":
+    generate()
@@ -0,0 +1,238 @@
+# schemes_model/recompute.py
+"""
+Incremental recomputation of stored scheme eligibility after schemes_rules.csv changes.
+
+Instead of asking every user to re-submit /schemes/predict, this job:
+  1. diffs the previously applied rules snapshot against the current rules file,
+  2. picks the profiles each added / changed scheme can affect: those inside its old
+     or new rule's state, category lists and age / income ranges (rules.ProfileIndex),
+     plus the users it is stored for now,
+  3. scores only those profiles with the schemes model on disk (the files the API's
+     registry loads), in batches, and keeps the schemes that survive the API's filter
+     (rules.eligible_from_prediction), so it stores the rows /schemes/predict would,
+  4. applies only the difference to the `schemes` table as bulk inserts / deletes,
+  5. writes the new rules as the snapshot for the next run.
+
+Deploy the model trained on the new rules first: a scheme missing from the model's
+labels is never predicted (by the API either), and is reported. Profiles outside a
+scheme's old and new rule are left as stored: the model was trained on those rules,
+so it does not predict the scheme for them.
+
+Run from the backend directory:
+    python -m models.schemes_model.recompute            # uses the stored snapshot
+    python -m models.schemes_model.recompute --old path/to/old_rules.csv --dry-run
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import DictCursor, execute_values
+from dotenv import load_dotenv
+
+from ..db import bulk_delete, bulk_insert
+from ..encoding import FrameEncoder, array_input, serving_encoder
+from ..queries import SCHEMES_KEY
+from ..registry import fingerprint
+from .rules import RULES_PATH, ProfileIndex, diff_rules, eligible_from_prediction, load_rules, rules_by_id
+
+SNAPSHOT_PATH = RULES_PATH.with_name("schemes_rules.snapshot.csv")
+MODEL_PATH = RULES_PATH.with_name("schemes_model.pkl")
+LABELS_PATH = RULES_PATH.with_name("label_encoder.pkl")
+BATCH_SIZE = 20_000
+
+
+def fetch_profiles(cursor) -> Dict[str, dict]:
+    """Load every stored scheme profile, shaped like the model's feature row."""
+    cursor.execute(
+        "SELECT user_id, age, gender, state, caste, education_level, employment_type, income, disability_status "
+        "FROM schemes_input"
+    )
+    profiles = {}
+    for row in cursor.fetchall():
+        profiles[str(row["user_id"])] = {
+            "age": int(row["age"]),
+            "annual_income": int(row["income"]),
+            "state": row["state"],
+            "gender": row["gender"],
+            "caste": row["caste"],
+            "employment_type": row["employment_type"],
+            "disability_status": "Yes" if row["disability_status"] else "No",
+            "education_level": row["education_level"],
+        }
+    return profiles
+
+
+def fetch_stored(cursor, scheme_ids: List[str]) -> Dict[str, Set[str]]:
+    """scheme_id -> set of user ids currently stored as eligible, for the given schemes only."""
+    stored: Dict[str, Set[str]] = {s: set() for s in scheme_ids}
+    if scheme_ids:
+        cursor.execute("SELECT scheme_id, user_id FROM schemes WHERE scheme_id = ANY(%s)", (scheme_ids,))
+        for scheme_id, user_id in cursor.fetchall():
+            stored[scheme_id].add(str(user_id))
+    return stored
+
+
+def affected_profiles(old_rules: pd.DataFrame, new_rules: pd.DataFrame, index: ProfileIndex,
+                      stored: Dict[str, Set[str]], scheme_ids: List[str]) -> Dict[str, Set[str]]:
+    """scheme_id -> users whose eligibility for it the rule edit can change (see the module docstring)."""
+    old_by_id, new_by_id = rules_by_id(old_rules), rules_by_id(new_rules)
+    affected = {}
+    for scheme_id in scheme_ids:
+        users = index.covered(new_by_id[scheme_id]) | stored.get(scheme_id, set())
+        if scheme_id in old_by_id:
+            users |= index.covered(old_by_id[scheme_id])
+        affected[scheme_id] = users
+    return affected
+
+
+def load_model(rules_path: Path = RULES_PATH, model_path: Path = MODEL_PATH, labels_path: Path = LABELS_PATH):
+    """(encoder, scheme_columns, version id) built like the API's registry bundle."""
+    version = fingerprint([model_path, labels_path, rules_path])
+    return serving_encoder(joblib.load(model_path)), joblib.load(labels_path), version
+
+
+def predict_eligible(encoder, scheme_columns: List[str], rules: pd.DataFrame, profiles: Dict[str, dict],
+                     affected: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+    """scheme_id -> the affected users the API would store it for; only affected profiles are scored."""
+    eligible: Dict[str, Set[str]] = {s: set() for s in affected}
+    by_id = rules_by_id(rules)
+    user_ids = sorted(set().union(*affected.values()))
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[start:start + BATCH_SIZE]
+        records = [profiles[u] for u in batch]
+        if isinstance(encoder, FrameEncoder):
+            features = pd.DataFrame(records, columns=encoder.columns)
+        else:
+            features = np.vstack([encoder.encode(r) for r in records])
+        with array_input():
+            predictions = encoder.estimator.predict(features)
+        for user_id, record, prediction in zip(batch, records, predictions):
+            for scheme in eligible_from_prediction(prediction, scheme_columns, by_id, record["state"]):
+                if user_id in affected.get(scheme["id"], ()):
+                    eligible[scheme["id"]].add(user_id)
+    return eligible
+
+
+def plan_changes(new_rules, eligible: Dict[str, Set[str]], stored: Dict[str, Set[str]], diff: Dict[str, List[str]]
+                 ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str]], Dict[str, int]]:
+    """
+    Work out the minimal inserts and deletes, from the predicted eligible users of
+    every added / changed scheme among its affected ones (predict_eligible).
+    Returns (inserts [(user_id, scheme_id, name)], deletes [(user_id, scheme_id)], stats).
+    """
+    new_by_id = new_rules.set_index("scheme_id")
+    inserts, deletes = [], []
+
+    for scheme_id in diff["removed"]:
+        deletes.extend((user_id, scheme_id) for user_id in stored.get(scheme_id, ()))
+
+    for scheme_id in diff["added"] + diff["changed"]:
+        name = new_by_id.loc[scheme_id, "scheme_name"]
+        now, current = eligible.get(scheme_id, set()), stored.get(scheme_id, set())
+        inserts.extend((user_id, scheme_id, name) for user_id in now - current)
+        deletes.extend((user_id, scheme_id) for user_id in current - now)
+
+    stats = {"eligible": sum(len(users) for users in eligible.values())}
+    return inserts, deletes, stats
+
+
+def apply_changes(cursor, inserts, deletes, renames: List[Tuple[str, str]]) -> None:
+    """Apply the planned rows in a few multi-row statements."""
+    bulk_delete(cursor, "schemes", ["user_id", "scheme_id"], deletes)
+    bulk_insert(cursor, "schemes", ["user_id", "scheme_id", "scheme_name"], inserts, skip_existing=SCHEMES_KEY)
+    if renames:
+        execute_values(
+            cursor,
+            "UPDATE schemes AS s SET scheme_name = r.scheme_name FROM (VALUES %s) AS r(scheme_id, scheme_name) "
+            "WHERE s.scheme_id = r.scheme_id",
+            renames,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute stored scheme eligibility for changed rules only.")
+    parser.add_argument("--old", type=Path, default=SNAPSHOT_PATH, help="rules the stored results were computed with")
+    parser.add_argument("--new", type=Path, default=RULES_PATH, help="current rules file")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    args = parser.parse_args(argv)
+
+    if not args.old.exists():
+        print(f"Error: no previous rules at {args.old}. Pass --old, or copy the deployed rules there once.")
+        sys.exit(1)
+
+    timings = {}
+    t0 = time.perf_counter()
+    old_rules, new_rules = load_rules(args.old), load_rules(args.new)
+    diff = diff_rules(old_rules, new_rules)
+    timings["diff"] = time.perf_counter() - t0
+    print(f"📋 Rules diff: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+          f"{len(diff['changed'])} changed, {len(diff['renamed'])} renamed")
+
+    if not any(diff.values()):
+        print("✅ Nothing to recompute.")
+        return
+
+    encoder, scheme_columns, version = load_model(args.new)
+    recomputed = diff["added"] + diff["changed"]
+    unknown = sorted(set(recomputed) - set(scheme_columns))
+    if unknown:
+        print(f"⚠️ Not in the model's labels (never predicted, retrain the model): {', '.join(unknown)}")
+
+    load_dotenv()
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    cursor = conn.cursor(cursor_factory=DictCursor)
+    try:
+        t0 = time.perf_counter()
+        profiles = fetch_profiles(cursor)
+        stored = fetch_stored(cursor, diff["removed"] + recomputed)
+        timings["load"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        affected = affected_profiles(old_rules, new_rules, ProfileIndex(profiles), stored, recomputed)
+        scored = len(set().union(*affected.values())) if affected else 0
+        timings["index"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        eligible = predict_eligible(encoder, scheme_columns, new_rules, profiles, affected)
+        timings["predict"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        inserts, deletes, stats = plan_changes(new_rules, eligible, stored, diff)
+        renames = [(s, new_rules.set_index("scheme_id").loc[s, "scheme_name"]) for s in diff["renamed"]]
+        timings["plan"] = time.perf_counter() - t0
+
+        print(f"👥 {scored} of {len(profiles)} profiles scored with model {version}: "
+              f"{stats['eligible']} eligible for the {len(recomputed)} recomputed schemes")
+        print(f"🧮 Planned: {len(inserts)} inserts, {len(deletes)} deletes, {len(renames)} renamed schemes")
+
+        if args.dry_run:
+            conn.rollback()
+            print("Dry run: no changes written.")
+        else:
+            t0 = time.perf_counter()
+            apply_changes(cursor, inserts, deletes, renames)
+            conn.commit()
+            timings["apply"] = time.perf_counter() - t0
+            if args.new.resolve() != args.old.resolve():
+                shutil.copyfile(args.new, SNAPSHOT_PATH)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    print("⏱  " + ", ".join(f"{stage}: {secs * 1000:.1f} ms" for stage, secs in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
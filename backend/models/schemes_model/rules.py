@@ -0,0 +1,136 @@
+# schemes_model/rules.py
+"""
+Rule-table helpers shared by the schemes API and the recomputation job.
+
+- load_rules(): reads schemes_rules.csv and normalises the numeric bounds
+  exactly like generate_dataset.py does ("Any" -> 0 / 120 / 0 / 10**9).
+- eligible_from_prediction(): the filter /schemes/predict applies to the model's
+  prediction (state-scoped schemes only for residents), so the API and the
+  recomputation job store exactly the same rows.
+- diff_rules(): which schemes were added / removed / changed between two rule tables.
+- ProfileIndex: per-attribute masks over the stored profiles, used to find the
+  profiles a rule's ranges cover without scanning every profile.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+RULES_PATH = BASE_DIR / "schemes_rules.csv"
+
+# Columns that decide eligibility; a change to any of them means the scheme must be recomputed.
+ELIGIBILITY_COLUMNS = [
+    "scope", "state", "age_min", "age_max", "annual_income_min", "annual_income_max",
+    "allowed_genders", "allowed_castes", "allowed_employments", "disability_allowed", "education_levels",
+]
+
+# Rule column -> profile attribute for the categorical (multi-value) checks
+CATEGORICAL_RULES = {
+    "allowed_genders": "gender",
+    "allowed_castes": "caste",
+    "allowed_employments": "employment_type",
+    "disability_allowed": "disability_status",
+    "education_levels": "education_level",
+}
+
+
+def load_rules(path: Optional[Path] = None) -> pd.DataFrame:
+    """Load a rules CSV with numeric bounds filled in and text columns as strings."""
+    rules = pd.read_csv(path or RULES_PATH, dtype=str).fillna("Any")
+    rules.columns = rules.columns.str.strip()
+    rules = rules.loc[:, [c for c in rules.columns if c and not c.startswith("Unnamed")]]
+    rules["scheme_id"] = rules["scheme_id"].str.strip()
+
+    rules["age_min"] = pd.to_numeric(rules["age_min"], errors="coerce").fillna(0).astype(int)
+    rules["age_max"] = pd.to_numeric(rules["age_max"], errors="coerce").fillna(120).astype(int)
+    rules["annual_income_min"] = pd.to_numeric(rules["annual_income_min"], errors="coerce").fillna(0).astype(int)
+    rules["annual_income_max"] = pd.to_numeric(rules["annual_income_max"], errors="coerce").fillna(10**9).astype(int)
+    for col in ["scope", "state", "scheme_name"] + list(CATEGORICAL_RULES):
+        rules[col] = rules[col].astype(str).str.strip()
+    return rules
+
+
+def rules_by_id(rules: pd.DataFrame) -> Dict[str, dict]:
+    """scheme_id -> rule row, for per-scheme lookups on the request path."""
+    return {rule["scheme_id"]: rule for rule in rules.to_dict("records")}
+
+
+def in_scope(rule: Mapping, state: str) -> bool:
+    """A state-scoped scheme only applies to residents of its state."""
+    return str(rule["scope"]).lower() != "state" or str(state).lower() == str(rule["state"]).lower()
+
+
+def eligible_from_prediction(prediction: Sequence, scheme_columns: Sequence[str], rules: Mapping[str, dict],
+                             state: str) -> List[dict]:
+    """
+    The schemes stored for a profile: those the model predicts, that still exist in
+    the rules (by id, see rules_by_id) and are in scope for the profile's state.
+    """
+    eligible = []
+    for flag, scheme_id in zip(prediction, scheme_columns):
+        rule = rules.get(scheme_id)
+        if flag == 1 and rule is not None and in_scope(rule, state):
+            eligible.append({"id": scheme_id, "name": rule["scheme_name"]})
+    return eligible
+
+
+def _allowed(rule_value) -> Optional[Set[str]]:
+    """Parse 'SC,ST' into {'sc', 'st'}; 'Any' means no restriction (None)."""
+    value = str(rule_value).strip().lower()
+    if value == "any":
+        return None
+    return {v.strip() for v in value.split(",")}
+
+
+def diff_rules(old: pd.DataFrame, new: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    Compare two rule tables by scheme_id.
+    Returns {"added", "removed", "changed", "renamed"} lists of scheme ids, where
+    "changed" means an eligibility column differs and "renamed" means only the name did.
+    """
+    old_idx = old.set_index("scheme_id")
+    new_idx = new.set_index("scheme_id")
+    added = [s for s in new_idx.index if s not in old_idx.index]
+    removed = [s for s in old_idx.index if s not in new_idx.index]
+
+    changed, renamed = [], []
+    for scheme_id in new_idx.index.intersection(old_idx.index):
+        before, after = old_idx.loc[scheme_id], new_idx.loc[scheme_id]
+        if any(str(before[c]).lower() != str(after[c]).lower() for c in ELIGIBILITY_COLUMNS):
+            changed.append(scheme_id)
+        elif before["scheme_name"] != after["scheme_name"]:
+            renamed.append(scheme_id)
+    return {"added": added, "removed": removed, "changed": changed, "renamed": renamed}
+
+
+
+class ProfileIndex:
+    """
+    Inverted index over profiles (model feature rows, keyed by user id): a boolean
+    mask per categorical attribute value, plus the age and income columns.
+    covered(rule) is every profile inside the rule's state, category lists and
+    numeric ranges, the ones whose eligibility for that scheme a rule edit can change.
+    """
+
+    def __init__(self, profiles: Mapping[str, dict]):
+        self.user_ids = list(profiles)
+        rows = [profiles[u] for u in self.user_ids]
+        self.age = np.array([r["age"] for r in rows], dtype=np.int64)
+        self.income = np.array([r["annual_income"] for r in rows], dtype=np.int64)
+        self.values: Dict[str, np.ndarray] = {
+            attr: np.array([str(r[attr]).strip().lower() for r in rows], dtype=object)
+            for attr in ["state"] + list(CATEGORICAL_RULES.values())
+        }
+
+    def covered(self, rule: Mapping) -> Set[str]:
+        mask = ((self.age >= int(rule["age_min"])) & (self.age <= int(rule["age_max"]))
+                & (self.income >= int(rule["annual_income_min"])) & (self.income <= int(rule["annual_income_max"])))
+        restrictions = [(attr, _allowed(rule[col])) for col, attr in CATEGORICAL_RULES.items()]
+        restrictions.append(("state", _allowed(rule["state"])))
+        for attr, allowed in restrictions:
+            if allowed is not None:
+                mask &= np.isin(self.values[attr], list(allowed))
+        return {self.user_ids[i] for i in np.flatnonzero(mask)}
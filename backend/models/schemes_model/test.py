@@ -1,16 +1,20 @@
-import pandas as pd
 import joblib
+from pathlib import Path
+
+from ..datasets import read_dataset, resolve_dataset
 from sklearn.metrics import accuracy_score, f1_score, hamming_loss
 
+BASE_DIR = Path(__file__).resolve().parent
+
 def load_artifacts():
     # Load trained pipeline and target labels
-    pipeline = joblib.load("schemes_model.pkl")
-    target_cols = joblib.load("label_encoder.pkl")
+    pipeline = joblib.load(BASE_DIR / "schemes_model.pkl")
+    target_cols = joblib.load(BASE_DIR / "label_encoder.pkl")
     return pipeline, target_cols
 
 def load_dataset():
     # Load dataset (replace with test_dataset.csv if you have one)
-    df = pd.read_csv("training_dataset.csv")
+    df = read_dataset(resolve_dataset(BASE_DIR), "schemes")
     return df
 
 def evaluate_model():
@@ -1,20 +1,56 @@
-import pandas as pd
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.multioutput import MultiOutputClassifier
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
 from sklearn.metrics import accuracy_score, f1_score, hamming_loss
+from sklearn.model_selection import train_test_split
+import argparse
 import joblib
 import time
+from pathlib import Path
 
-def load_dataset():
+from ..datasets import read_dataset, resolve_dataset
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Classifier options:
+# - "per-scheme": one RandomForest per scheme (MultiOutputClassifier), the original model
+# - "multi-forest": a single RandomForest fitted on all scheme columns at once (native multi-output)
+# - "multi-extra-trees": the same with ExtraTrees (random split thresholds, cheaper to fit)
+MODEL_TYPES = ["per-scheme", "multi-forest", "multi-extra-trees"]
+
+def load_dataset(dataset_path=None):
     print("📂 Loading dataset...")
-    df = pd.read_csv("training_dataset.csv")
+    df = read_dataset(dataset_path or resolve_dataset(BASE_DIR), "schemes")
     print(f"✅ Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
     return df
 
-def build_pipeline():
+def build_classifier(model_type="per-scheme"):
+    if model_type == "per-scheme":
+        return MultiOutputClassifier(
+            RandomForestClassifier(
+                n_estimators=75,      # Less trees for faster training
+                max_depth=18,         # Prevent huge tree growth
+                min_samples_leaf=5,
+                n_jobs=-1,            # Use all CPU cores
+                random_state=42
+            )
+        )
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unknown model type {model_type!r}; expected one of {MODEL_TYPES}")
+    # Native multi-output: every tree predicts all schemes, so prediction walks 40 trees instead of 75 per scheme.
+    # Each node stores a value for every scheme, so tree count and depth are kept lower to bound memory.
+    forest = RandomForestClassifier if model_type == "multi-forest" else ExtraTreesClassifier
+    return forest(
+        n_estimators=40,
+        max_depth=16,
+        min_samples_leaf=3,
+        n_jobs=-1,
+        random_state=42
+    )
+
+def build_pipeline(model_type="per-scheme"):
     categorical_cols = ["state", "gender", "caste", "employment_type", "disability_status", "education_level"]
     numeric_cols = ["age", "annual_income"]
 
@@ -28,21 +64,14 @@ def build_pipeline():
 
     clf = Pipeline(steps=[
         ("preprocessor", preprocessor),
-        ("classifier", MultiOutputClassifier(
-            RandomForestClassifier(
-                n_estimators=75,      # Less trees for faster training
-                max_depth=18,         # Prevent huge tree growth
-                min_samples_leaf=5,
-                n_jobs=-1,            # Use all CPU cores
-                random_state=42
-            )
-        ))
+        ("classifier", build_classifier(model_type))
     ])
     return clf
 
-def train():
+def train(model_type="per-scheme", model_path=BASE_DIR / "schemes_model.pkl",
+          dataset_path=None, labels_path=BASE_DIR / "label_encoder.pkl", test_size=None):
     start_time = time.time()
-    df = load_dataset()
+    df = load_dataset(dataset_path)
 
     feature_cols = ["age", "annual_income", "state", "gender", "caste",
                     "employment_type", "disability_status", "education_level"]
@@ -52,9 +81,12 @@ def train():
 
     X = df[feature_cols]
     y_bin = df[target_cols]
+    if test_size:
+        # Hold out the rows train_test_split.evaluate_on_test_split scores (same split)
+        X, _, y_bin, _ = train_test_split(X, y_bin, test_size=test_size, random_state=42)
 
-    print("🚀 Training model...")
-    pipeline = build_pipeline()
+    print(f"🚀 Training model ({model_type})...")
+    pipeline = build_pipeline(model_type)
     pipeline.fit(X, y_bin)
 
     # 🔹 Evaluation (on training data for now)
@@ -72,11 +104,16 @@ def train():
     print(f"✅ Hamming Loss: {hamming:.4f}")
 
     # Save artifacts
-    joblib.dump(pipeline, "schemes_model.pkl", compress=("xz", 3))
-    joblib.dump(target_cols, "label_encoder.pkl")
+    joblib.dump(pipeline, model_path, compress=("xz", 3))
+    joblib.dump(target_cols, labels_path)
 
     elapsed_time = time.time() - start_time
     print(f"✅ Model training complete in {elapsed_time:.2f} seconds and saved!")
+    return {"accuracy": acc, "f1_micro": f1_micro, "f1_macro": f1_macro, "hamming_loss": hamming}
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the schemes eligibility model.")
+    parser.add_argument("--model", choices=MODEL_TYPES, default="per-scheme")
+    parser.add_argument("--output", default=BASE_DIR / "schemes_model.pkl")
+    args = parser.parse_args()
+    train(args.model, args.output)
@@ -1,20 +1,25 @@
-import pandas as pd
 import joblib
+from pathlib import Path
+
+from ..datasets import read_dataset, resolve_dataset
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, f1_score, hamming_loss
 
-def load_artifacts():
-    pipeline = joblib.load("schemes_model.pkl")
-    target_cols = joblib.load("label_encoder.pkl")
+BASE_DIR = Path(__file__).resolve().parent
+
+def load_artifacts(model_path=BASE_DIR / "schemes_model.pkl", labels_path=BASE_DIR / "label_encoder.pkl"):
+    pipeline = joblib.load(model_path)
+    target_cols = joblib.load(labels_path)
     return pipeline, target_cols
 
-def load_dataset():
-    df = pd.read_csv("training_dataset.csv")
+def load_dataset(dataset_path=None):
+    df = read_dataset(dataset_path or resolve_dataset(BASE_DIR), "schemes")
     return df
 
-def evaluate_on_test_split(test_size=0.2, random_state=42):
-    pipeline, target_cols = load_artifacts()
-    df = load_dataset()
+def evaluate_on_test_split(test_size=0.2, random_state=42, dataset_path=None,
+                           model_path=BASE_DIR / "schemes_model.pkl", labels_path=BASE_DIR / "label_encoder.pkl"):
+    pipeline, target_cols = load_artifacts(model_path, labels_path)
+    df = load_dataset(dataset_path)
 
     feature_cols = ["age", "annual_income", "state", "gender", "caste",
                     "employment_type", "disability_status", "education_level"]
@@ -37,6 +42,8 @@ def evaluate_on_test_split(test_size=0.2, random_state=42):
     print(f"✅ Test F1 (Micro): {f1_micro:.4f}")
     print(f"✅ Test F1 (Macro): {f1_macro:.4f}")
     print(f"✅ Test Hamming Loss: {hamming:.4f}")
+    return {"accuracy": round(acc, 4), "f1_micro": round(f1_micro, 4),
+            "f1_macro": round(f1_macro, 4), "hamming_loss": round(hamming, 4)}
 
 if __name__ == "__main__":
     evaluate_on_test_split()
\ No newline at end of file
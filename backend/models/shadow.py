@@ -0,0 +1,144 @@
+# backend/models/shadow.py
+"""
+Shadow evaluation of candidate models, off the request path.
+
+A candidate is registered in the model registry next to the primary it shadows,
+as "<name>:candidate" (e.g. schemes_model.candidate.pkl). It is hot-reloaded like
+any other model, and never serves a response.
+
+For a sampled fraction of requests (SHADOW_SAMPLE_RATE) the service hands the
+request's model input, the primary's output and the primary's inference time to
+submit(). That puts them on a bounded queue (SHADOW_QUEUE_SIZE) and returns at once.
+A full queue drops the sample: the request never waits on the shadow. A single
+background thread per web worker scores each sample with the candidate and records:
+
+- prajaseva_shadow_total{model, outcome}: agree / disagree / error / dropped,
+- prajaseva_shadow_seconds{model, role}: inference time of the primary and of the
+  candidate, for the same sampled inputs,
+- prajaseva_shadow_agreement_<model>: agreement rate so far (gauge).
+
+What "agree" means is up to the service (same scheme set, same top recommendation).
+With no candidate file, submit() returns straight away.
+
+    shadow.register("wealth", score=top_scheme, agree=operator.eq)
+    shadow.submit("wealth", record, primary_output, primary_seconds)
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .metrics import Counter, Histogram, register, register_gauge
+from .registry import registry
+
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.05"))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "256"))
+
+SHADOW_RESULTS = register(Counter("prajaseva_shadow_total", "Shadow samples by outcome.", ["model", "outcome"]))
+SHADOW_LATENCY = register(Histogram("prajaseva_shadow_seconds", "Inference time on shadowed inputs.", ["model", "role"]))
+
+
+def candidate_name(name: str) -> str:
+    return f"{name}:candidate"
+
+
+class ShadowEvaluator:
+    def __init__(self, sample_rate: float = SHADOW_SAMPLE_RATE, queue_size: int = SHADOW_QUEUE_SIZE):
+        self.sample_rate = sample_rate
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max(1, queue_size))
+        self._scorers: Dict[str, tuple] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    def register(self, name: str, score: Callable[[object, dict], object], agree: Callable[[object, object], bool]) -> None:
+        """`score(candidate_bundle, record)` -> output comparable with the primary's by `agree(primary, candidate)`."""
+        self._scorers[name] = (score, agree)
+        self.counts[name] = {"agree": 0, "disagree": 0, "error": 0, "dropped": 0}
+        register_gauge(f"prajaseva_shadow_agreement_{name}", f"Share of shadowed {name} inputs the candidate agreed on.",
+                       lambda: self.agreement(name))
+
+    def agreement(self, name: str) -> float:
+        counts = self.counts[name]
+        return counts["agree"] / max(counts["agree"] + counts["disagree"], 1)
+
+    def _count(self, name: str, outcome: str) -> None:
+        with self._lock:
+            self.counts[name][outcome] += 1
+        SHADOW_RESULTS.inc(name, outcome)
+
+    # --- Request side ---
+    def submit(self, name: str, record: dict, primary, primary_seconds: float) -> bool:
+        """Queue one input for the candidate (sampled, never blocking). True if queued."""
+        if self.sample_rate <= 0 or registry.active(candidate_name(name)) is None:
+            return False
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((name, record, primary, primary_seconds))
+        except queue.Full:
+            self._count(name, "dropped")
+            return False
+        return True
+
+    # --- Background side ---
+    def _evaluate(self, name: str, record: dict, primary, primary_seconds: float) -> None:
+        version = registry.active(candidate_name(name))
+        if version is None:
+            return
+        score, agree = self._scorers[name]
+        start = time.perf_counter()
+        try:
+            candidate = score(version.bundle, record)
+        except Exception:
+            self._count(name, "error")
+            return
+        SHADOW_LATENCY.observe(time.perf_counter() - start, name, "candidate")
+        SHADOW_LATENCY.observe(primary_seconds, name, "primary")
+        self._count(name, "agree" if agree(primary, candidate) else "disagree")
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._evaluate(*item)
+            except Exception as e:
+                print(f"⚠️ Shadow evaluation failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def drain(self, timeout: float = 30.0) -> None:
+        """Wait until every queued sample has been scored (benchmarks)."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and time.monotonic() < deadline:
+                self._queue.all_tasks_done.wait(deadline - time.monotonic())
+
+    def stop(self) -> None:
+        if self._thread is not None and self._thread_pid == os.getpid():
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass    # daemon thread: exits with the process
+            self._thread.join(timeout=5)
+        self._thread = None
+
+
+shadow = ShadowEvaluator()
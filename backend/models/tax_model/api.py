@@ -1,56 +1,81 @@
 # tax_model/api.py
-import os
 import json
-from fastapi import FastAPI, Depends, HTTPException, status
+import math
+from fastapi import FastAPI, Depends, HTTPException, Request
 from pydantic import BaseModel
 from pathlib import Path
 import joblib
-import pandas as pd
-import psycopg2
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional
 from psycopg2.extras import DictCursor
-from jose import JWTError, jwt
 from dotenv import load_dotenv
-from fastapi.security import OAuth2PasswordBearer
+
+from ..auth import get_current_user
+from ..admission import admit
+from ..metrics import stage
+from ..inference import predict
+from ..encoding import serving_encoder
+from .optimizer import MIN_STEP, optimize_deductions
+from .what_if import FIELDS as WHAT_IF_FIELDS, break_even_incomes, evaluate_scenarios, scenario_deductions
+from ..db import execute_prepared, get_db_connection, upsert_rows, WriteBehindWriter, WRITE_BEHIND_ENABLED
+from ..queries import LATEST_TAX_INPUT
+from ..registry import VERSION_HEADER, ModelVersion, registry
+from ..responses import FastJSONResponse
+from ..deadlines import deadline_handlers, passthrough
+from ..http_cache import etag_matches, not_modified, result_etag, result_response
 
 # --- Environment Setup ---
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
-JWT_SECRET = os.getenv("JWT_SECRET")
-ALGORITHM = "HS256"
-
-app = FastAPI(title="Tax Model API")
 
-# --- Security & Authentication ---
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+app = FastAPI(title="Tax Model API", default_response_class=FastJSONResponse,
+              exception_handlers=deadline_handlers)
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
-    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        user_id: str = payload.get("userId")
-        if user_id is None:
-            raise credentials_exception
-        return user_id
-    except JWTError:
-        raise credentials_exception
-
-# --- Database Connection ---
-def get_db_connection():
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        return conn
-    except Exception as e:
-        # Keep error message generic for security, but log in your infra if needed
-        raise HTTPException(status_code=500, detail="Database connection failed.")
+# --- Database Writes ---
+TAX_COLUMNS = ["user_id", "taxable_income_old", "tax_old", "taxable_income_new", "tax_new",
+               "recommended_regime", "tax_saving", "notes"]
+TAX_SQL_VALUES = {"generated_at": "NOW()"}
+tax_writer = WriteBehindWriter("tax", TAX_COLUMNS, key="user_id", sql_values=TAX_SQL_VALUES) if WRITE_BEHIND_ENABLED else None
 
 # --- Load ML Model & Data ---
 base_dir = Path(__file__).resolve().parent
-ml_model = joblib.load(base_dir / "tax_model.pkl") if (base_dir / "tax_model.pkl").exists() else None
-feature_columns = joblib.load(base_dir / "feature_columns.pkl") if (base_dir / "feature_columns.pkl").exists() else [
+DEFAULT_FEATURE_COLUMNS = [
     'age','annual_income','is_salaried','investment_80c','investment_80d',
     'home_loan_interest','education_loan_interest','donations_80g','other_deductions','standard_deduction'
 ]
 
+
+class TaxModel(NamedTuple):
+    encoder: object
+    feature_columns: list
+
+
+def _load_model(version: ModelVersion) -> TaxModel:
+    columns_path = next((p for p in version.files if p.name == "feature_columns.pkl"), None)
+    feature_columns = joblib.load(columns_path) if columns_path is not None else DEFAULT_FEATURE_COLUMNS
+    return TaxModel(serving_encoder(joblib.load(version.files[0]), columns=feature_columns), feature_columns)
+
+
+def ml_features(model: TaxModel, data: "TaxInput"):
+    """The model's input row for `data`."""
+    # --- FIX: use NEW standard deduction in ML input to reflect FY 2025–26 ---
+    standard_deduction = 75000 if data.is_salaried else 0
+    return model.encoder.encode(dict(zip(model.feature_columns, [
+        data.age,
+        data.annual_income,
+        int(data.is_salaried),
+        data.investment_80c,
+        data.investment_80d,
+        data.home_loan_interest,
+        data.education_loan_interest,
+        data.donations_80g,
+        data.other_deductions,
+        standard_deduction
+    ])))
+
+
+# Hot-reloaded when either file changes (models/registry.py); None until the model exists
+registry.register("tax", [base_dir / "tax_model.pkl"], _load_model, optional=[base_dir / "feature_columns.pkl"])
+
 # --- Pydantic model for data validation ---
 class TaxInput(BaseModel):
     age: int
@@ -63,6 +88,24 @@ class TaxInput(BaseModel):
     donations_80g: float = 0
     other_deductions: float = 0
 
+class OptimizeInput(BaseModel):
+    budget: float                       # additional amount the user can invest / spend this year
+    limits: Dict[str, float] = {}       # per-section ceilings, keyed like TaxInput; loan interest: the extra expected
+    step: float = 5000
+
+class WhatIfAxis(BaseModel):
+    field: str                          # one of the TaxInput fields below, e.g. annual_income
+    start: float
+    stop: float
+    points: int = 50
+
+class WhatIfInput(BaseModel):
+    base: Optional[Dict[str, float]] = None   # TaxInput fields; defaults to the user's latest tax input
+    scenarios: Dict[str, List[float]] = {}    # columnar overrides of `base`, equal lengths
+    grid: List[WhatIfAxis] = []               # or: every combination of these axes
+
+MAX_WHAT_IF_POINTS = 10_000
+
 # -------- Helper Functions --------
 def calc_old_regime_tax(taxable):
     # same old-regime logic you had — preserved
@@ -122,13 +165,15 @@ def calc_new_regime_tax(taxable_income):
     return tax * 1.04  # add 4% cess
 
 # --- API Endpoint ---
-@app.post("/predict_tax")
+@app.post("/predict_tax", dependencies=[Depends(admit("predict"))])
 def predict_tax(user_id: str = Depends(get_current_user)):
+    version = registry.active("tax")
     conn = get_db_connection()
     cursor = conn.cursor(cursor_factory=DictCursor)
     try:
-        cursor.execute("SELECT * FROM tax_input WHERE user_id = %s ORDER BY created_at DESC LIMIT 1", (user_id,))
-        user_input_data = cursor.fetchone()
+        with stage("db_fetch"):
+            execute_prepared(cursor, LATEST_TAX_INPUT, (user_id,))
+            user_input_data = cursor.fetchone()
         if not user_input_data:
             raise HTTPException(status_code=404, detail="No tax input data found for this user.")
 
@@ -155,8 +200,9 @@ def predict_tax(user_id: str = Depends(get_current_user)):
         taxable_new = max(taxable_new, 0)
 
         # Compute tax amounts using helper functions
-        tax_old = calc_old_regime_tax(taxable_old)
-        tax_new = calc_new_regime_tax(taxable_new)
+        with stage("compute"):
+            tax_old = calc_old_regime_tax(taxable_old)
+            tax_new = calc_new_regime_tax(taxable_new)
 
         recommended = "Old Regime" if tax_old < tax_new else "New Regime"
         tax_saving = abs(tax_old - tax_new)
@@ -168,41 +214,24 @@ def predict_tax(user_id: str = Depends(get_current_user)):
             "Cess 4% added on tax."
         ]
 
-        upsert_query = """
-            INSERT INTO tax (user_id, taxable_income_old, tax_old, taxable_income_new, tax_new, recommended_regime, tax_saving, notes, generated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-            ON CONFLICT (user_id) DO UPDATE SET
-                taxable_income_old = EXCLUDED.taxable_income_old, tax_old = EXCLUDED.tax_old,
-                taxable_income_new = EXCLUDED.taxable_income_new, tax_new = EXCLUDED.tax_new,
-                recommended_regime = EXCLUDED.recommended_regime, tax_saving = EXCLUDED.tax_saving,
-                notes = EXCLUDED.notes, generated_at = NOW();
-        """
-        cursor.execute(upsert_query, (user_id, taxable_old, tax_old, taxable_new, tax_new, recommended, tax_saving, json.dumps(notes)))
-        conn.commit()
-
+        # ML before the write: db_upsert is the last stage, so a deadline never 504s a stored result
         ml_recommendation = "Not available"
-        if ml_model:
-            # --- FIX: use NEW standard deduction in ML input to reflect FY 2025–26 ---
-            standard_deduction = 75000 if data.is_salaried else 0
-            input_data = pd.DataFrame(
-                [[
-                    data.age,
-                    data.annual_income,
-                    int(data.is_salaried),
-                    data.investment_80c,
-                    data.investment_80d,
-                    data.home_loan_interest,
-                    data.education_loan_interest,
-                    data.donations_80g,
-                    data.other_deductions,
-                    standard_deduction
-                ]],
-                columns=feature_columns
-            )
-            ml_prediction = ml_model.predict(input_data)[0]
+        if version is not None:
+            with stage("features"):
+                input_data = ml_features(version.bundle, data)
+            with stage("inference"):
+                ml_prediction = predict("tax", version.bundle.encoder.estimator, input_data, version=version)[0]
             ml_recommendation = "Old Regime" if int(ml_prediction) == 1 else "New Regime"
 
-        return {
+        row = (user_id, taxable_old, tax_old, taxable_new, tax_new, recommended, tax_saving, json.dumps(notes))
+        # Write-behind batches the upsert with other requests; a full queue falls back to writing now
+        with stage("db_upsert"):
+            if not (tax_writer and tax_writer.submit(row)):
+                upsert_rows(cursor, "tax", TAX_COLUMNS, [row], key="user_id", sql_values=TAX_SQL_VALUES)
+            conn.commit()
+
+        # Plain data: rendered directly, without jsonable_encoder (models/responses.py)
+        return FastJSONResponse({
             "calculation_summary": {
                 "taxable_income_old": taxable_old, "tax_old": round(tax_old, 2),
                 "taxable_income_new": taxable_new, "tax_new": round(tax_new, 2),
@@ -219,15 +248,128 @@ def predict_tax(user_id: str = Depends(get_current_user)):
             "Caps: 80C ₹1,50,000; 80D ₹50,000; Home loan interest ₹2,00,000.",
             "Cess 4% added on tax."
         ]
-        }
+        }, headers={VERSION_HEADER: version.id} if version is not None else None)
 
     
 
     except Exception as e:
         conn.rollback()
+        passthrough(e)      # 404s as they are; DB timeouts as 504 (models/deadlines.py)
         # surface safe error to client
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     finally:
         cursor.close()
         conn.close()
-    
\ No newline at end of file
+
+
+def _latest_tax_input(user_id: str) -> TaxInput:
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=DictCursor)
+    try:
+        with stage("db_fetch"):
+            execute_prepared(cursor, LATEST_TAX_INPUT, (user_id,))
+            user_input_data = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if not user_input_data:
+        raise HTTPException(status_code=404, detail="No tax input data found for this user.")
+    return TaxInput(**user_input_data)
+
+
+@app.post("/optimize", dependencies=[Depends(admit("compute"))])
+def optimize_tax(request: OptimizeInput, user_id: str = Depends(get_current_user)):
+    """Best split of `budget` across 80C / 80D / home-loan interest / 80E / 80G for the user's latest input. Read-only."""
+    if request.budget < 0 or request.step < MIN_STEP:
+        raise HTTPException(status_code=422, detail=f"budget must be >= 0 and step >= {MIN_STEP:,.0f}.")
+    data = _latest_tax_input(user_id)
+    with stage("compute"):
+        result = optimize_deductions(
+            data.annual_income, request.budget, current=dict(data), other_deductions=data.other_deductions,
+            is_salaried=data.is_salaried, limits=request.limits, step=request.step,
+        )
+    result["notes"] = [
+        "Old Regime tax per tax_utils (FY 2024–25 slabs, Section 87A rebate, 4% cess).",
+        "Caps: 80C ₹1,50,000; 80D ₹50,000; Home loan interest ₹2,00,000; 80G donations count in full, up to 10% of gross income in total.",
+        "New Regime ignores these deductions; when it wins, no additional investment is needed to minimize tax.",
+    ]
+    return result
+
+
+@app.post("/what_if", dependencies=[Depends(admit("compute"))])
+def what_if(request: WhatIfInput, user_id: str = Depends(get_current_user)):
+    """Old/New Regime tax for a list or grid of scenarios, plus the break-even incomes of the base profile. Read-only."""
+    varied = set(request.scenarios) | {axis.field for axis in request.grid}
+    if varied - set(WHAT_IF_FIELDS) or set(request.base or {}) - set(WHAT_IF_FIELDS) - {"age"}:
+        raise HTTPException(status_code=422, detail=f"Scenario fields must be among: {', '.join(WHAT_IF_FIELDS)}.")
+    if request.scenarios and request.grid:
+        raise HTTPException(status_code=422, detail="Send either scenarios or grid, not both.")
+    lengths = {len(values) for values in request.scenarios.values()}
+    if request.scenarios:
+        count = lengths.pop() if len(lengths) == 1 else 0
+    else:
+        count = math.prod(max(axis.points, 0) for axis in request.grid)
+    if not 0 < count <= MAX_WHAT_IF_POINTS:
+        raise HTTPException(status_code=422, detail=f"Scenarios must have equal lengths and at most {MAX_WHAT_IF_POINTS} points.")
+
+    base = {"is_salaried": 1.0, **request.base} if request.base is not None else \
+        {f: float(v) for f, v in dict(_latest_tax_input(user_id)).items() if f in WHAT_IF_FIELDS}
+    with stage("compute"):
+        columns = {f: np.full(count, base.get(f, 0.0), dtype=np.float64) for f in WHAT_IF_FIELDS}
+        if request.grid:
+            axes = np.meshgrid(*(np.linspace(a.start, a.stop, a.points) for a in request.grid), indexing="ij")
+            for axis, values in zip(request.grid, axes):
+                columns[axis.field] = values.ravel()
+        for f, values in request.scenarios.items():
+            columns[f] = np.asarray(values, dtype=np.float64)
+        taxes = evaluate_scenarios(columns)
+
+        base_columns = {f: np.float64(base.get(f, 0.0)) for f in WHAT_IF_FIELDS}
+        old_deductions, new_deduction = scenario_deductions(base_columns)
+        break_even = break_even_incomes(float(old_deductions), float(new_deduction))
+
+    # Plain lists straight to JSON: skips FastAPI's per-element encoding of 10k-long arrays
+    return FastJSONResponse({
+        "count": count,
+        "scenarios": {f: columns[f].tolist() for f in sorted(varied)},
+        **{name: values.tolist() for name, values in taxes.items()},
+        "break_even": break_even,
+        "notes": [
+            "Taxes per tax_utils: Old Regime FY 2024–25 (87A rebate up to ₹5,00,000), New Regime FY 2025–26; 4% cess.",
+            "saving_with_new = tax_old - tax_new (positive: the New Regime is cheaper).",
+            "break_even: gross incomes where the cheaper regime changes for the base profile's deductions.",
+        ],
+    })
+
+
+@app.get("/result")
+def stored_tax_result(request: Request, user_id: str = Depends(get_current_user)):
+    """The result the last /predict_tax stored, without recomputing it. Conditional on If-None-Match (models/http_cache.py)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        with stage("db_fetch"):
+            if request.headers.get("if-none-match"):
+                cursor.execute("SELECT generated_at FROM tax WHERE user_id = %s", (user_id,))
+                row = cursor.fetchone()
+                if row is not None and etag_matches(request, result_etag("tax", user_id, row[0])):
+                    return not_modified(result_etag("tax", user_id, row[0]))
+            cursor.execute("SELECT taxable_income_old, tax_old, taxable_income_new, tax_new, recommended_regime, "
+                           "tax_saving, notes, generated_at FROM tax WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if row is None:
+        raise HTTPException(status_code=404, detail="No tax result stored for this user; call /predict_tax first.")
+    taxable_old, tax_old, taxable_new, tax_new, recommended, tax_saving, notes, generated_at = row
+    return result_response(request, {
+        "calculation_summary": {
+            "taxable_income_old": float(taxable_old), "tax_old": round(float(tax_old), 2),
+            "taxable_income_new": float(taxable_new), "tax_new": round(float(tax_new), 2),
+        },
+        "recommendation": {"deterministic": recommended, "tax_saving": round(float(tax_saving), 2)},
+        # JSONB notes arrive decoded (a list), TEXT ones as the JSON string
+        "notes": (json.loads(notes) if isinstance(notes, str) else notes) or [],
+        "generated_at": generated_at.isoformat() if generated_at else None,
+    }, result_etag("tax", user_id, generated_at))
@@ -0,0 +1,113 @@
+# generate_dataset.py - Synthetic taxpayer profiles labelled with the tax_utils regimes
+"""
+Generates the tax training dataset: taxpayer profiles sampled with NumPy and labelled
+with the vectorized Old/New Regime computation of tax_utils.py, so the labels follow
+the slabs, caps and rebates there (regenerate after changing them).
+
+Profiles (shape taken from the original training_dataset.csv):
+- age uniform 18-69, 71% salaried
+- annual income log-normal, truncated to ₹50,000 - ₹50,00,000
+- each deduction is zero with a small probability, otherwise a uniform share of
+  income (DEDUCTION_PROFILE), capped at the section's limit
+
+Labels: taxable_old / tax_old as compute_tax_old (80G donations count as other
+deductions), taxable_new / tax_new as compute_tax_new, best_regime "old" when the
+Old Regime is not more expensive. standard_deduction is the New Regime one, as the
+API feeds it to the model.
+
+Rows are produced in chunks of `chunk_size`, each from its own child of one
+SeedSequence, by a pool of processes; the parent writes them in order
+(datasets.write_generated). The output depends only on (rows, seed, chunk_size),
+not on the number of processes.
+
+    python -m models.tax_model.generate_dataset --rows 10000000 --seed 42 --workers 8
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from ..datasets import write_generated
+from .tax_utils import (
+    CAP_80C, CAP_80D, NEW_STD_DEDUCTION, new_tax_from_taxable, old_regime_deductions, old_tax_from_taxable,
+)
+
+BASE_DIR = Path(__file__).resolve().parent
+
+AGE_RANGE = (18, 69)
+SALARIED_SHARE = 0.71
+INCOME_LOG_MEAN, INCOME_LOG_STD = 13.1, 1.15
+INCOME_RANGE = (50_000, 5_000_000)
+
+# column: (probability of zero, share of income low, high, cap)
+DEDUCTION_PROFILE = {
+    "investment_80c": (0.02, 0.005, 0.13, CAP_80C),
+    "investment_80d": (0.02, 0.0008, 0.021, CAP_80D),
+    "home_loan_interest": (0.05, 0.002, 0.12, 600_000),
+    "education_loan_interest": (0.02, 0.0, 0.0045, None),
+    "donations_80g": (0.09, 0.0, 0.0055, None),
+    "other_deductions": (0.04, 0.0003, 0.012, 50_000),
+}
+
+COLUMNS = ["age", "annual_income", "is_salaried", *DEDUCTION_PROFILE, "standard_deduction",
+           "taxable_old", "tax_old", "taxable_new", "tax_new", "best_regime"]
+
+
+def generate_chunk(seed: np.random.SeedSequence, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {
+        "age": rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, rows),
+        "is_salaried": (rng.random(rows) < SALARIED_SHARE).astype(np.int8),
+    }
+    # Truncated log-normal by inverse CDF (no rejection loop)
+    low, high = (ndtr((np.log(v) - INCOME_LOG_MEAN) / INCOME_LOG_STD) for v in INCOME_RANGE)
+    income = np.exp(INCOME_LOG_MEAN + INCOME_LOG_STD * ndtri(rng.uniform(low, high, rows)))
+    data["annual_income"] = income.astype(np.int64)
+
+    for column, (p_zero, share_low, share_high, cap) in DEDUCTION_PROFILE.items():
+        amount = income * rng.uniform(share_low, share_high, rows)
+        if cap is not None:
+            amount = np.minimum(amount, cap)
+        data[column] = np.where(rng.random(rows) < p_zero, 0, amount).astype(np.int64)
+
+    data["standard_deduction"] = np.where(data["is_salaried"] == 1, NEW_STD_DEDUCTION, 0).astype(np.int64)
+
+    old_deductions = old_regime_deductions(data["investment_80c"], data["investment_80d"], data["home_loan_interest"],
+                                           data["education_loan_interest"], data["donations_80g"] + data["other_deductions"])
+    data["taxable_old"] = np.maximum(data["annual_income"] - old_deductions, 0).astype(np.float64)
+    data["tax_old"] = old_tax_from_taxable(data["taxable_old"])
+    data["taxable_new"] = np.maximum(data["annual_income"] - data["standard_deduction"], 0).astype(np.float64)
+    data["tax_new"] = new_tax_from_taxable(data["taxable_new"])
+    data["best_regime"] = np.where(data["tax_old"] <= data["tax_new"], "old", "new")
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def generate(output_path=BASE_DIR / "training_dataset.parquet", rows: int = 200_000, seed: Optional[int] = None,
+             workers: Optional[int] = None, chunk_size: int = 250_000) -> int:
+    sizes = [chunk_size] * (rows // chunk_size) + ([rows % chunk_size] if rows % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sizes)))
+    output_path = Path(output_path)
+
+    start = time.perf_counter()
+    rows_written = write_generated(output_path, "tax", generate_chunk, list(zip(seeds, sizes)), workers)
+    print(f"✅ Generated {output_path.name} with {rows_written} rows in {time.perf_counter() - start:.1f}s "
+          f"({workers} process{'es' if workers > 1 else ''}).")
+    return rows_written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the tax training dataset.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--output", type=Path, default=BASE_DIR / "training_dataset.parquet")
+    args = parser.parse_args()
+    generate(args.output, args.rows, args.seed, args.workers, args.chunk_size)
@@ -0,0 +1,154 @@
+# tax_model/optimizer.py
+"""
+Deduction optimizer: how to spend a budget across 80C, 80D, home-loan interest,
+80E and 80G to minimize tax.
+
+Only the Old Regime rewards deductions, so the search is over Old Regime allocations;
+the New Regime tax (standard deduction only) is the alternative it is compared with.
+
+Search:
+- Each section has a capacity: its cap in tax_utils minus what the user already
+  claims, the user's own limit, and the budget. 80G donations count in full, as in
+  predict_tax, up to CAP_80G_RATIO of gross income in total. Loan interest cannot be
+  bought with the budget: home-loan interest and 80E stay at what the user reports
+  unless `limits` gives the extra interest they expect to pay.
+- Pruning from the slab breakpoints: tax is zero once taxable income is at or below
+  the 87A rebate limit, so deductions beyond (taxable - OLD_REBATE_LIMIT) are
+  wasted and every capacity is clipped to that. Users already in the rebate zone
+  need no search at all.
+- All sections but one are swept on a grid (`step`, at least MIN_STEP, coarsened
+  before anything is built until the grid size stays under MAX_CANDIDATES) that also
+  contains each section's capacity and the exact
+  amounts landing taxable income on a slab breakpoint. The remaining section (the
+  best-rate one with the largest capacity) is solved in closed form per grid row:
+  it takes whatever budget is left, up to what still reduces tax. Every row is
+  evaluated in one numpy pass; the winner has the lowest tax, then the lowest spend,
+  then the most in the earlier SECTIONS (80C first).
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from .tax_utils import (
+    CAP_80C, CAP_80D, CAP_HOME_INTEREST, NEW_STD_DEDUCTION, OLD_REBATE_LIMIT,
+    new_tax_from_taxable, old_regime_deductions, old_slabs, old_tax_from_taxable,
+)
+
+CAP_80G_RATIO = 0.10       # 80G deductions limited to 10% of gross income
+MIN_STEP = 1000.0
+MAX_CANDIDATES = 20_000
+
+SECTIONS = ["investment_80c", "investment_80d", "home_loan_interest", "education_loan_interest", "donations_80g"]
+# Interest the user pays on existing loans: only more of it with an explicit limit
+LOAN_SECTIONS = {"home_loan_interest", "education_loan_interest"}
+
+
+def _section_limits(current: Dict[str, float], gross_income: float):
+    """(deduction per rupee, remaining statutory capacity in rupees) for every section."""
+    return {
+        "investment_80c": (1.0, max(0.0, CAP_80C - current["investment_80c"])),
+        "investment_80d": (1.0, max(0.0, CAP_80D - current["investment_80d"])),
+        "home_loan_interest": (1.0, max(0.0, CAP_HOME_INTEREST - current["home_loan_interest"])),
+        "education_loan_interest": (1.0, math.inf),
+        "donations_80g": (1.0, max(0.0, CAP_80G_RATIO * gross_income - current["donations_80g"])),
+    }
+
+
+def _grid_size(capacity: float, step: float, breakpoints: int) -> int:
+    """Points of one section's grid (upper bound: multiples of step, capacity, breakpoints)."""
+    return math.ceil(capacity / step) + 1 + breakpoints
+
+
+def optimize_deductions(
+    gross_income: float,
+    budget: float,
+    current: Optional[Dict[str, float]] = None,
+    other_deductions: float = 0.0,
+    is_salaried: bool = True,
+    limits: Optional[Dict[str, float]] = None,
+    step: float = 5000.0,
+) -> dict:
+    """
+    Best use of `budget` on top of the `current` deductions (keys of SECTIONS).
+    `limits` caps what the user can put into a section; for LOAN_SECTIONS it is the
+    extra interest the user expects to pay (none without one).
+    """
+    current = {s: float((current or {}).get(s) or 0.0) for s in SECTIONS}
+    limits = {**{s: 0.0 for s in LOAN_SECTIONS}, **(limits or {})}
+    budget = max(0.0, float(budget))
+    step = max(float(step), MIN_STEP)
+
+    # Current deductions, as the Old Regime counts them
+    old_deductions = old_regime_deductions(current["investment_80c"], current["investment_80d"], current["home_loan_interest"],
+                                           current["education_loan_interest"], current["donations_80g"] + other_deductions)
+    taxable_old = max(0.0, gross_income - float(old_deductions))
+    tax_old = float(old_tax_from_taxable(taxable_old))
+    tax_new = float(new_tax_from_taxable(gross_income - (NEW_STD_DEDUCTION if is_salaried else 0.0)))
+
+    # Breakpoint pruning: nothing below the rebate limit saves tax
+    useful = max(0.0, taxable_old - OLD_REBATE_LIMIT)
+    sections = []
+    for name, (rate, capacity) in _section_limits(current, gross_income).items():
+        capacity = min(capacity, float(limits.get(name, math.inf)), budget, useful / rate)
+        if capacity > 0:
+            sections.append((name, rate, capacity))
+
+    allocation = {s: 0.0 for s in SECTIONS}
+    best_tax, spend, evaluated = tax_old, 0.0, 1
+    if sections:
+        fill = max(sections, key=lambda s: (s[1], s[2]))
+        swept = [s for s in sections if s is not fill]
+        breakpoints = [taxable_old - low for low, _, _ in old_slabs if 0 < taxable_old - low <= useful]
+
+        # Grid per swept section: coarsen the step until the product's size fits, then build it
+        while math.prod(_grid_size(capacity, step, len(breakpoints)) for _, _, capacity in swept) > MAX_CANDIDATES:
+            step *= 2
+        grids = []
+        for _, rate, capacity in swept:
+            points = np.concatenate([np.arange(0.0, capacity, step), [capacity],
+                                     [b / rate for b in breakpoints if b / rate <= capacity]])
+            grids.append(np.unique(points))
+
+        if grids:
+            amounts = np.stack(np.meshgrid(*grids, indexing="ij"), axis=-1).reshape(-1, len(grids))
+        else:
+            amounts = np.zeros((1, 0))
+        rates = np.array([rate for _, rate, _ in swept])
+        spent = amounts.sum(axis=1)
+        amounts, spent = amounts[spent <= budget], spent[spent <= budget]
+        deducted = amounts @ rates
+        _, fill_rate, fill_capacity = fill
+        fill_amount = np.clip(np.minimum(budget - spent, (useful - deducted) / fill_rate), 0.0, fill_capacity)
+        taxes = old_tax_from_taxable(taxable_old - deducted - fill_amount * fill_rate)
+        spent = spent + fill_amount
+
+        # Every candidate as a full allocation, in SECTIONS order
+        candidates = np.zeros((len(taxes), len(SECTIONS)))
+        for (name, _, _), column in zip(swept, amounts.T):
+            candidates[:, SECTIONS.index(name)] = column
+        candidates[:, SECTIONS.index(fill[0])] = fill_amount
+
+        # Lowest tax, then lowest spend, then as much as possible in the earlier sections (80C first)
+        best = np.lexsort((*(-candidates[:, i] for i in reversed(range(len(SECTIONS)))), spent, taxes))[0]
+        evaluated = len(taxes)
+        if taxes[best] < tax_old:
+            best_tax, spend = float(taxes[best]), float(spent[best])
+            allocation = dict(zip(SECTIONS, candidates[best].tolist()))
+
+    regime = "Old Regime" if best_tax < tax_new else "New Regime"
+    old_allocation = {s: round(a, 2) for s, a in allocation.items()}
+    return {
+        "recommended_regime": regime,
+        # Deductions do not count under the New Regime: nothing to invest when it wins
+        "allocation": old_allocation if regime == "Old Regime" else {s: 0.0 for s in SECTIONS},
+        "total_investment": round(spend, 2) if regime == "Old Regime" else 0.0,
+        "old_regime_allocation": old_allocation,
+        "tax_old_current": tax_old,
+        "tax_old_optimized": best_tax,
+        "tax_new": tax_new,
+        "tax_payable": min(best_tax, tax_new),
+        "tax_saving": round(min(tax_old, tax_new) - min(best_tax, tax_new), 2),
+        "candidates_evaluated": evaluated,
+    }
@@ -17,7 +17,9 @@ Tax calculation utilities for PrajaSeva tax module.
   * Cess = 4%
 """
 
-from typing import Tuple
+from typing import Optional, Tuple
+
+import numpy as np
 
 # -------------------------------
 # Utility to compute tax by slab
@@ -64,6 +66,9 @@ CAP_80C = 150000
 CAP_80D = 50000
 CAP_HOME_INTEREST = 200000
 CESS = 0.04
+OLD_REBATE_LIMIT = 500000    # 87A, Old Regime: taxable income up to ₹5,00,000
+OLD_REBATE_MAX = 12500
+NEW_REBATE_LIMIT = 1_200_000 # 87A, New Regime: taxable income up to ₹12,00,000
 
 # -------------------------------
 # Old regime calculation (FY 2024–25)
@@ -92,8 +97,8 @@ def compute_tax_old(
 
     # Section 87A rebate (classic rule)
     rebate = 0.0
-    if taxable <= 500000:
-        rebate = min(12500.0, tax_before_cess)
+    if taxable <= OLD_REBATE_LIMIT:
+        rebate = min(float(OLD_REBATE_MAX), tax_before_cess)
 
     tax_after_rebate = max(0.0, tax_before_cess - rebate)
     tax_incl_cess = round(tax_after_rebate * (1.0 + CESS), 2)
@@ -115,9 +120,47 @@ def compute_tax_new(
     taxable = max(0.0, taxable)
 
     # Rebate zone → zero tax
-    if taxable <= 1_200_000:
+    if taxable <= NEW_REBATE_LIMIT:
         return 0.0, taxable, 0.0
 
     tax_before_cess = tax_from_slabs(taxable, new_slabs)
     tax_incl_cess = round(tax_before_cess * (1.0 + CESS), 2)
     return tax_incl_cess, taxable, round(tax_before_cess, 2)
+
+
+# -------------------------------
+# Vectorized versions (numpy arrays of taxable income)
+# -------------------------------
+def tax_from_slabs_array(taxable: np.ndarray, slabs: list) -> np.ndarray:
+    """tax_from_slabs for every element of `taxable` at once."""
+    lows = np.array([low for low, _, _ in slabs], dtype=np.float64)
+    widths = np.array([high - low for low, high, _ in slabs], dtype=np.float64)
+    rates = np.array([rate for _, _, rate in slabs], dtype=np.float64)
+    taxable = np.asarray(taxable, dtype=np.float64)
+    return np.clip(taxable[..., None] - lows, 0.0, widths) @ rates
+
+
+def old_tax_from_taxable(taxable: np.ndarray, decimals: Optional[int] = 2) -> np.ndarray:
+    """Old Regime tax incl. cess for taxable incomes (as compute_tax_old, after deductions)."""
+    taxable = np.maximum(np.asarray(taxable, dtype=np.float64), 0.0)
+    tax_before_cess = tax_from_slabs_array(taxable, old_slabs)
+    rebate = np.where(taxable <= OLD_REBATE_LIMIT, np.minimum(OLD_REBATE_MAX, tax_before_cess), 0.0)
+    tax = np.maximum(tax_before_cess - rebate, 0.0) * (1.0 + CESS)
+    return np.round(tax, decimals) if decimals is not None else tax
+
+
+def new_tax_from_taxable(taxable: np.ndarray, decimals: Optional[int] = 2) -> np.ndarray:
+    """New Regime tax incl. cess for taxable incomes (as compute_tax_new, after the standard deduction)."""
+    taxable = np.maximum(np.asarray(taxable, dtype=np.float64), 0.0)
+    tax = tax_from_slabs_array(taxable, new_slabs) * (1.0 + CESS)
+    tax = np.where(taxable <= NEW_REBATE_LIMIT, 0.0, tax)
+    return np.round(tax, decimals) if decimals is not None else tax
+
+
+def old_regime_deductions(
+    investments_80c, insurance_80d, home_loan_interest, education_loan_interest, other_deductions,
+) -> np.ndarray:
+    """Total Old Regime deductions (standard deduction + capped sections), element-wise."""
+    return (OLD_STD_DEDUCTION + np.minimum(investments_80c, CAP_80C) + np.minimum(insurance_80d, CAP_80D)
+            + np.minimum(home_loan_interest, CAP_HOME_INTEREST) + np.asarray(education_loan_interest)
+            + np.asarray(other_deductions))
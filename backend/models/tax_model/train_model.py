@@ -1,19 +1,32 @@
-# train_model.py - Trains tax regime recommender using generated training_dataset.csv
-import pandas as pd, joblib
+# train_model.py - Trains tax regime recommender using the generated training dataset
+import joblib
 from pathlib import Path
+from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
 
+from ..datasets import read_dataset, resolve_dataset
+
 BASE = Path(__file__).resolve().parent
-data = pd.read_csv(BASE / "training_dataset.csv")
 
 feature_cols = ['age','annual_income','is_salaried','investment_80c','investment_80d','home_loan_interest','education_loan_interest','donations_80g','other_deductions','standard_deduction']
-X = data[feature_cols]
-y = (data['best_regime'] == 'old').astype(int)
 
-clf = DecisionTreeClassifier(max_depth=8, random_state=42)
-clf.fit(X, y)
+def train(dataset_path=None, model_path=BASE / "tax_model.pkl",
+          features_path=BASE / "feature_columns.pkl", test_size=None):
+    data = read_dataset(dataset_path or resolve_dataset(BASE), "tax", columns=feature_cols + ["best_regime"])
+
+    X = data[feature_cols]
+    y = (data['best_regime'] == 'old').astype(int)
+    if test_size:
+        # Hold out the rows train_test_split.evaluate scores (same split)
+        X, _, y, _ = train_test_split(X, y, test_size=test_size, random_state=42)
+
+    clf = DecisionTreeClassifier(max_depth=8, random_state=42)
+    clf.fit(X, y)
 
-joblib.dump(clf, BASE / "tax_model.pkl")
-joblib.dump(feature_cols, BASE / "feature_columns.pkl")
+    joblib.dump(clf, model_path)
+    joblib.dump(feature_cols, features_path)
+    return clf
 
-print('Training complete. Model saved as tax_model.pkl')
\ No newline at end of file
+if __name__ == "__main__":
+    train()
+    print('Training complete. Model saved as tax_model.pkl')
@@ -0,0 +1,82 @@
+# tax_model/what_if.py
+"""
+What-if evaluation: Old/New Regime tax for many scenarios at once, and the exact
+incomes where the better regime switches.
+
+Scenarios are columnar (one array per TaxInput field, scalars broadcast), so a
+10k-point curve is a handful of numpy operations rather than 10k calls to
+compute_tax_old / compute_tax_new.
+
+Break-even: with deductions fixed, both regimes are piecewise-linear functions of
+gross income, with kinks at (deductions + slab boundary) and jumps at
+(deductions + 87A rebate limit). Between consecutive kinks their difference is a
+straight line, so each interval has at most one crossing, solved directly; a jump
+can also flip the better regime, in which case the kink itself is the switch point.
+Income ranges where both regimes cost the same are reported as 'Equal'.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from .tax_utils import (
+    NEW_REBATE_LIMIT, NEW_STD_DEDUCTION, OLD_REBATE_LIMIT, new_slabs, new_tax_from_taxable,
+    old_regime_deductions, old_slabs, old_tax_from_taxable,
+)
+
+FIELDS = ["annual_income", "is_salaried", "investment_80c", "investment_80d", "home_loan_interest",
+          "education_loan_interest", "donations_80g", "other_deductions"]
+REGIMES = {-1: "Old Regime", 0: "Equal", 1: "New Regime"}
+FAR_INCOME = 1e9   # beyond the last kink both regimes are linear; any far point will do
+
+
+def scenario_deductions(columns: Dict[str, np.ndarray]):
+    """(Old Regime deductions, New Regime deduction) for columnar scenarios, as predict_tax applies them."""
+    old = old_regime_deductions(columns["investment_80c"], columns["investment_80d"], columns["home_loan_interest"],
+                                columns["education_loan_interest"], columns["donations_80g"] + columns["other_deductions"])
+    new = np.where(columns["is_salaried"] != 0, NEW_STD_DEDUCTION, 0.0)
+    return old, new
+
+
+def evaluate_scenarios(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Old/New Regime tax (incl. cess) for every scenario; `columns` holds every field of FIELDS."""
+    old_deductions, new_deduction = scenario_deductions(columns)
+    tax_old = old_tax_from_taxable(columns["annual_income"] - old_deductions)
+    tax_new = new_tax_from_taxable(columns["annual_income"] - new_deduction)
+    return {"tax_old": tax_old, "tax_new": tax_new, "saving_with_new": np.round(tax_old - tax_new, 2)}
+
+
+def break_even_incomes(old_deductions: float, new_deduction: float) -> List[dict]:
+    """Gross incomes where the cheaper regime changes, for fixed deductions."""
+    def difference(income):
+        # > 0: the New Regime is cheaper
+        income = np.asarray(income, dtype=np.float64)
+        return (old_tax_from_taxable(income - old_deductions, decimals=None)
+                - new_tax_from_taxable(income - new_deduction, decimals=None))
+
+    kinks = {old_deductions + low for low, _, _ in old_slabs} | {old_deductions + OLD_REBATE_LIMIT}
+    kinks |= {new_deduction + low for low, _, _ in new_slabs} | {new_deduction + NEW_REBATE_LIMIT}
+    kinks = np.array(sorted(k for k in kinks if k >= 0) or [0.0])
+
+    # The difference is a line on every interval (k_i, k_i+1] (the last one runs to FAR_INCOME): fit it
+    # from two interior samples, then walk the intervals noting the state right after each kink and crossing
+    ends = np.append(kinks[1:], kinks[-1] + FAR_INCOME)
+    a, b = kinks + (ends - kinks) / 4, kinks + 3 * (ends - kinks) / 4
+    da, db = difference(a), difference(b)
+    slope = np.round((db - da) / (b - a), 9)
+    at_start = np.round(da + slope * (kinks - a), 6)
+    at_end = np.round(db + slope * (ends - b), 6)
+
+    segments = []
+    for start, value, end_value, rate in zip(kinks, at_start, at_end, slope):
+        state = np.sign(value) or np.sign(rate)
+        segments.append((float(start), int(state)))
+        if value * end_value < 0:
+            segments.append((float(start - value / rate), int(-state)))
+
+    switches, previous = [], None
+    for income, state in segments:
+        if previous is not None and state != previous:
+            switches.append({"income": round(income, 2), "cheaper_below": REGIMES[previous], "cheaper_above": REGIMES[state]})
+        previous = state
+    return switches
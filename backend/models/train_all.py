@@ -0,0 +1,239 @@
+# backend/models/train_all.py
+"""
+One training CLI for the schemes, tax and wealth models.
+
+For each selected model it runs: dataset generation -> training -> evaluation -> export.
+Independent models run in parallel processes. Every path is explicit (nothing depends
+on the working directory), generation is seeded, and stages are cached by content hash:
+
+- generate: keyed by the generator source, its input rules file and its parameters.
+  An unchanged key reuses the cached dataset instead of regenerating it.
+- train + evaluate: keyed by the dataset hash, the training/evaluation sources and
+  parameters. An unchanged key reuses the cached artifacts and metrics. Every model
+  is trained on the same 80% split its evaluation holds the other 20% out of, so
+  the manifest's metrics are held-out ones.
+
+Export copies the artifacts into the model directories (or --output-dir) and writes
+a manifest with per-stage timings, metrics and sha256 checksums of every artifact.
+
+Run from the backend directory:
+    python -m models.train_all                      # all models
+    python -m models.train_all schemes wealth --seed 7
+    python -m models.train_all tax --force          # ignore the cache
+
+The per-model scripts it drives (generate_dataset, train_model, train_test_split, ...)
+use package-relative imports, so they run the same way, as modules from backend/:
+    python -m models.schemes_model.train_model --model multi-forest
+    python -m models.tax_model.train_test_split
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .schemes_model.train_model import MODEL_TYPES as SCHEMES_MODEL_TYPES
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR.parent / ".train_cache"
+MODELS = ["schemes", "tax", "wealth"]
+
+
+# --- Hashing helpers ---
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(files: List[Path], params: dict) -> str:
+    """Content hash of the files a stage depends on plus its parameters."""
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.name.encode())
+        digest.update(file_sha256(path).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+# --- Per-model stage definitions ---
+# Each spec says which sources/inputs a stage depends on and how to run it with explicit paths.
+def _specs(seed: int, schemes_model_type: str) -> Dict[str, dict]:
+    schemes_dir, tax_dir, wealth_dir = BASE_DIR / "schemes_model", BASE_DIR / "tax_model", BASE_DIR / "wealth_model"
+    return {
+        "schemes": {
+            "dir": schemes_dir,
+            "dataset": "training_dataset.parquet",
+            "generate": {
+                "files": [schemes_dir / "generate_dataset.py", schemes_dir / "schemes_rules.csv"],
+                "params": {"seed": seed, "samples_per_scheme": 100},
+            },
+            "train": {
+                "files": [schemes_dir / "train_model.py", schemes_dir / "train_test_split.py"],
+                "params": {"model_type": schemes_model_type, "test_size": 0.2},
+            },
+            "artifacts": ["schemes_model.pkl", "label_encoder.pkl"],
+        },
+        "tax": {
+            "dir": tax_dir,
+            "dataset": "training_dataset.parquet",
+            "generate": {
+                "files": [tax_dir / "generate_dataset.py", tax_dir / "tax_utils.py"],
+                "params": {"seed": seed, "rows": 200_000},
+            },
+            "train": {
+                "files": [tax_dir / "train_model.py", tax_dir / "train_test_split.py"],
+                "params": {"test_size": 0.2},
+            },
+            "artifacts": ["tax_model.pkl", "feature_columns.pkl"],
+        },
+        "wealth": {
+            "dir": wealth_dir,
+            "dataset": "training_dataset.parquet",
+            "generate": {
+                "files": [wealth_dir / "generate_dataset.py", wealth_dir / "schemes_rules.csv"],
+                "params": {"seed": seed, "samples_per_scheme": 200},
+            },
+            "train": {
+                "files": [wealth_dir / "train_model.py", wealth_dir / "train_test_split.py"],
+                "params": {},
+            },
+            "artifacts": ["investment_model.pkl"],
+        },
+    }
+
+
+def _run_generate(name: str, spec: dict, dataset_path: Path) -> None:
+    params = spec["generate"]["params"]
+    if name == "schemes":
+        from .schemes_model import generate_dataset
+        generate_dataset.generate(spec["dir"] / "schemes_rules.csv", dataset_path,
+                                  samples_per_scheme=params["samples_per_scheme"], seed=params["seed"])
+    elif name == "tax":
+        from .tax_model import generate_dataset
+        # Already one process per model here: chunks are generated in-process
+        generate_dataset.generate(dataset_path, rows=params["rows"], seed=params["seed"], workers=1)
+    elif name == "wealth":
+        from .wealth_model import generate_dataset
+        generate_dataset.generate(spec["dir"] / "schemes_rules.csv", dataset_path,
+                                  samples_per_scheme=params["samples_per_scheme"], seed=params["seed"])
+
+
+def _run_train_and_evaluate(name: str, spec: dict, dataset_path: Path, out_dir: Path) -> dict:
+    """Train into out_dir and return (train metrics are not reused) the held-out evaluation metrics."""
+    artifacts = [out_dir / a for a in spec["artifacts"]]
+    params = spec["train"]["params"]
+    if name == "schemes":
+        from .schemes_model import train_model, train_test_split
+        train_model.train(params["model_type"], artifacts[0], dataset_path=dataset_path, labels_path=artifacts[1],
+                          test_size=params["test_size"])
+        return train_test_split.evaluate_on_test_split(test_size=params["test_size"], dataset_path=dataset_path,
+                                                       model_path=artifacts[0], labels_path=artifacts[1])
+    if name == "tax":
+        from .tax_model import train_model, train_test_split
+        train_model.train(dataset_path, artifacts[0], artifacts[1], test_size=params["test_size"])
+        return train_test_split.evaluate(dataset_path, artifacts[0], artifacts[1], verbose=False)
+    from .wealth_model import train_model, train_test_split
+    train_model.train(dataset_path, artifacts[0])
+    return train_test_split.evaluate(dataset_path, artifacts[0], verbose=False)
+
+
+def run_model(name: str, seed: int, schemes_model_type: str, output_dir: Optional[Path], force: bool) -> dict:
+    """Run all stages for one model (in its own process). Returns its manifest entry."""
+    spec = _specs(seed, schemes_model_type)[name]
+    export_dir = output_dir / name if output_dir else spec["dir"]
+    export_dir.mkdir(parents=True, exist_ok=True)
+    stages = {}
+
+    # 1. Dataset generation
+    start = time.perf_counter()
+    key = stage_key(spec["generate"]["files"], spec["generate"]["params"])
+    cache = CACHE_DIR / name / f"dataset-{key}"
+    dataset_path = cache / spec["dataset"]
+    if dataset_path.exists() and not force:
+        stages["generate"] = {"status": "cached", "key": key}
+    else:
+        cache.mkdir(parents=True, exist_ok=True)
+        _run_generate(name, spec, dataset_path)
+        stages["generate"] = {"status": "ran", "key": key}
+    stages["generate"]["seconds"] = round(time.perf_counter() - start, 3)
+    dataset_hash = file_sha256(dataset_path)
+
+    # 2 + 3. Training and evaluation (cached together: metrics belong to the artifacts)
+    start = time.perf_counter()
+    key = stage_key(spec["train"]["files"], {**spec["train"]["params"], "dataset": dataset_hash})
+    cache = CACHE_DIR / name / f"model-{key}"
+    metrics_path = cache / "metrics.json"
+    if metrics_path.exists() and not force:
+        metrics = json.loads(metrics_path.read_text())
+        stages["train"] = {"status": "cached", "key": key}
+    else:
+        cache.mkdir(parents=True, exist_ok=True)
+        metrics = _run_train_and_evaluate(name, spec, dataset_path, cache)
+        metrics_path.write_text(json.dumps(metrics, indent=2))
+        stages["train"] = {"status": "ran", "key": key}
+    stages["train"]["seconds"] = round(time.perf_counter() - start, 3)
+
+    # 4. Export
+    start = time.perf_counter()
+    artifacts = {}
+    for artifact in spec["artifacts"]:
+        target = export_dir / artifact
+        shutil.copyfile(cache / artifact, target)
+        artifacts[artifact] = {"path": str(target), "sha256": file_sha256(target), "bytes": target.stat().st_size}
+    stages["export"] = {"status": "ran", "seconds": round(time.perf_counter() - start, 3)}
+
+    return {
+        "dataset": {"path": str(dataset_path), "sha256": dataset_hash},
+        "stages": stages,
+        "metrics": metrics,
+        "artifacts": artifacts,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate, train, evaluate and export the PrajaSeva models.")
+    parser.add_argument("models", nargs="*", choices=MODELS + ["all"], default=["all"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--schemes-model", choices=SCHEMES_MODEL_TYPES, default="per-scheme",
+                        help="classifier option for schemes_model/train_model.py")
+    parser.add_argument("--output-dir", type=Path, help="export here instead of the model directories")
+    parser.add_argument("--jobs", type=int, default=None, help="parallel processes (default: one per model)")
+    parser.add_argument("--force", action="store_true", help="ignore cached stages")
+    parser.add_argument("--manifest", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    models = MODELS if "all" in args.models else list(dict.fromkeys(args.models))
+    manifest_path = args.manifest or (args.output_dir or BASE_DIR) / "training_manifest.json"
+
+    print(f"🚀 Training {', '.join(models)} (seed {args.seed})...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs or len(models)) as pool:
+        futures = {m: pool.submit(run_model, m, args.seed, args.schemes_model, args.output_dir, args.force) for m in models}
+        results = {m: f.result() for m, f in futures.items()}
+    elapsed = time.perf_counter() - start
+
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "seed": args.seed,
+        "total_seconds": round(elapsed, 3),
+        "models": results,
+    }
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    for name, result in results.items():
+        stages = ", ".join(f"{s} {v['status']} ({v['seconds']}s)" for s, v in result["stages"].items())
+        print(f"✅ {name}: {stages} | metrics {result['metrics']}")
+    print(f"📄 Manifest written to {manifest_path} ({elapsed:.1f}s total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,63 @@
 # wealth_model/api.py
-import os
 import json
-from fastapi import FastAPI, Depends, HTTPException, status
+import operator
+import time
+from fastapi import FastAPI, Depends, HTTPException, Request
 from pydantic import BaseModel
 from pathlib import Path
 import joblib
-import pandas as pd
-import psycopg2
 from psycopg2.extras import DictCursor
-from jose import JWTError, jwt
 from dotenv import load_dotenv
-from fastapi.security import OAuth2PasswordBearer
-from typing import List
+from typing import NamedTuple
+
+from ..auth import get_current_user
+from ..admission import admit
+from ..metrics import stage
+from ..inference import predict
+from ..encoding import array_input, serving_encoder
+from ..db import execute_prepared, get_db_connection, upsert_rows, WriteBehindWriter, WRITE_BEHIND_ENABLED
+from ..queries import LATEST_WEALTH_INPUT
+from ..registry import VERSION_HEADER, ModelVersion, registry
+from ..responses import FastJSONResponse
+from ..deadlines import deadline_handlers, passthrough
+from ..http_cache import etag_matches, not_modified, result_etag, result_response
+from ..shadow import candidate_name, shadow
 
 # --- Environment Setup & App Initialization ---
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
-JWT_SECRET = os.getenv("JWT_SECRET")
-ALGORITHM = "HS256"
-app = FastAPI(title="Wealth & Investment Recommendation API")
-
-# --- Security & Authentication ---
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
-    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        user_id: str = payload.get("userId")
-        if user_id is None: raise credentials_exception
-        return user_id
-    except JWTError:
-        raise credentials_exception
-
-# --- Database Connection ---
-def get_db_connection():
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        return conn
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Database connection failed.")
+app = FastAPI(title="Wealth & Investment Recommendation API", default_response_class=FastJSONResponse,
+              exception_handlers=deadline_handlers)
+
+# --- Database Writes ---
+WEALTH_COLUMNS = ["user_id", "projected_corpus", "inflation_adjusted_corpus", "projection_data", "recommended_schemes"]
+WEALTH_SQL_VALUES = {"generated_at": "NOW()"}
+wealth_writer = WriteBehindWriter("wealth", WEALTH_COLUMNS, key="user_id", sql_values=WEALTH_SQL_VALUES) if WRITE_BEHIND_ENABLED else None
 
 # --- Load ML Model ---
 base_dir = Path(__file__).resolve().parent
-pipeline = joblib.load(base_dir / "investment_model.pkl") if (base_dir / "investment_model.pkl").exists() else None
+
+
+class WealthModel(NamedTuple):
+    encoder: object
+    classes: list
+
+
+def _load_model(version: ModelVersion) -> WealthModel:
+    pipeline = joblib.load(version.files[0])
+    return WealthModel(serving_encoder(pipeline), list(pipeline.classes_))
+
+
+def _top_scheme(model: WealthModel, record: dict) -> str:
+    """The candidate's top recommendation, compared with the primary's (models/shadow.py)."""
+    with array_input():
+        probs = model.encoder.estimator.predict_proba(model.encoder.encode(record))[0]
+    return model.classes[probs.argsort()[-1]]
+
+
+# Hot-reloaded when the file changes (models/registry.py); None until it exists
+registry.register("wealth", [base_dir / "investment_model.pkl"], _load_model)
+registry.register(candidate_name("wealth"), [base_dir / "investment_model.candidate.pkl"], _load_model)
+shadow.register("wealth", _top_scheme, operator.eq)
 
 # --- Pydantic Schemas ---
 class WealthInput(BaseModel):
@@ -55,75 +70,126 @@ class WealthInput(BaseModel):
     liquidity: str
     annual_step_up: float
 
+
+# --- Service Steps ---
+INFLATION_RATE = 4.0
+
+
+def project_corpus(data: WealthInput):
+    """Year-by-year projection to retirement: (projection_data, corpus, inflation-adjusted corpus)."""
+    years_to_invest = data.retirement_age - data.user_age
+    annual_investment = data.monthly_investment * 12
+    corpus = data.current_savings
+    projection_data = []
+    for year in range(1, max(years_to_invest, 0) + 1):
+        opening_cap = corpus
+        annual_inv = annual_investment
+        interest_earned = corpus * (data.expected_return / 100)
+        corpus += interest_earned + annual_inv
+        projection_data.append({
+            "year": year, "opening_capital": f"{opening_cap:,.2f}",
+            "annual_investment": f"{annual_inv:,.2f}", "interest_earned": f"{interest_earned:,.2f}",
+            "closing_capital": f"{corpus:,.2f}"
+        })
+        annual_investment *= (1 + data.annual_step_up / 100)
+    inflation_adjusted_corpus = corpus / ((1 + INFLATION_RATE / 100) ** years_to_invest) if years_to_invest > 0 else corpus
+    return projection_data, corpus, inflation_adjusted_corpus
+
+
+def model_record(data: WealthInput) -> dict:
+    """The request as the model's input record."""
+    return {"user_age": data.user_age, "investment_amount": data.monthly_investment * 12,
+            "years_to_invest": data.retirement_age - data.user_age,
+            "risk_level": data.risk_tolerance, "liquidity": data.liquidity}
+
+
+def top_schemes(probs, classes: list, k: int = 5) -> list:
+    """The k most likely schemes, best first."""
+    return [{"scheme_name": classes[i], "confidence": round(probs[i], 4)} for i in probs.argsort()[-k:][::-1]]
+
 # --- API Endpoint ---
-@app.post("/predict")
+@app.post("/predict", dependencies=[Depends(admit("predict"))])
 def predict_wealth(user_id: str = Depends(get_current_user)):
+    version = registry.active("wealth")
     conn = get_db_connection()
     cursor = conn.cursor(cursor_factory=DictCursor)
     try:
         # 1. Fetch user input from 'wealth_input' table
-        cursor.execute("SELECT * FROM wealth_input WHERE user_id = %s", (user_id,))
-        user_input_data = cursor.fetchone()
+        with stage("db_fetch"):
+            execute_prepared(cursor, LATEST_WEALTH_INPUT, (user_id,))
+            user_input_data = cursor.fetchone()
         if not user_input_data:
             raise HTTPException(status_code=404, detail="No wealth input data found for this user.")
         data = WealthInput(**user_input_data)
 
         # 2. Wealth Projection Calculation
-        years_to_invest = data.retirement_age - data.user_age
-        annual_investment = data.monthly_investment * 12
-        corpus = data.current_savings
-        inflation_rate = 4.0
-        projection_data = []
-
-        if years_to_invest > 0:
-            for year in range(1, years_to_invest + 1):
-                opening_cap = corpus
-                annual_inv = annual_investment
-                interest_earned = corpus * (data.expected_return / 100)
-                corpus += interest_earned + annual_inv
-                projection_data.append({
-                    "year": year, "opening_capital": f"{opening_cap:,.2f}",
-                    "annual_investment": f"{annual_inv:,.2f}", "interest_earned": f"{interest_earned:,.2f}",
-                    "closing_capital": f"{corpus:,.2f}"
-                })
-                annual_investment *= (1 + data.annual_step_up / 100)
-        
-        inflation_adjusted_corpus = corpus / ((1 + inflation_rate / 100) ** years_to_invest) if years_to_invest > 0 else corpus
-        projected_corpus_final = corpus
+        with stage("compute"):
+            projection_data, projected_corpus_final, inflation_adjusted_corpus = project_corpus(data)
 
         # 3. ML Model Prediction
         recommended_schemes = []
-        if pipeline:
-            input_df = pd.DataFrame([{"user_age": data.user_age, "investment_amount": data.monthly_investment * 12, "years_to_invest": years_to_invest, "risk_level": data.risk_tolerance, "liquidity": data.liquidity}])
-            all_probs = pipeline.predict_proba(input_df)[0]
-            top_indices = all_probs.argsort()[-5:][::-1] # Get top 5
-            for i in top_indices:
-                recommended_schemes.append({"scheme_name": pipeline.classes_[i], "confidence": round(all_probs[i], 4)})
+        if version is not None:
+            encoder = version.bundle.encoder
+            with stage("features"):
+                record = model_record(data)
+                features = encoder.encode(record)
+            with stage("inference"):
+                started = time.perf_counter()
+                all_probs = predict("wealth", encoder.estimator, features, method="predict_proba", version=version)[0]
+                inference_seconds = time.perf_counter() - started
+            recommended_schemes = top_schemes(all_probs, version.bundle.classes)
+            shadow.submit("wealth", record, recommended_schemes[0]["scheme_name"], inference_seconds)
 
         # 4. Store results in 'wealth' table using UPSERT
-        upsert_query = """
-            INSERT INTO wealth (user_id, projected_corpus, inflation_adjusted_corpus, projection_data, recommended_schemes, generated_at)
-            VALUES (%s, %s, %s, %s, %s, NOW())
-            ON CONFLICT (user_id) DO UPDATE SET
-                projected_corpus = EXCLUDED.projected_corpus,
-                inflation_adjusted_corpus = EXCLUDED.inflation_adjusted_corpus,
-                projection_data = EXCLUDED.projection_data,
-                recommended_schemes = EXCLUDED.recommended_schemes,
-                generated_at = NOW();
-        """
-        cursor.execute(upsert_query, (user_id, projected_corpus_final, inflation_adjusted_corpus, json.dumps(projection_data), json.dumps(recommended_schemes)))
-        conn.commit()
-
-        # 5. Return the final response
-        return {
+        row = (user_id, projected_corpus_final, inflation_adjusted_corpus, json.dumps(projection_data), json.dumps(recommended_schemes))
+        # Write-behind batches the upsert with other requests; a full queue falls back to writing now
+        with stage("db_upsert"):
+            if not (wealth_writer and wealth_writer.submit(row)):
+                upsert_rows(cursor, "wealth", WEALTH_COLUMNS, [row], key="user_id", sql_values=WEALTH_SQL_VALUES)
+            conn.commit()
+
+        # 5. Return the final response (plain data: rendered without jsonable_encoder, see models/responses.py)
+        return FastJSONResponse({
             "projected_corpus": f"{projected_corpus_final:,.2f}",
             "inflation_adjusted_corpus": f"{inflation_adjusted_corpus:,.2f}",
             "projection_data": projection_data,
             "recommended_schemes": recommended_schemes
-        }
+        }, headers={VERSION_HEADER: version.id} if version is not None else None)
     except Exception as e:
         conn.rollback()
+        passthrough(e)      # 404s as they are; DB timeouts as 504 (models/deadlines.py)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     finally:
         cursor.close()
         conn.close()
+
+
+@app.get("/result")
+def stored_wealth_result(request: Request, user_id: str = Depends(get_current_user)):
+    """The result the last /predict stored, without recomputing it. Conditional on If-None-Match (models/http_cache.py)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        with stage("db_fetch"):
+            if request.headers.get("if-none-match"):
+                cursor.execute("SELECT generated_at FROM wealth WHERE user_id = %s", (user_id,))
+                row = cursor.fetchone()
+                if row is not None and etag_matches(request, result_etag("wealth", user_id, row[0])):
+                    return not_modified(result_etag("wealth", user_id, row[0]))
+            # ::text: JSONB columns as their JSON text (psycopg2 would decode them into lists)
+            cursor.execute("SELECT projected_corpus, inflation_adjusted_corpus, projection_data::text, "
+                           "recommended_schemes::text, generated_at FROM wealth WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if row is None:
+        raise HTTPException(status_code=404, detail="No wealth result stored for this user; call /predict first.")
+    corpus, adjusted, projection_data, recommended_schemes, generated_at = row
+    # The JSON columns are spliced in as stored: a 40-year projection is not parsed and re-encoded per request
+    body = (f'{{"projected_corpus":{json.dumps(f"{float(corpus):,.2f}")},'
+            f'"inflation_adjusted_corpus":{json.dumps(f"{float(adjusted):,.2f}")},'
+            f'"projection_data":{projection_data or "[]"},'
+            f'"recommended_schemes":{recommended_schemes or "[]"},'
+            f'"generated_at":{json.dumps(generated_at.isoformat() if generated_at else None)}}}')
+    return result_response(request, body, result_etag("wealth", user_id, generated_at))
@@ -1,41 +1,116 @@
-import csv
-import random
-
-# Read schemes from schemes_rules.csv
-with open("schemes_rules.csv", newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    schemes = list(reader)
-
-dataset = []
-for scheme in schemes:
-    for _ in range(200):  # generate multiple synthetic user samples per scheme
-        user_age = random.randint(18, 70)
-        user_investment = random.randint(10, 1000000)
-        years_to_invest = random.randint(1, 50)
-
-        # Ensure numeric fields
-        min_inv = float(scheme["min_investment"])
-        max_inv = float('inf') if scheme["max_investment"].lower() == 'any' else float(scheme["max_investment"])
-        age_min = int(scheme["eligible_age_min"])
-        age_max = float('inf') if scheme["eligible_age_max"].lower() == 'any' else int(scheme["eligible_age_max"])
-
-        if age_min <= user_age <= age_max and min_inv <= user_investment <= max_inv:
-            dataset.append({
-                "user_age": user_age,
-                "investment_amount": user_investment,
-                "years_to_invest": years_to_invest,
-                "risk_level": scheme["risk_level"],
-                "liquidity": scheme["liquidity"],
-                "recommended_scheme": scheme["scheme_name"]
-            })
-
-# Write to training_dataset.csv
-with open("training_dataset.csv", "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=[
-        "user_age", "investment_amount", "years_to_invest",
-        "risk_level", "liquidity", "recommended_scheme"
-    ])
-    writer.writeheader()
-    writer.writerows(dataset)
-
-print(f"✅ Generated training_dataset.csv with {len(dataset)} rows.")
+# generate_dataset.py - Synthetic investor profiles per scheme, sampled inside each scheme's eligibility
+"""
+Generates the wealth training dataset: `samples_per_scheme` synthetic users for every
+scheme in schemes_rules.csv, labelled with that scheme.
+
+Users are drawn uniformly from the population ranges below (age 18-70, yearly
+investment ₹10 - ₹10,00,000, horizon 1-50 years). A scheme only keeps users inside
+its eligible age and investment bounds, so instead of drawing from the full ranges
+and discarding the misses, each scheme's user is drawn uniformly from the
+intersection of the ranges with its bounds: the same distribution as
+rejection sampling, without the rejected draws, and exactly `samples_per_scheme`
+rows per scheme. Schemes whose bounds do not intersect the population (e.g. a
+child-only scheme) get no rows and are reported.
+
+The rules are parsed once into bound arrays. Rows are laid out scheme by scheme and
+produced in chunks of `chunk_size`, each vectorized across the schemes it spans and
+seeded from its own child of one SeedSequence, by a pool of processes
+(datasets.write_generated). The output depends on (samples_per_scheme, seed,
+chunk_size), not on the number of processes.
+
+    python -m models.wealth_model.generate_dataset --samples-per-scheme 100000 --seed 42 --workers 4
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..datasets import write_generated
+
+BASE_DIR = Path(__file__).resolve().parent
+
+AGE_RANGE = (18, 70)
+INVESTMENT_RANGE = (10, 1_000_000)
+YEARS_RANGE = (1, 50)
+
+COLUMNS = ["user_age", "investment_amount", "years_to_invest", "risk_level", "liquidity", "recommended_scheme"]
+
+
+def load_bounds(rules_path=BASE_DIR / "schemes_rules.csv") -> pd.DataFrame:
+    """One row per scheme: its labels and its eligible age / investment bounds clipped to the population."""
+    rules = pd.read_csv(rules_path, dtype=str)
+
+    def bound(column, default):
+        return pd.to_numeric(rules[column].where(rules[column].str.lower() != "any"), errors="coerce").fillna(default)
+
+    return pd.DataFrame({
+        "scheme_name": rules["scheme_name"],
+        "risk_level": rules["risk_level"],
+        "liquidity": rules["liquidity"],
+        "age_low": np.maximum(bound("eligible_age_min", AGE_RANGE[0]), AGE_RANGE[0]).astype(np.int64),
+        "age_high": np.minimum(bound("eligible_age_max", AGE_RANGE[1]), AGE_RANGE[1]).astype(np.int64),
+        # Integer investments: round the (possibly fractional) bounds inwards
+        "investment_low": np.maximum(np.ceil(bound("min_investment", INVESTMENT_RANGE[0])), INVESTMENT_RANGE[0]).astype(np.int64),
+        "investment_high": np.minimum(np.floor(bound("max_investment", INVESTMENT_RANGE[1])), INVESTMENT_RANGE[1]).astype(np.int64),
+    })
+
+
+def generate_chunk(bounds: pd.DataFrame, samples_per_scheme: int, start: int, stop: int,
+                   seed: np.random.SeedSequence) -> pd.DataFrame:
+    """Rows start..stop of the scheme-by-scheme layout (row i belongs to scheme i // samples_per_scheme)."""
+    rng = np.random.default_rng(seed)
+    scheme = np.arange(start, stop) // samples_per_scheme
+    rows = stop - start
+
+    def labels(column):
+        # Categorical straight from integer codes: no per-row string objects
+        codes, names = pd.factorize(bounds[column])
+        return pd.Categorical.from_codes(codes[scheme], categories=names)
+
+    return pd.DataFrame({
+        "user_age": rng.integers(bounds["age_low"].to_numpy()[scheme], bounds["age_high"].to_numpy()[scheme] + 1),
+        "investment_amount": rng.integers(bounds["investment_low"].to_numpy()[scheme],
+                                          bounds["investment_high"].to_numpy()[scheme] + 1),
+        "years_to_invest": rng.integers(YEARS_RANGE[0], YEARS_RANGE[1] + 1, rows),
+        "risk_level": labels("risk_level"),
+        "liquidity": labels("liquidity"),
+        "recommended_scheme": labels("scheme_name"),
+    }, columns=COLUMNS)
+
+
+def generate(rules_path=BASE_DIR / "schemes_rules.csv", output_path=BASE_DIR / "training_dataset.parquet",
+             samples_per_scheme=200, seed=None, workers: Optional[int] = None, chunk_size: int = 250_000):
+    bounds = load_bounds(rules_path)
+    feasible = (bounds["age_low"] <= bounds["age_high"]) & (bounds["investment_low"] <= bounds["investment_high"])
+    if not feasible.all():
+        print(f"⚠️ No eligible users in the population ranges for: {', '.join(bounds.loc[~feasible, 'scheme_name'])}")
+    bounds = bounds[feasible].reset_index(drop=True)
+
+    total = len(bounds) * samples_per_scheme
+    starts = list(range(0, total, chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [(bounds, samples_per_scheme, s, min(s + chunk_size, total), chunk_seed) for s, chunk_seed in zip(starts, seeds)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+    start = time.perf_counter()
+    rows = write_generated(output_path, "wealth", generate_chunk, tasks, workers)
+    print(f"✅ Generated {Path(output_path).name} with {rows} rows ({len(bounds)} schemes) "
+          f"in {time.perf_counter() - start:.1f}s.")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the wealth training dataset.")
+    parser.add_argument("--samples-per-scheme", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--output", type=Path, default=BASE_DIR / "training_dataset.parquet")
+    args = parser.parse_args()
+    generate(output_path=args.output, samples_per_scheme=args.samples_per_scheme, seed=args.seed,
+             workers=args.workers, chunk_size=args.chunk_size)
@@ -1,42 +1,49 @@
-import pandas as pd
+from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier
 import joblib
-import pickle
 
-# Load training dataset
-df = pd.read_csv("training_dataset.csv")
+from ..datasets import read_dataset, resolve_dataset
 
-X = df.drop(columns=["recommended_scheme"])
-y = df["recommended_scheme"]
+BASE_DIR = Path(__file__).resolve().parent
 
-# Preprocessing
-categorical_features = ["risk_level", "liquidity"]
-numeric_features = ["user_age", "investment_amount", "years_to_invest"]
 
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-        ("num", "passthrough", numeric_features)
-    ]
-)
+def train(dataset_path=None, model_path=BASE_DIR / "investment_model.pkl"):
+    # Load training dataset
+    df = read_dataset(dataset_path or resolve_dataset(BASE_DIR), "wealth")
 
-# Model pipeline
-pipeline = Pipeline([
-    ("preprocessor", preprocessor),
-    ("classifier", RandomForestClassifier(n_estimators=100, random_state=42))
-])
+    X = df.drop(columns=["recommended_scheme"])
+    y = df["recommended_scheme"]
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-pipeline.fit(X_train, y_train)
+    # Preprocessing
+    categorical_features = ["risk_level", "liquidity"]
+    numeric_features = ["user_age", "investment_amount", "years_to_invest"]
 
-# Save model with joblib
-joblib.dump(pipeline, "investment_model.pkl")
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
+            ("num", "passthrough", numeric_features)
+        ]
+    )
 
+    # Model pipeline
+    pipeline = Pipeline([
+        ("preprocessor", preprocessor),
+        ("classifier", RandomForestClassifier(n_estimators=100, random_state=42))
+    ])
 
+    # Train-test split
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    pipeline.fit(X_train, y_train)
 
-print("✅ Model trained and saved as investment_model.pkl")
+    # Save model with joblib
+    joblib.dump(pipeline, model_path)
+    return pipeline
+
+
+if __name__ == "__main__":
+    train()
+    print("✅ Model trained and saved as investment_model.pkl")
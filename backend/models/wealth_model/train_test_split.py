@@ -1,34 +1,46 @@
 # evaluate_investment_model.py - Load existing investment_model and test with train/test split
-import pandas as pd
 import joblib
+from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, f1_score, classification_report, confusion_matrix
 
-# Load dataset
-df = pd.read_csv("training_dataset.csv")
+from ..datasets import read_dataset, resolve_dataset
 
-# Load trained pipeline
-pipeline = joblib.load("investment_model.pkl")
+BASE_DIR = Path(__file__).resolve().parent
 
-# Features and target
-X = df.drop(columns=["recommended_scheme"])
-y = df["recommended_scheme"]
 
-# Train-test split (only using test set for evaluation)
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+def evaluate(dataset_path=None, model_path=BASE_DIR / "investment_model.pkl", verbose=True):
+    # Load dataset
+    df = read_dataset(dataset_path or resolve_dataset(BASE_DIR), "wealth")
 
-# Predict on test set
-y_pred = pipeline.predict(X_test)
+    # Load trained pipeline
+    pipeline = joblib.load(model_path)
 
-# Evaluation metrics
-acc = accuracy_score(y_test, y_pred)
-f1 = f1_score(y_test, y_pred, average="weighted")  # weighted handles class imbalance
+    # Features and target
+    X = df.drop(columns=["recommended_scheme"])
+    y = df["recommended_scheme"]
 
-print(f"✅ Test Accuracy: {acc:.4f}")
-print(f"✅ Test F1 Score (Weighted): {f1:.4f}")
-print("\n📊 Confusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
-print("\n📋 Classification Report:")
-print(classification_report(y_test, y_pred))
\ No newline at end of file
+    # Train-test split (only using test set for evaluation)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    # Predict on test set
+    y_pred = pipeline.predict(X_test)
+
+    # Evaluation metrics
+    acc = accuracy_score(y_test, y_pred)
+    f1 = f1_score(y_test, y_pred, average="weighted")  # weighted handles class imbalance
+
+    if verbose:
+        print(f"✅ Test Accuracy: {acc:.4f}")
+        print(f"✅ Test F1 Score (Weighted): {f1:.4f}")
+        print("\n📊 Confusion Matrix:")
+        print(confusion_matrix(y_test, y_pred))
+        print("\n📋 Classification Report:")
+        print(classification_report(y_test, y_pred))
+    return {"accuracy": round(acc, 4), "f1_weighted": round(f1, 4)}
+
+
+if __name__ == "__main__":
+    evaluate()